@@ -0,0 +1,155 @@
+"""
+Backpressure for outbound LLM calls.
+
+llm_bulkhead caps how many agent and classifier runs talk to the provider at
+once (LLM_MAX_CONCURRENCY). Further runs wait in a bounded queue
+(LLM_MAX_QUEUE) for at most LLM_QUEUE_TIMEOUT_SECONDS; when the queue is full,
+or the wait times out, BulkheadFull is raised so the endpoint can answer
+"busy" straight away instead of piling up coroutines and DB sessions.
+
+retry_rate_limited retries a single model request that fails with HTTP 429,
+with jittered exponential backoff; llm_backend.RateLimitRetryModel applies it to
+every request of the live model. Retrying the request rather than the whole run
+means tools that already ran are never run twice.
+
+This module does not import pydantic-ai, so the app can import it cheaply.
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+
+class BulkheadFull(Exception):
+    """No slot became free: the wait queue was full or the wait timed out."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class Bulkhead:
+    """At most max_concurrent holders; up to max_queue waiters, each for at most queue_timeout seconds."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters = deque()  # futures of queued callers, oldest first
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.retries = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def saturated(self) -> bool:
+        """True when a new caller would be rejected right away."""
+        with self._lock:
+            return self._active >= self.max_concurrent and len(self._waiters) >= self.max_queue
+
+    def _admitted(self, waited: float):
+        with self._lock:
+            self.admitted += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    async def acquire(self):
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                waiter = None
+            elif len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise BulkheadFull(f"LLM queue full ({len(self._waiters)} waiting)")
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+        if waiter is None:
+            self._admitted(0.0)
+            return
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as we gave up
+            if isinstance(e, asyncio.TimeoutError):
+                with self._lock:
+                    self.timeouts += 1
+                raise BulkheadFull(f"Timed out after {self.queue_timeout}s waiting for an LLM slot")
+            raise
+        self._admitted(time.monotonic() - start)
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    # Hand the slot straight to the oldest waiter
+                    waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+                    return
+            self._active -= 1
+
+    def _grant(self, waiter):
+        if waiter.cancelled():
+            self.release()  # the waiter gave up after it was picked; pass the slot on
+        else:
+            waiter.set_result(True)
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active": self._active,
+                "queued": len(self._waiters),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "retries": self.retries,
+                "wait_avg_ms": round(self._wait_total / self.admitted * 1000, 2) if self.admitted else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 2),
+            }
+
+llm_bulkhead = Bulkhead(
+    max_concurrent=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10")),
+)
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+
+def is_rate_limited(error: Exception) -> bool:
+    # pydantic-ai's ModelHTTPError and the openai SDK's RateLimitError both carry status_code
+    return getattr(error, "status_code", None) == 429
+
+async def retry_rate_limited(call, max_retries: int = None):
+    """await call(), retrying HTTP 429s with full-jitter exponential backoff."""
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= max_retries or not is_rate_limited(e):
+                raise
+            with llm_bulkhead._lock:
+                llm_bulkhead.retries += 1
+            await asyncio.sleep(random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt)))
@@ -0,0 +1,196 @@
+"""
+Token-budgeted message history for the household agent.
+
+Long chats keep growing the prompt sent on every turn. HistoryManager keeps the
+system prompt and the most recent turns verbatim and folds everything older
+into a rolling summary, so a turn costs at most about HISTORY_TOKEN_BUDGET
+tokens of history. Summaries are cached by the content of the turns they
+cover: the window only moves (and the summary is only regenerated) once the
+recent turns outgrow the budget, and then it moves far enough to leave room
+for several more turns.
+"""
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, List, Optional, Tuple
+from pydantic_ai import Agent
+from backend.agents.llm_backend import build_model
+from pydantic_ai.messages import (
+    ModelMessage, ModelRequest, SystemPromptPart, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart,
+)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional; fall back to ~4 characters per token
+    _ENCODING = None
+
+logger = logging.getLogger("history")
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a household assistant "
+    "that manages chores, meals, family members and recipes. Merge the previous summary with the new "
+    "transcript into one concise summary. Keep every fact needed later: names, dates, ids, what was "
+    "created, changed or deleted, and any request still in progress with the details collected so far. "
+    "Reply with the summary only."
+)
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+def _part_text(part) -> str:
+    if isinstance(part, (SystemPromptPart, TextPart)):
+        return part.content
+    if isinstance(part, UserPromptPart):
+        return part.content if isinstance(part.content, str) else " ".join(str(c) for c in part.content)
+    if isinstance(part, ToolCallPart):
+        return f"{part.tool_name}({part.args_as_json_str()})"
+    if isinstance(part, ToolReturnPart):
+        return f"{part.tool_name} -> {part.model_response_str()}"
+    return str(getattr(part, "content", ""))
+
+def message_tokens(messages: List[ModelMessage]) -> int:
+    # A few tokens of per-message overhead, as chat APIs charge for role framing
+    return sum(4 + sum(count_tokens(_part_text(p)) for p in m.parts) for m in messages)
+
+def _transcript(turns: List[List[ModelMessage]]) -> str:
+    lines = []
+    for turn in turns:
+        for message in turn:
+            for part in message.parts:
+                if isinstance(part, SystemPromptPart):
+                    continue
+                role = "User" if isinstance(part, UserPromptPart) else "Tool" if isinstance(part, (ToolCallPart, ToolReturnPart)) else "Assistant"
+                lines.append(f"{role}: {_part_text(part)}")
+    return "\n".join(lines)
+
+def split_turns(messages: List[ModelMessage]) -> Tuple[List[SystemPromptPart], List[List[ModelMessage]]]:
+    """(system prompt parts, turns); a turn starts at each request carrying a user prompt."""
+    system_parts, turns = [], []
+    for message in messages:
+        if isinstance(message, ModelRequest):
+            system_parts.extend(p for p in message.parts if isinstance(p, SystemPromptPart) and not turns)
+            if any(isinstance(p, UserPromptPart) for p in message.parts):
+                turns.append([message])
+                continue
+        if turns:
+            turns[-1].append(message)
+    return system_parts, turns
+
+@dataclass
+class HistoryReport:
+    tokens_before: int
+    tokens_after: int
+    turns_summarized: int = 0
+    summary: str = "none"  # none | cached | regenerated
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+class HistoryManager:
+    def __init__(self, budget_tokens: Optional[int] = None, keep_turns: Optional[int] = None,
+                 summarize: Optional[Summarizer] = None, cache_size: int = 256):
+        self.budget_tokens = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000")) if budget_tokens is None else budget_tokens
+        self.keep_turns = max(1, int(os.getenv("HISTORY_KEEP_TURNS", "2")) if keep_turns is None else keep_turns)
+        # Share of the budget a summary may take, and how full the verbatim window is after it moves
+        self.summary_share = 0.25
+        self.low_water = 0.5
+        self.summarize = summarize or llm_summarize
+        self._summaries = OrderedDict()  # fingerprint of folded turns -> summary
+        self._cache_size = cache_size
+
+    def _fingerprints(self, turns) -> List[str]:
+        """fingerprints[i] identifies turns[:i] by content (timestamps are ignored)."""
+        digest = hashlib.sha1()
+        fingerprints = [digest.hexdigest()]
+        for turn in turns:
+            digest.update(_transcript([turn]).encode("utf-8"))
+            digest.update(b"\x00")
+            fingerprints.append(digest.hexdigest())
+        return fingerprints
+
+    def _remember(self, fingerprint: str, summary: str):
+        self._summaries[fingerprint] = summary
+        self._summaries.move_to_end(fingerprint)
+        while len(self._summaries) > self._cache_size:
+            self._summaries.popitem(last=False)
+
+    async def prepare(self, messages: List[ModelMessage]) -> Tuple[List[ModelMessage], HistoryReport]:
+        """The history to send for the next turn, plus how many tokens were saved."""
+        before = message_tokens(messages)
+        system_parts, turns = split_turns(messages)
+        if self.budget_tokens <= 0 or before <= self.budget_tokens or len(turns) <= self.keep_turns:
+            return messages, HistoryReport(before, before)
+
+        turn_tokens = [message_tokens(t) for t in turns]
+        room = self.budget_tokens - sum(count_tokens(p.content) for p in system_parts) - int(self.budget_tokens * self.summary_share)
+        fingerprints = self._fingerprints(turns)
+        last_cut = len(turns) - self.keep_turns
+
+        # Smallest cut that fits the budget, and the largest cut already summarized
+        needed = next((c for c in range(last_cut + 1) if sum(turn_tokens[c:]) <= room), last_cut)
+        if needed == 0:
+            return messages, HistoryReport(before, before)
+        cached = next((c for c in range(last_cut, 0, -1) if fingerprints[c] in self._summaries), 0)
+        if cached >= needed:
+            cut, status = cached, "cached"
+            summary = self._summaries[fingerprints[cut]]
+            self._summaries.move_to_end(fingerprints[cut])
+        else:
+            # Move the window far enough to leave headroom for the next few turns
+            cut = next((c for c in range(needed, last_cut + 1) if sum(turn_tokens[c:]) <= room * self.low_water), last_cut)
+            previous = self._summaries.get(fingerprints[cached], "") if cached else ""
+            summary = await self._summarize(previous, turns[cached:cut])
+            self._remember(fingerprints[cut], summary)
+            status = "regenerated"
+
+        windowed = self._assemble(system_parts, summary, turns[cut:])
+        report = HistoryReport(before, message_tokens(windowed), turns_summarized=cut, summary=status)
+        logger.info(f"History window: {report.tokens_before} -> {report.tokens_after} tokens "
+                    f"({report.tokens_saved} saved, {cut} turns summarized, summary {status})")
+        return windowed, report
+
+    async def _summarize(self, previous: str, turns) -> str:
+        transcript = _transcript(turns)
+        max_chars = int(self.budget_tokens * self.summary_share) * 4
+        try:
+            summary = await self.summarize(previous, transcript)
+        except Exception as e:
+            logger.warning(f"History summarization failed, keeping an extractive summary instead. Error: {e}")
+            summary = f"{previous}\n{transcript}".strip()
+        # Keep the newest part if the summary overflows its share of the budget
+        return summary[-max_chars:]
+
+    @staticmethod
+    def _assemble(system_parts, summary: str, turns) -> List[ModelMessage]:
+        first = turns[0][0]
+        parts = [
+            *system_parts,
+            SystemPromptPart(content=f"Summary of the earlier conversation:\n{summary}"),
+            *(p for p in first.parts if not isinstance(p, SystemPromptPart)),
+        ]
+        return [replace(first, parts=parts), *turns[0][1:], *(m for turn in turns[1:] for m in turn)]
+
+_summary_agent = None
+
+async def llm_summarize(previous: str, transcript: str) -> str:
+    """Default summarizer: a small model (HISTORY_SUMMARY_MODEL) folds the transcript into the summary."""
+    global _summary_agent
+    if _summary_agent is None:
+        _summary_agent = Agent(
+            build_model(os.getenv("HISTORY_SUMMARY_MODEL", "openai:gpt-4o-mini"), "history_summary"),
+            output_type=str,
+            instructions=SUMMARY_PROMPT,
+            defer_model_check=True,
+        )
+    result = await _summary_agent.run(f"Previous summary:\n{previous or '(none)'}\n\nNew transcript:\n{transcript}")
+    return result.output.strip()
@@ -1,89 +1,156 @@
 import os
 from dataclasses import dataclass
 from typing import Optional
+from datetime import date
 from pydantic_ai import Agent
 from pydantic_ai.tools import RunContext
 from dotenv import load_dotenv
 from backend.crud import chore as chore_crud, meal as meal_crud, member as member_crud, recipe as recipe_crud
+from backend.crud.aio import AsyncCrud
 from backend.schemas import ChoreCreate, MealCreate, FamilyMemberCreate, RecipeCreate
 from backend.models import Chore, Meal, FamilyMember
 import threading
 import time
 import logging
-from backend.agents.prompt_watcher import watch_file_for_changes
-
-try:
-    from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler
-    WATCHDOG_AVAILABLE = True
-except ImportError:
-    WATCHDOG_AVAILABLE = False
+import functools
+from backend.cache import tool_cache, CHORE_TABLES, MEAL_TABLES, MEMBER_TABLES, RECIPE_TABLES
+from backend.database import table_versions
+from backend.agents.llm_backend import build_model
+from backend.agents.prompt_watcher import prompt_watcher
+from backend.agents.history import count_tokens
+from backend.metrics import timed_tool
 
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), '../../prompts/household_agent_system.md')
 
-def load_system_prompt():
+# Used when the prompt file cannot be read
+FALLBACK_SYSTEM_PROMPT = (
+    'You are a smart household assistant. Use the full conversation history to understand the user\'s intent and fill in missing information. '
+    'If the user provides information over multiple messages, combine them to determine the user\'s request. '
+    'You can manage chores, meals, family members, and recipes. '
+    'You have access to the following tools and should use them directly whenever the user requests a change, including renaming or updating any field. '
+    'For example, if the user says "rename chore 1 to Updated Chore", call update_chore(id=1, chore_name="Updated Chore").\n'
+    'Tools:\n'
+    '- create_chore(...): create a new chore.\n'
+    '- list_chores(): list all chores.\n'
+    '- update_chore(id, ...): update any field of a chore by ID, including the name. Example: update_chore(id=1, chore_name="Updated Chore").\n'
+    '- delete_chore(id): delete a chore by ID.\n'
+    '- create_meal(...): create a new meal.\n'
+    '- list_meals(): list all meals.\n'
+    '- update_meal(id, ...): update any field of a meal by ID.\n'
+    '- delete_meal(id): delete a meal by ID.\n'
+    '- create_member(...): add a family member.\n'
+    '- list_members(): list all family members.\n'
+    '- update_member(id, ...): update any field of a member by ID.\n'
+    '- delete_member(id): delete a member by ID.\n'
+    '- create_recipe(...): add a new recipe.\n'
+    '- list_recipes(): list all recipes.\n'
+    '- update_recipe(id, ...): update any field of a recipe by ID.\n'
+    '- delete_recipe(id): delete a recipe by ID.\n'
+    'Always use the appropriate tool for the user request, and extract all possible fields from the prompt.'
+)
+
+def load_system_prompt() -> str:
+    """Current version of the system prompt file (see prompt_watcher)."""
+    return prompt_watcher.snapshot(PROMPT_PATH, fallback=FALLBACK_SYSTEM_PROMPT).text
+
+# Rows a list_* tool shows at most, and the token budget of its whole output;
+# the rest is summarized as "N more" so tool output stays bounded as data grows
+TOOL_LIST_LIMIT = int(os.getenv("TOOL_LIST_LIMIT", "20"))
+TOOL_OUTPUT_TOKEN_BUDGET = int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", "1000"))
+
+def _tool_limit(limit: Optional[int]) -> int:
+    return max(1, min(limit or TOOL_LIST_LIMIT, TOOL_LIST_LIMIT))
+
+def _tool_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
     try:
-        with open(PROMPT_PATH, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception:
-        logging.warning("Failed to load system prompt from %s, using fallback prompt.", PROMPT_PATH, exc_info=True)
-        # Fallback to the old prompt if file missing
-        return (
-            'You are a smart household assistant. Use the full conversation history to understand the user\'s intent and fill in missing information. '
-            'If the user provides information over multiple messages, combine them to determine the user\'s request. '
-            'You can manage chores, meals, family members, and recipes. '
-            'You have access to the following tools and should use them directly whenever the user requests a change, including renaming or updating any field. '
-            'For example, if the user says "rename chore 1 to Updated Chore", call update_chore(id=1, chore_name="Updated Chore").\n'
-            'Tools:\n'
-            '- create_chore(...): create a new chore.\n'
-            '- list_chores(): list all chores.\n'
-            '- update_chore(id, ...): update any field of a chore by ID, including the name. Example: update_chore(id=1, chore_name="Updated Chore").\n'
-            '- delete_chore(id): delete a chore by ID.\n'
-            '- create_meal(...): create a new meal.\n'
-            '- list_meals(): list all meals.\n'
-            '- update_meal(id, ...): update any field of a meal by ID.\n'
-            '- delete_meal(id): delete a meal by ID.\n'
-            '- create_member(...): add a family member.\n'
-            '- list_members(): list all family members.\n'
-            '- update_member(id, ...): update any field of a member by ID.\n'
-            '- delete_member(id): delete a member by ID.\n'
-            '- create_recipe(...): add a new recipe.\n'
-            '- list_recipes(): list all recipes.\n'
-            '- update_recipe(id, ...): update any field of a recipe by ID.\n'
-            '- delete_recipe(id): delete a recipe by ID.\n'
-            'Always use the appropriate tool for the user request, and extract all possible fields from the prompt.'
-        )
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date `{value}`. Please use YYYY-MM-DD.")
+
+async def _tool_total(ctx, page, count_fn, filters) -> int:
+    # Only count when the page did not already hold every match
+    return len(page.items) if not page.next_cursor else await ctx.deps.crud.run(count_fn, **filters)
+
+def _capped_table(title: str, header: str, rows, total: int) -> str:
+    """Markdown table with as many rows as fit TOOL_OUTPUT_TOKEN_BUDGET, then how many more match."""
+    output = f"<!-- stage: confirming_info -->\n**{title}**\n\n{header}"
+    used, shown = count_tokens(output) + 40, 0  # room for the closing note
+    for row in rows:
+        cost = count_tokens(row) + 1
+        if shown and used + cost > TOOL_OUTPUT_TOKEN_BUDGET:
+            break
+        output += f"\n{row}"
+        used += cost
+        shown += 1
+    if total > shown:
+        output += f"\n\n_Showing {shown} of {total}; {total - shown} more. Narrow the list with filters, or use count_only for totals._"
+    return output
+
+def memoize_tool(tables):
+    """
+    Serve repeat calls of a read tool from tool_cache. The key is the tool name, its
+    arguments, the database and the versions of the tables it reads, as stored in the
+    database's table_versions, so a write committed to those tables by any worker
+    makes the next call hit the database again.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(ctx: RunContext[AssistantDeps], **kwargs):
+            bind = ctx.deps.db.get_bind()
+            # Through crud like every other query: off the event loop, and never while a
+            # tool running in parallel is using the session
+            versions = await ctx.deps.crud.run(table_versions, tables)
+            key = (fn.__name__, tuple(sorted((k, repr(v)) for k, v in kwargs.items())), str(bind.url), tables, versions)
+            entry = tool_cache.get(key)
+            if entry is not None:
+                return entry[0].decode("utf-8")
+            output = await fn(ctx, **kwargs)
+            tool_cache.put(key, output.encode("utf-8"), {})
+            return output
+        return wrapper
+    return decorator
 
 @dataclass
 class AssistantDeps:
     db: object  # SQLAlchemy session
+    crud: Optional[AsyncCrud] = None  # Async wrapper over db, built from it by default
+
+    def __post_init__(self):
+        if self.crud is None:
+            self.crud = AsyncCrud(self.db)
 
 class HouseholdAssistantAgent:
     def __init__(self):
         load_dotenv()
-        self.system_prompt = load_system_prompt()
         self.agent = Agent[
             AssistantDeps, str
         ](
-            os.getenv('OPENAI_MODEL', 'openai:gpt-4o'),
+            build_model(os.getenv('OPENAI_MODEL', 'openai:gpt-4o'), 'household'),
             deps_type=AssistantDeps,
             output_type=str,
-            system_prompt=self.system_prompt,
         )
+        # Read when a run starts, so a reloaded prompt applies from the next run on. Dynamic,
+        # so the system prompt part of an ongoing conversation's history is re-read too
+        # (a plain system prompt is only added to runs without message history)
+        self.agent.system_prompt(dynamic=True)(load_system_prompt)
         self._register_tools()
-        self._start_prompt_watcher()
 
-    def reload_prompt(self):
-        self.system_prompt = load_system_prompt()
-        self.agent.system_prompt = self.system_prompt
+    @property
+    def system_prompt(self) -> str:
+        return load_system_prompt()
 
-    def _start_prompt_watcher(self):
-        watch_file_for_changes(PROMPT_PATH, self.reload_prompt, logger_name="llm_agent.prompt_watcher")
+    def reload_prompt(self):
+        prompt_watcher.reload(PROMPT_PATH)
 
     def _register_tools(self):
-        @self.agent.tool
+        def tool(fn):
+            # Every call is timed in the agent_tool_duration_seconds metric
+            return self.agent.tool(timed_tool(fn))
+
+        @tool
         async def create_chore(ctx: RunContext[AssistantDeps], chore_name: str = None, assigned_members: list = None, start_date: str = None, repetition: str = None, due_time: Optional[str] = None, reminder: Optional[str] = None, type: Optional[str] = None):
-            db = ctx.deps.db
             # If any required info is missing, ask for it with collecting_info marker
             missing = []
             if not chore_name:
@@ -121,7 +188,7 @@ class HouseholdAssistantAgent:
                     type=type,
                     icon=None
                 )
-                db_chore = chore_crud.create_chore(db, chore)
+                db_chore = await ctx.deps.crud.run(chore_crud.create_chore, chore)
                 return (
                     "<!-- stage: created -->\n"
                     "🎉 **Chore Created!**\n\n"
@@ -137,28 +204,49 @@ class HouseholdAssistantAgent:
             except Exception as e:
                 return f"**Error creating chore:** `{e}`"
 
-        @self.agent.tool
-        async def list_chores(ctx: RunContext[AssistantDeps]):
-            db = ctx.deps.db
-            chores = chore_crud.get_chores(db)
-            if not chores:
+        @tool
+        @memoize_tool(CHORE_TABLES)
+        async def list_chores(ctx: RunContext[AssistantDeps], name_contains: Optional[str] = None, member: Optional[str] = None,
+                              start_date_from: Optional[str] = None, start_date_to: Optional[str] = None,
+                              repetition: Optional[str] = None, limit: Optional[int] = None, count_only: bool = False):
+            """
+            List chores, filtered on the server. Prefer filters over listing everything.
+
+            Args:
+                name_contains: Only chores whose name contains this text (case-insensitive).
+                member: Only chores assigned to this family member.
+                start_date_from: Only chores starting on or after this date (YYYY-MM-DD).
+                start_date_to: Only chores starting on or before this date (YYYY-MM-DD).
+                repetition: Only chores with this repetition (daily, weekly, one-time).
+                limit: Max rows to show; leave empty for the default cap.
+                count_only: Return only how many chores match, without rows.
+            """
+            try:
+                filters = dict(name_contains=name_contains, member=member, repetition=repetition,
+                               start_date_from=_tool_date(start_date_from), start_date_to=_tool_date(start_date_to))
+            except ValueError as e:
+                return f"<!-- stage: error -->\n{e}"
+            if count_only:
+                total = await ctx.deps.crud.run(chore_crud.count_chores, **filters)
+                return f"<!-- stage: confirming_info -->\n{total} chores match."
+            page = await ctx.deps.crud.run(chore_crud.list_chore_rows, limit=_tool_limit(limit), **filters)
+            if not page.items:
                 return "<!-- stage: confirming_info -->\nNo chores found."
-            # Markdown table
             header = '| ID | Chore Name | Assigned Members | Repetition | Due Time | Type |\n|---|---|---|---|---|---|'
             rows = [
-                f"| {c.id} | {c.chore_name} | {', '.join(str(m) for m in c.assigned_members)} | {c.repetition} | {c.due_time} | {c.type or ''} |"
-                for c in chores
+                f"| {c['id']} | {c['chore_name']} | {', '.join(str(m) for m in c['assigned_members'])} | {c['repetition']} | {c['due_time']} | {c['type'] or ''} |"
+                for c in page.items
             ]
-            return f"<!-- stage: confirming_info -->\n**Chores**\n\n{header}\n" + "\n".join(rows)
+            total = await _tool_total(ctx, page, chore_crud.count_chores, filters)
+            return _capped_table("Chores", header, rows, total)
 
-        @self.agent.tool
+        @tool
         async def update_chore(ctx: RunContext[AssistantDeps], id: int, **kwargs):
             """
             Update any field of a chore by ID, including the name. Example: update_chore(id=1, chore_name="Updated Chore").
             You can also update assigned_members, repetition, due_time, reminder, type, etc. Extract all possible fields from the user's request and call this tool directly.
             """
-            db = ctx.deps.db
-            c = chore_crud.get_chore(db, id)
+            c = await ctx.deps.crud.run(chore_crud.get_chore, id)
             if not c:
                 return f"<!-- stage: error -->\nChore with ID `{id}` not found. Please provide a valid chore ID."
             import re
@@ -176,16 +264,15 @@ class HouseholdAssistantAgent:
             data = {k: kwargs[k] for k in kwargs if k in ChoreCreate.model_fields and kwargs[k] is not None}
             if new_name:
                 data["chore_name"] = new_name
-            merged = {**c.__dict__, **data}
+            merged = {**{k: getattr(c, k) for k in ChoreCreate.model_fields}, **data}
             assigned = merged.get("assigned_members")
             if isinstance(assigned, str):
                 assigned = assigned.split(",") if "," in assigned else [assigned]
-            merged["assigned_members"] = data.get("assigned_members", assigned)
-            merged.pop("_sa_instance_state", None)
+            merged["assigned_members"] = [str(a).strip() for a in assigned]
             # If at least one field is being updated, apply the update immediately
             if data:
                 chore = ChoreCreate(**merged)
-                updated = chore_crud.update_chore(db, id, chore)
+                updated = await ctx.deps.crud.run(chore_crud.update_chore, id, chore)
                 return (
                     "<!-- stage: confirming_info -->\n"
                     f"✅ **Chore Updated!**\n\n"
@@ -204,17 +291,15 @@ class HouseholdAssistantAgent:
                 f"Current values:\n- Name: `{c.chore_name}`\n- Assigned: {', '.join(str(m) for m in c.assigned_members)}\n- Repetition: `{c.repetition}`\n- Due Time: `{c.due_time}`\n- Type: `{c.type or ''}`\n- Reminder: `{c.reminder or 'None'}`"
             )
 
-        @self.agent.tool
+        @tool
         async def delete_chore(ctx: RunContext[AssistantDeps], id: int, confirm: bool = False):
-            db = ctx.deps.db
             if not confirm:
                 return "<!-- stage: confirming_removal -->\nAre you sure you want to delete this chore? This action cannot be undone. Type 'Yes' to confirm."
-            ok = chore_crud.delete_chore(db, id)
+            ok = await ctx.deps.crud.run(chore_crud.delete_chore, id)
             return f"Chore {id} deleted." if ok else f"<!-- stage: error -->\nChore {id} not found."
 
-        @self.agent.tool
+        @tool
         async def create_meal(ctx: RunContext[AssistantDeps], meal_name: str = None, exist: bool = None, meal_kind: str = None, meal_date: str = None, dishes: str = None):
-            db = ctx.deps.db
             missing = []
             if not meal_name:
                 missing.append("meal_name")
@@ -258,7 +343,7 @@ class HouseholdAssistantAgent:
                 meal_date=meal_date,
                 dishes=dishes_list
             )
-            m = meal_crud.create_meal(db, meal)
+            m = await ctx.deps.crud.run(meal_crud.create_meal, meal)
             return (
                 "<!-- stage: created -->\n"
                 f"🎉 **Meal Created!**\n\n"
@@ -270,30 +355,54 @@ class HouseholdAssistantAgent:
                 "Meal planning complete!"
             )
 
-        @self.agent.tool
-        async def list_meals(ctx: RunContext[AssistantDeps]):
-            db = ctx.deps.db
-            meals = meal_crud.get_meals(db)
-            if not meals:
+        @tool
+        @memoize_tool(MEAL_TABLES)
+        async def list_meals(ctx: RunContext[AssistantDeps], name_contains: Optional[str] = None, meal_kind: Optional[str] = None,
+                             dish: Optional[str] = None, meal_date_from: Optional[str] = None, meal_date_to: Optional[str] = None,
+                             limit: Optional[int] = None, count_only: bool = False):
+            """
+            List planned meals, filtered on the server. Prefer filters over listing everything.
+
+            Args:
+                name_contains: Only meals whose name contains this text (case-insensitive).
+                meal_kind: Only meals of this kind (breakfast, lunch, dinner, snack).
+                dish: Only meals that include this dish.
+                meal_date_from: Only meals on or after this date (YYYY-MM-DD).
+                meal_date_to: Only meals on or before this date (YYYY-MM-DD).
+                limit: Max rows to show; leave empty for the default cap.
+                count_only: Return only how many meals match, without rows.
+            """
+            try:
+                filters = dict(name_contains=name_contains, meal_kind=meal_kind, dish=dish,
+                               meal_date_from=_tool_date(meal_date_from), meal_date_to=_tool_date(meal_date_to))
+            except ValueError as e:
+                return f"<!-- stage: error -->\n{e}"
+            if count_only:
+                total = await ctx.deps.crud.run(meal_crud.count_meals, **filters)
+                return f"<!-- stage: confirming_info -->\n{total} meals match."
+            page = await ctx.deps.crud.run(meal_crud.list_meal_rows, limit=_tool_limit(limit), **filters)
+            if not page.items:
                 return "<!-- stage: confirming_info -->\nNo meals found."
             header = '| ID | Meal Name | Kind | Date | Dishes |\n|---|---|---|---|---|'
             rows = [
-                f"| {m.id} | {m.meal_name} | {m.meal_kind} | {m.meal_date} | {', '.join(m.dishes) if m.dishes else ''} |"
-                for m in meals
+                f"| {m['id']} | {m['meal_name']} | {m['meal_kind']} | {m['meal_date']} | {', '.join(m['dishes'])} |"
+                for m in page.items
             ]
-            return f"<!-- stage: confirming_info -->\n**Meals**\n\n{header}\n" + "\n".join(rows)
+            total = await _tool_total(ctx, page, meal_crud.count_meals, filters)
+            return _capped_table("Meals", header, rows, total)
 
-        @self.agent.tool
+        @tool
         async def update_meal(ctx: RunContext[AssistantDeps], id: int, **kwargs):
-            db = ctx.deps.db
-            m = meal_crud.get_meal(db, id)
+            m = await ctx.deps.crud.run(meal_crud.get_meal, id)
             if not m:
                 return f"<!-- stage: error -->\nMeal with ID `{id}` not found. Please provide a valid meal ID."
             data = {k: kwargs[k] for k in kwargs if k in MealCreate.model_fields}
             if "dishes" in data and isinstance(data["dishes"], str):
                 data["dishes"] = [data["dishes"]]
-            meal = MealCreate(**{**m.__dict__, **data})
-            updated = meal_crud.update_meal(db, id, meal)
+            current = {k: getattr(m, k) for k in MealCreate.model_fields}
+            current["dishes"] = list(m.dishes)
+            meal = MealCreate(**{**current, **data})
+            updated = await ctx.deps.crud.run(meal_crud.update_meal, id, meal)
             return (
                 "<!-- stage: confirming_info -->\n"
                 f"✅ **Meal Updated!**\n\n"
@@ -304,21 +413,19 @@ class HouseholdAssistantAgent:
                 "If everything looks good, type **Done** to confirm or **Edit** to change anything."
             )
 
-        @self.agent.tool
+        @tool
         async def delete_meal(ctx: RunContext[AssistantDeps], id: int, confirm: bool = False):
-            db = ctx.deps.db
             if not confirm:
                 return "<!-- stage: confirming_removal -->\nAre you sure you want to delete this meal? This action cannot be undone. Type 'Yes' to confirm."
-            ok = meal_crud.delete_meal(db, id)
+            ok = await ctx.deps.crud.run(meal_crud.delete_meal, id)
             return f"Meal {id} deleted." if ok else f"<!-- stage: error -->\nMeal {id} not found."
 
-        @self.agent.tool
+        @tool
         async def create_member(ctx: RunContext[AssistantDeps], name: str = None, gender: Optional[str] = None, avatar: Optional[str] = None):
-            db = ctx.deps.db
             if not name:
                 return "<!-- stage: collecting_info -->\n👤 **Let's add a new family member!**\nWhat is their name? (e.g., `Jamie`)"
             member = FamilyMemberCreate(name=name, gender=gender, avatar=avatar)
-            db_member = member_crud.create_member(db, member)
+            db_member = await ctx.deps.crud.run(member_crud.create_member, member)
             return (
                 "<!-- stage: created -->\n"
                 "🎉 **Family Member Added!**\n\n"
@@ -328,28 +435,42 @@ class HouseholdAssistantAgent:
                 f"\nMember ID: `{db_member.id}`"
             )
 
-        @self.agent.tool
-        async def list_members(ctx: RunContext[AssistantDeps]):
-            db = ctx.deps.db
-            members = member_crud.get_members(db)
-            if not members:
+        @tool
+        @memoize_tool(MEMBER_TABLES)
+        async def list_members(ctx: RunContext[AssistantDeps], name_contains: Optional[str] = None, gender: Optional[str] = None,
+                               limit: Optional[int] = None, count_only: bool = False):
+            """
+            List family members, filtered on the server.
+
+            Args:
+                name_contains: Only members whose name contains this text (case-insensitive).
+                gender: Only members with this gender.
+                limit: Max rows to show; leave empty for the default cap.
+                count_only: Return only how many members match, without rows.
+            """
+            filters = dict(name_contains=name_contains, gender=gender)
+            if count_only:
+                total = await ctx.deps.crud.run(member_crud.count_members, **filters)
+                return f"<!-- stage: confirming_info -->\n{total} family members match."
+            page = await ctx.deps.crud.run(member_crud.list_member_rows, limit=_tool_limit(limit), **filters)
+            if not page.items:
                 return "<!-- stage: confirming_info -->\nNo family members found."
             header = '| ID | Name | Gender | Avatar |\n|---|---|---|---|'
             rows = [
-                f"| {m.id} | {m.name} | {m.gender or ''} | {m.avatar or ''} |"
-                for m in members
+                f"| {m['id']} | {m['name']} | {m['gender'] or ''} | {m['avatar'] or ''} |"
+                for m in page.items
             ]
-            return f"<!-- stage: confirming_info -->\n**Family Members**\n\n{header}\n" + "\n".join(rows)
+            total = await _tool_total(ctx, page, member_crud.count_members, filters)
+            return _capped_table("Family Members", header, rows, total)
 
-        @self.agent.tool
+        @tool
         async def update_member(ctx: RunContext[AssistantDeps], id: int, **kwargs):
-            db = ctx.deps.db
-            m = member_crud.get_member(db, id)
+            m = await ctx.deps.crud.run(member_crud.get_member, id)
             if not m:
                 return f"<!-- stage: error -->\nMember with ID `{id}` not found. Please provide a valid member ID."
             data = {k: kwargs[k] for k in kwargs if k in FamilyMemberCreate.model_fields}
             member = FamilyMemberCreate(**{**m.__dict__, **data})
-            updated = member_crud.update_member(db, id, member)
+            updated = await ctx.deps.crud.run(member_crud.update_member, id, member)
             return (
                 "<!-- stage: confirming_info -->\n"
                 f"✅ **Member Updated!**\n\n"
@@ -359,36 +480,49 @@ class HouseholdAssistantAgent:
                 "If everything looks good, type **Done** to confirm or **Edit** to change anything."
             )
 
-        @self.agent.tool
+        @tool
         async def delete_member(ctx: RunContext[AssistantDeps], id: int, confirm: bool = False):
-            db = ctx.deps.db
             if not confirm:
                 return "<!-- stage: confirming_removal -->\nAre you sure you want to delete this member? This action cannot be undone. Type 'Yes' to confirm."
-            ok = member_crud.delete_member(db, id)
+            ok = await ctx.deps.crud.run(member_crud.delete_member, id)
             return f"Member {id} deleted." if ok else f"<!-- stage: error -->\nMember {id} not found."
 
-        @self.agent.tool
-        async def list_recipes(ctx: RunContext[AssistantDeps]):
-            db = ctx.deps.db
-            recipes = recipe_crud.get_recipes(db)
-            if not recipes:
+        @tool
+        @memoize_tool(RECIPE_TABLES)
+        async def list_recipes(ctx: RunContext[AssistantDeps], name_contains: Optional[str] = None, kind: Optional[str] = None,
+                               limit: Optional[int] = None, count_only: bool = False):
+            """
+            List recipes, filtered on the server. Prefer filters over listing everything.
+
+            Args:
+                name_contains: Only recipes whose name contains this text (case-insensitive).
+                kind: Only recipes of this kind (breakfast, lunch, dinner, snack).
+                limit: Max rows to show; leave empty for the default cap.
+                count_only: Return only how many recipes match, without rows.
+            """
+            filters = dict(name_contains=name_contains, kind=kind)
+            if count_only:
+                total = await ctx.deps.crud.run(recipe_crud.count_recipes, **filters)
+                return f"<!-- stage: confirming_info -->\n{total} recipes match."
+            page = await ctx.deps.crud.run(recipe_crud.list_recipe_rows, limit=_tool_limit(limit), **filters)
+            if not page.items:
                 return "<!-- stage: confirming_info -->\nNo recipes found."
             header = '| ID | Name | Kind | Description |\n|---|---|---|---|'
             rows = [
-                f"| {r.id} | {r.name} | {r.kind} | {r.description or ''} |"
-                for r in recipes
+                f"| {r['id']} | {r['name']} | {r['kind']} | {r['description'] or ''} |"
+                for r in page.items
             ]
-            return f"<!-- stage: confirming_info -->\n**Recipes**\n\n{header}\n" + "\n".join(rows)
+            total = await _tool_total(ctx, page, recipe_crud.count_recipes, filters)
+            return _capped_table("Recipes", header, rows, total)
 
-        @self.agent.tool
+        @tool
         async def create_recipe(ctx: RunContext[AssistantDeps], name: str = None, kind: str = None, description: str = ""):
-            db = ctx.deps.db
             if not name:
                 return "<!-- stage: collecting_info -->\n🍲 **Let's add a new recipe!**\nWhat is the name of the recipe? (e.g., `Mapo Tofu`)"
             if not kind:
                 return "<!-- stage: collecting_info -->\n🍲 **What kind of recipe is this?**\nChoose one: `breakfast`, `lunch`, `dinner`, `snack`."
             recipe = RecipeCreate(name=name, kind=kind, description=description)
-            db_recipe = recipe_crud.create_recipe(db, recipe)
+            db_recipe = await ctx.deps.crud.run(recipe_crud.create_recipe, recipe)
             return (
                 "<!-- stage: created -->\n"
                 "🎉 **Recipe Created!**\n\n"
@@ -398,15 +532,14 @@ class HouseholdAssistantAgent:
                 f"\nRecipe ID: `{db_recipe.id}`"
             )
 
-        @self.agent.tool
+        @tool
         async def update_recipe(ctx: RunContext[AssistantDeps], id: int, **kwargs):
-            db = ctx.deps.db
-            r = recipe_crud.get_recipe(db, id)
+            r = await ctx.deps.crud.run(recipe_crud.get_recipe, id)
             if not r:
                 return f"<!-- stage: error -->\nRecipe with ID `{id}` not found. Please provide a valid recipe ID."
             data = {k: kwargs[k] for k in kwargs if k in RecipeCreate.model_fields}
             recipe = RecipeCreate(**{**r.__dict__, **data})
-            updated = recipe_crud.update_recipe(db, id, recipe)
+            updated = await ctx.deps.crud.run(recipe_crud.update_recipe, id, recipe)
             return (
                 "<!-- stage: confirming_info -->\n"
                 f"✅ **Recipe Updated!**\n\n"
@@ -416,10 +549,9 @@ class HouseholdAssistantAgent:
                 "If everything looks good, type **Done** to confirm or **Edit** to change anything."
             )
 
-        @self.agent.tool
+        @tool
         async def delete_recipe(ctx: RunContext[AssistantDeps], id: int, confirm: bool = False):
-            db = ctx.deps.db
             if not confirm:
                 return "<!-- stage: confirming_removal -->\nAre you sure you want to delete this recipe? This action cannot be undone. Type 'Yes' to confirm."
-            ok = recipe_crud.delete_recipe(db, id)
+            ok = await ctx.deps.crud.run(recipe_crud.delete_recipe, id)
             return f"Recipe {id} deleted." if ok else f"<!-- stage: error -->\nRecipe {id} not found."
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+Pluggable model backend for the agents, chosen with LLM_BACKEND.
+
+  live    the real provider model (default), with rate-limit retries
+  record  live, and every request/response pair is appended to a cassette
+  replay  no network: recorded responses are served from the cassettes by a
+          pydantic-ai FunctionModel, with LLM_REPLAY_LATENCY_MS before each
+          response and LLM_REPLAY_TOKEN_MS between streamed chunks
+  test    pydantic-ai's TestModel (calls every tool, then replies with a summary)
+
+Replayed responses go through the agent exactly like live ones, so tool calls
+still run against the database. Each agent has its own cassette,
+LLM_CASSETTE_DIR/<name>.json. A request is looked up by its full content
+(timestamps aside) first. If there is no exact match, the lookup falls back
+to the last user prompt and the tools whose results it carries. A request
+recorded several times is replayed in the recorded order, and the sequence
+starts over once it runs out.
+"""
+import os
+import json
+import asyncio
+import hashlib
+import threading
+from contextlib import AsyncExitStack, asynccontextmanager
+from pydantic_ai.messages import (
+    ModelMessagesTypeAdapter, ModelResponse, SystemPromptPart, TextPart, ToolCallPart,
+    ToolReturnPart, UserPromptPart, RetryPromptPart,
+)
+from pydantic_ai.models import infer_model
+from pydantic_ai.models.function import DeltaToolCall, FunctionModel
+from pydantic_ai.models.test import TestModel
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_core import to_jsonable_python
+from backend.agents.bulkhead import retry_rate_limited
+from backend.metrics import LLM_REQUEST_DURATION
+
+LLM_BACKENDS = ("live", "record", "replay", "test")
+
+def llm_backend() -> str:
+    backend = os.getenv("LLM_BACKEND", "live").lower()
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"LLM_BACKEND must be one of {', '.join(LLM_BACKENDS)}, got {backend!r}")
+    return backend
+
+def cassette_dir() -> str:
+    return os.getenv("LLM_CASSETTE_DIR", os.path.join(os.path.dirname(__file__), '../../cassettes'))
+
+class CassetteMiss(LookupError):
+    """Replay mode got a request that was never recorded."""
+
+def _part_key(part):
+    if isinstance(part, (SystemPromptPart, UserPromptPart, TextPart)):
+        return [part.part_kind, to_jsonable_python(part.content)]
+    if isinstance(part, ToolCallPart):
+        return [part.part_kind, part.tool_name, part.args_as_json_str()]
+    if isinstance(part, ToolReturnPart):
+        return [part.part_kind, part.tool_name, part.model_response_str()]
+    if isinstance(part, RetryPromptPart):
+        return [part.part_kind, part.tool_name, part.model_response()]
+    return [part.part_kind]
+
+def request_keys(messages):
+    """(exact key, fallback key) for the request a model is asked to answer."""
+    exact = hashlib.sha1(json.dumps([[_part_key(p) for p in m.parts] for m in messages]).encode("utf-8")).hexdigest()
+    last_user = next((to_jsonable_python(p.content) for m in reversed(messages) for p in m.parts if isinstance(p, UserPromptPart)), None)
+    tools = [p.tool_name for p in messages[-1].parts if isinstance(p, (ToolReturnPart, RetryPromptPart))] if messages else []
+    fallback = hashlib.sha1(json.dumps([last_user, tools]).encode("utf-8")).hexdigest()
+    return exact, fallback
+
+class Cassette:
+    """On-disk list of recorded interactions for one agent."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._interactions = None
+        self._served = {}  # key -> how many responses were replayed for it
+
+    def _load(self):
+        if self._interactions is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._interactions = json.load(f)["interactions"]
+            except FileNotFoundError:
+                self._interactions = []
+        return self._interactions
+
+    def record(self, messages, response: ModelResponse):
+        exact, fallback = request_keys(messages)
+        prompt = next((p.content for m in reversed(messages) for p in m.parts if isinstance(p, UserPromptPart)), None)
+        with self._lock:
+            interactions = self._load()
+            interactions.append({
+                "key": exact,
+                "fallback_key": fallback,
+                "prompt": to_jsonable_python(prompt),
+                "response": ModelMessagesTypeAdapter.dump_python([response], mode="json")[0],
+            })
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "interactions": interactions}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+
+    def response_for(self, messages) -> ModelResponse:
+        exact, fallback = request_keys(messages)
+        with self._lock:
+            interactions = self._load()
+            for field, key in (("key", exact), ("fallback_key", fallback)):
+                matches = [i for i in interactions if i[field] == key]
+                if matches:
+                    served = self._served.get((field, key), 0)
+                    self._served[(field, key)] = served + 1
+                    return ModelMessagesTypeAdapter.validate_python([matches[served % len(matches)]["response"]])[0]
+        raise CassetteMiss(f"No recorded response in {self.path} for this request; record it with LLM_BACKEND=record")
+
+class RecordingModel(WrapperModel):
+    """Passes requests to the wrapped model and appends each response to a cassette."""
+
+    def __init__(self, wrapped, cassette: Cassette):
+        super().__init__(wrapped)
+        self.cassette = cassette
+
+    async def request(self, messages, *args, **kwargs):
+        request = list(messages)
+        response, usage = await self.wrapped.request(messages, *args, **kwargs)
+        self.cassette.record(request, response)
+        return response, usage
+
+    @asynccontextmanager
+    async def request_stream(self, messages, model_settings, model_request_parameters):
+        request = list(messages)  # the agent appends to its history while the stream is consumed
+        async with self.wrapped.request_stream(messages, model_settings, model_request_parameters) as stream:
+            yield stream
+            self.cassette.record(request, stream.get())
+
+def replay_model(cassette: Cassette, latency_ms: float = None, token_ms: float = None) -> FunctionModel:
+    latency = (float(os.getenv("LLM_REPLAY_LATENCY_MS", "0")) if latency_ms is None else latency_ms) / 1000
+    token_delay = (float(os.getenv("LLM_REPLAY_TOKEN_MS", "0")) if token_ms is None else token_ms) / 1000
+
+    async def respond(messages, info):
+        response = cassette.response_for(messages)
+        if latency:
+            await asyncio.sleep(latency)
+        return ModelResponse(parts=response.parts, model_name=response.model_name)
+
+    async def stream(messages, info):
+        response = cassette.response_for(messages)
+        if latency:
+            await asyncio.sleep(latency)
+        for index, part in enumerate(response.parts):
+            if isinstance(part, TextPart):
+                # Word-sized chunks, roughly what a provider streams
+                words = part.content.split(" ")
+                for i, word in enumerate(words):
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                    yield word if i == len(words) - 1 else f"{word} "
+            elif isinstance(part, ToolCallPart):
+                yield {index: DeltaToolCall(name=part.tool_name, json_args=part.args_as_json_str(), tool_call_id=part.tool_call_id)}
+
+    return FunctionModel(respond, stream_function=stream)
+
+class RateLimitRetryModel(WrapperModel):
+    """
+    Model wrapper that retries rate-limited requests. The wrapped model is resolved
+    on first use, so a model name can be given before provider credentials are set.
+    """
+
+    def __init__(self, wrapped):
+        self._wrapped_spec = wrapped
+        self._wrapped = None
+
+    @property
+    def wrapped(self):
+        if self._wrapped is None:
+            self._wrapped = infer_model(self._wrapped_spec)
+        return self._wrapped
+
+    async def request(self, *args, **kwargs):
+        with LLM_REQUEST_DURATION.time(self.wrapped.model_name):
+            return await retry_rate_limited(lambda: self.wrapped.request(*args, **kwargs))
+
+    @asynccontextmanager
+    async def request_stream(self, messages, model_settings, model_request_parameters):
+        with LLM_REQUEST_DURATION.time(self.wrapped.model_name):
+            async with AsyncExitStack() as stack:
+                # Only opening the stream is retried; a failure mid-stream propagates
+                stream = await retry_rate_limited(
+                    lambda: stack.enter_async_context(self.wrapped.request_stream(messages, model_settings, model_request_parameters))
+                )
+                yield stream
+
+def build_model(model_name: str, cassette_name: str):
+    """The model an agent should use under the current LLM_BACKEND."""
+    backend = llm_backend()
+    if backend == "test":
+        return TestModel()
+    cassette = Cassette(os.path.join(cassette_dir(), f"{cassette_name}.json"))
+    if backend == "replay":
+        return replay_model(cassette)
+    live = RateLimitRetryModel(model_name)
+    return RecordingModel(live, cassette) if backend == "record" else live
@@ -1,7 +1,26 @@
+"""
+Hot reload of prompt files through one watcher per process.
+
+Every watched path is served by the same thread: a single watchdog observer
+feeds it change events when watchdog is installed, otherwise it polls the
+files' mtime and size every PROMPT_POLL_SECONDS. A burst of changes (an editor
+save often writes a file several times) is collapsed into one reload once the
+file has been quiet for PROMPT_RELOAD_DEBOUNCE_SECONDS. The file is then read
+once and published as a new immutable PromptSnapshot, if its content changed.
+
+Agents read prompt_watcher.snapshot(path) when a run starts, so a run sees one
+complete version of a prompt and the next run picks up the new one. No
+agent attribute is changed in place. PROMPT_HOT_RELOAD=0 turns the watcher
+thread off, e.g. for production workers.
+"""
 import os
-import threading
 import time
+import hashlib
 import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Optional
 
 try:
     from watchdog.observers import Observer
@@ -10,37 +29,209 @@ try:
 except ImportError:
     WATCHDOG_AVAILABLE = False
 
-def watch_file_for_changes(target_path, on_change, logger_name="prompt_watcher"):
-    logger = logging.getLogger(logger_name)
-    abs_path = os.path.abspath(target_path)
-    logger.info(f"Setting up watcher for {abs_path}")
-    if WATCHDOG_AVAILABLE:
-        class Handler(FileSystemEventHandler):
-            def on_modified(self, event):
-                if os.path.abspath(event.src_path) == abs_path:
-                    logger.info(f"Detected change in {abs_path}, reloading.")
-                    on_change()
-        observer = Observer()
-        handler = Handler()
-        observer.schedule(handler, os.path.dirname(abs_path), recursive=False)
-        observer.daemon = True
-        observer.start()
-        logger.info(f"Watchdog observer started for {abs_path}")
-    else:
-        def poll():
-            last_mtime = None
-            while True:
-                try:
-                    mtime = os.path.getmtime(abs_path)
-                    if last_mtime is None:
-                        last_mtime = mtime
-                    elif mtime != last_mtime:
-                        logger.info(f"Detected change in {abs_path} (polling), reloading.")
-                        on_change()
-                        last_mtime = mtime
-                except Exception as e:
-                    logger.warning(f"Polling error for {abs_path}: {e}")
-                time.sleep(2)
-        t = threading.Thread(target=poll, daemon=True)
-        t.start()
-        logger.info(f"Polling thread started for {abs_path}") 
\ No newline at end of file
+logger = logging.getLogger("prompt_watcher")
+
+@dataclass(frozen=True)
+class PromptSnapshot:
+    path: str
+    text: str
+    version: int  # 1 for the first load of a path, +1 for every change published since
+    digest: str
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _signature(path: str):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+class PromptWatcher:
+    def __init__(self, debounce_seconds: float, poll_seconds: float, use_watchdog: bool = WATCHDOG_AVAILABLE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.debounce_seconds = debounce_seconds
+        self.poll_seconds = poll_seconds
+        self.use_watchdog = use_watchdog
+        self._clock = clock
+        self._snapshots = {}  # path -> current PromptSnapshot
+        self._subscribers = defaultdict(list)  # path -> [on_change(snapshot)]
+        self._watched = {}  # path -> last seen (mtime_ns, size), for polling
+        self._pending = {}  # path -> clock time of its latest change event
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+        self._observer = None
+        self._scheduled_dirs = set()
+        self._running = False
+        self.events = 0
+        self.reloads = 0
+
+    def watch(self, path: str) -> str:
+        """Add path to the watched files (no I/O beyond a stat); returns its absolute path."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._watched:
+                self._watched[path] = _signature(path)
+                if self._observer is not None:
+                    self._schedule(path)
+        return path
+
+    def subscribe(self, path: str, on_change: Callable[[PromptSnapshot], None]):
+        """Call on_change(snapshot) whenever a new version of path is published."""
+        path = self.watch(path)
+        with self._lock:
+            self._subscribers[path].append(on_change)
+
+    def snapshot(self, path: str, fallback: Optional[str] = None) -> PromptSnapshot:
+        """Current snapshot of path, read on first use. If it cannot be read, fallback is used instead."""
+        path = self.watch(path)
+        current = self._snapshots.get(path)
+        if current is not None:
+            return current
+        try:
+            text = self._read(path)
+        except OSError as e:
+            if fallback is None:
+                raise
+            logger.warning(f"Failed to load prompt from {path}, using fallback. Error: {e}")
+            text = fallback
+        with self._lock:
+            # Another thread may have loaded it meanwhile; keep the first one published
+            return self._snapshots.setdefault(path, PromptSnapshot(path, text, 1, _digest(text)))
+
+    def reload(self, path: str) -> Optional[PromptSnapshot]:
+        """Read path now and publish it if its content changed; returns the new snapshot, if any."""
+        path = self.watch(path)
+        try:
+            text = self._read(path)
+        except OSError as e:
+            logger.warning(f"Failed to reload prompt from {path}, keeping the current version. Error: {e}")
+            return None
+        digest = _digest(text)
+        with self._lock:
+            current = self._snapshots.get(path)
+            if current is not None and current.digest == digest:
+                return None
+            snapshot = PromptSnapshot(path, text, current.version + 1 if current else 1, digest)
+            self._snapshots[path] = snapshot
+            subscribers = list(self._subscribers[path])
+            self.reloads += 1
+        logger.info(f"Prompt {path} reloaded as version {snapshot.version}")
+        for on_change in subscribers:
+            try:
+                on_change(snapshot)
+            except Exception:
+                logger.exception(f"Prompt change handler failed for {path}")
+        return snapshot
+
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def changed(self, path: str):
+        """Note a change event for path; it is reloaded once the file has been quiet for the debounce period."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._watched:
+                return
+            self._pending[path] = self._clock()
+            self.events += 1
+            self._wake.notify()
+
+    def _schedule(self, path: str):
+        directory = os.path.dirname(path)
+        if directory not in self._scheduled_dirs and os.path.isdir(directory):
+            self._observer.schedule(self._handler, directory, recursive=False)
+            self._scheduled_dirs.add(directory)
+
+    def start(self):
+        """Start the watcher thread (and the observer, with watchdog); a no-op when already running."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            if self.use_watchdog:
+                watcher = self
+
+                class Handler(FileSystemEventHandler):
+                    def on_any_event(self, event):
+                        for attr in ("src_path", "dest_path"):
+                            path = getattr(event, attr, None)
+                            if path:
+                                watcher.changed(path)
+
+                self._handler = Handler()
+                self._observer = Observer()
+                for path in self._watched:
+                    self._schedule(path)
+                self._observer.daemon = True
+                self._observer.start()
+            self._thread = threading.Thread(target=self._run, name="prompt-watcher", daemon=True)
+            self._thread.start()
+        logger.info(f"Prompt watcher started ({'watchdog' if self.use_watchdog else 'polling'}, {len(self._watched)} files)")
+
+    def stop(self):
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            observer, self._observer = self._observer, None
+            self._scheduled_dirs.clear()
+            thread, self._thread = self._thread, None
+            self._wake.notify()
+        if observer is not None:
+            observer.stop()
+        thread.join(timeout=5)
+
+    def _poll(self):
+        with self._lock:
+            watched = list(self._watched.items())
+        for path, seen in watched:
+            current = _signature(path)
+            if current != seen:
+                with self._lock:
+                    self._watched[path] = current
+                self.changed(path)
+
+    def _due(self, now: float):
+        """Take the pending paths that have been quiet for the debounce period. Call with the lock held."""
+        due = [p for p, t in self._pending.items() if now - t >= self.debounce_seconds]
+        for path in due:
+            del self._pending[path]
+        return due
+
+    def _publish(self, paths):
+        for path in paths:
+            # Only versions that were loaded are republished; the rest are read fresh on first use
+            if path in self._snapshots:
+                self.reload(path)
+
+    def _run(self):
+        next_poll = self._clock()
+        while True:
+            if not self.use_watchdog and self._clock() >= next_poll:
+                self._poll()
+                next_poll = self._clock() + self.poll_seconds
+            with self._lock:
+                if not self._running:
+                    return
+                now = self._clock()
+                due = self._due(now)
+                waits = [t + self.debounce_seconds - now for t in self._pending.values()]
+                if not self.use_watchdog:
+                    waits.append(next_poll - now)
+                if not due:
+                    self._wake.wait(max(0.0, min(waits)) if waits else None)
+                    continue
+            self._publish(due)
+
+prompt_watcher = PromptWatcher(
+    debounce_seconds=float(os.getenv("PROMPT_RELOAD_DEBOUNCE_SECONDS", "0.3")),
+    poll_seconds=float(os.getenv("PROMPT_POLL_SECONDS", "1")),
+)
+
+def hot_reload_enabled() -> bool:
+    return os.getenv("PROMPT_HOT_RELOAD", "1").lower() not in ("0", "false", "no")
@@ -0,0 +1,135 @@
+"""
+Cache of LLM stage classifications shared by the sync and async classifiers.
+
+Entries are keyed by the reply text and bounded by count, bytes and age. While
+a reply is being classified, concurrent async callers asking for the same reply
+wait for that one call instead of starting their own. clear() (called when the
+classifier prompt is reloaded) also bumps a generation counter, so a call that
+started under the old prompt does not store its result.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+class StageCache:
+    """Thread-safe LRU of reply -> stage, bounded by entry count, total bytes and a TTL."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()  # reply -> (stage, expires_at, size)
+        self._inflight = {}  # reply -> asyncio.Future of the call classifying it
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(reply: str, stage: str) -> int:
+        return len(reply.encode("utf-8")) + len(stage)
+
+    def _drop(self, reply: str):
+        _, _, size = self._entries.pop(reply)
+        self._bytes -= size
+
+    def get(self, reply: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(reply)
+            if entry is not None and entry[1] <= self._clock():
+                self._drop(reply)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(reply)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, reply: str, stage: str, generation: Optional[int] = None):
+        """Store a result; results of calls started before the last clear() are dropped."""
+        size = self._size(reply, stage)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if reply in self._entries:
+                self._drop(reply)
+            self._entries[reply] = (stage, self._clock() + self.ttl_seconds, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    async def get_or_classify(self, reply: str, classify: Callable[[str], Awaitable[str]]) -> str:
+        """Cached stage for reply, else classify(reply), shared with concurrent callers on this loop."""
+        stage = self.get(reply)
+        if stage is not None:
+            return stage
+        loop = asyncio.get_running_loop()
+        leader = None
+        with self._lock:
+            pending = self._inflight.get(reply)
+            if pending is not None and pending.get_loop() is loop:
+                self.coalesced += 1
+            else:
+                pending = loop.create_future()
+                self._inflight[reply] = pending
+                leader, generation = pending, self.generation
+        if pending is not leader:
+            # shield: a waiter being cancelled must not cancel the shared call
+            return await asyncio.shield(pending)
+        try:
+            stage = await classify(reply)
+        except asyncio.CancelledError:
+            leader.cancel()
+            raise
+        except Exception as e:
+            leader.set_exception(e)
+            leader.exception()  # retrieved here; waiters (if any) re-raise it
+            raise
+        else:
+            leader.set_result(stage)
+            self.put(reply, stage, generation)
+            return stage
+        finally:
+            with self._lock:
+                if self._inflight.get(reply) is leader:
+                    del self._inflight[reply]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._bytes = 0
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+stage_cache = StageCache(
+    max_entries=int(os.getenv("STAGE_CACHE_SIZE", "1024")),
+    max_bytes=int(os.getenv("STAGE_CACHE_MAX_BYTES", str(4 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("STAGE_CACHE_TTL_SECONDS", "3600")),
+)
@@ -1,128 +1,274 @@
 from pydantic_ai import Agent
 from pydantic import BaseModel
 from functools import lru_cache
+from collections import Counter
+from typing import List, Optional, Tuple
 import logging
 import os
-from backend.agents.prompt_watcher import watch_file_for_changes
-from backend.agents.stage_keywords import STAGE_KEYWORDS_PRIORITY
+import threading
+import time
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolReturnPart
+from backend.agents.prompt_watcher import PromptSnapshot, prompt_watcher
+from backend.agents import stage_keywords
+from backend.agents.stage_cache import stage_cache
+from backend.agents.bulkhead import llm_bulkhead
+from backend.agents.llm_backend import build_model
+from backend.metrics import STAGE_RESOLUTIONS, STAGE_RESOLUTION_DURATION
 import re
 
 class StageClassifierOutput(BaseModel):
     stage: str
 
 ALLOWED_STAGES = {"collecting_info", "confirming_info", "created", "error"}
+# Stages the agent and its tools announce with a <!-- stage: ... --> marker
+MARKER_STAGES = ALLOWED_STAGES | {"confirming_removal", "greeting"}
+STAGE_MARKER_RE = re.compile(r"<!--\s*stage:\s*([a-z_]+)\s*-->", re.IGNORECASE)
 
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), '../../prompts/stage_classifier_prompt.md')
 
-def load_classifier_prompt():
-    logger = logging.getLogger("stage_classifier")
-    try:
-        with open(PROMPT_PATH, 'r', encoding='utf-8') as f:
-            prompt = f.read()
-            logger.info(f"Loaded stage classifier prompt from {PROMPT_PATH}")
-            return prompt
-    except Exception as e:
-        logger.warning(f"Failed to load stage classifier prompt from {PROMPT_PATH}, using fallback. Error: {e}")
-        # Fallback: minimal prompt
-        return (
-            "You are a classifier. Given an assistant reply, classify it into one of these stages: collecting_info, confirming_info, created, error.\n"
-            "Only output the stage name, nothing else.\n"
-            "Reply:\n\"\"\"\n{reply}\n\"\"\"\nStage:"
-        )
+# Used when the prompt file cannot be read
+FALLBACK_CLASSIFIER_PROMPT = (
+    "You are a classifier. Given an assistant reply, classify it into one of these stages: collecting_info, confirming_info, created, error.\n"
+    "Only output the stage name, nothing else.\n"
+    "Reply:\n\"\"\"\n{reply}\n\"\"\"\nStage:"
+)
+
+CLASSIFIER_MODEL = 'openai:gpt-3.5-turbo'
+
+def classifier_prompt_snapshot() -> PromptSnapshot:
+    """Current version of the classifier prompt file (see prompt_watcher)."""
+    return prompt_watcher.snapshot(PROMPT_PATH, fallback=FALLBACK_CLASSIFIER_PROMPT)
 
-# Add a reload function and watcher setup
-_stage_classifier_prompt = load_classifier_prompt()
+def load_classifier_prompt() -> str:
+    return classifier_prompt_snapshot().text
+
+_stage_classifier_agent = None
+_agent_lock = threading.Lock()
+
+def get_stage_classifier_agent() -> Agent:
+    """The classifier agent, built on first use rather than at import."""
+    global _stage_classifier_agent
+    if _stage_classifier_agent is None:
+        with _agent_lock:
+            if _stage_classifier_agent is None:
+                # Classifications made under an older prompt no longer apply
+                prompt_watcher.subscribe(PROMPT_PATH, lambda snapshot: stage_cache.clear())
+                _stage_classifier_agent = Agent(
+                    build_model(CLASSIFIER_MODEL, 'stage_classifier'),
+                    output_type=StageClassifierOutput,
+                    # Read per request, so a reloaded prompt applies from the next classification on
+                    instructions=load_classifier_prompt,
+                    defer_model_check=True,
+                )
+    return _stage_classifier_agent
 
 def reload_prompt():
-    global _stage_classifier_prompt, stage_classifier_agent
+    """Re-read the classifier prompt now and drop cached classifications."""
     logger = logging.getLogger("stage_classifier")
-    _stage_classifier_prompt = load_classifier_prompt()
-    stage_classifier_agent.instructions = _stage_classifier_prompt
-    logger.info("Stage classifier prompt reloaded and agent updated.")
+    snapshot = prompt_watcher.reload(PROMPT_PATH)
+    stage_cache.clear()
+    logger.info(f"Stage classifier prompt reloaded ({f'version {snapshot.version}' if snapshot else 'unchanged'}).")
 
-watch_file_for_changes(PROMPT_PATH, reload_prompt, logger_name="stage_classifier.prompt_watcher")
+def _keyword_pattern(keyword: str) -> str:
+    # Keywords made only of word characters match as whole words; phrases with
+    # spaces or punctuation match anywhere. Replacing punctuation with spaces
+    # does not move word boundaries, so this matches the raw text directly.
+    if re.match(r'^\w+$', keyword):
+        return rf'\b{re.escape(keyword)}\b'
+    return re.escape(keyword)
 
-stage_classifier_agent = Agent(
-    'openai:gpt-3.5-turbo',
-    output_type=StageClassifierOutput,
-    instructions=_stage_classifier_prompt
-)
+@lru_cache(maxsize=512)
+def _compiled_keyword(keyword: str):
+    return re.compile(_keyword_pattern(keyword), re.IGNORECASE)
 
 def keyword_in_text(keyword, text):
     # Match as a whole word, ignoring case and punctuation
-    # Remove punctuation and symbols from text for matching
-    text_clean = re.sub(r'[^\w\s]', ' ', text)
-    # Use word boundaries for keywords with only word characters, else fallback to simple case-insensitive search
-    if re.match(r'^\w+$', keyword):
-        return re.search(rf'\b{re.escape(keyword)}\b', text_clean, re.IGNORECASE) is not None
+    return _compiled_keyword(keyword).search(text) is not None
+
+class StageKeywordMatcher:
+    """
+    STAGE_KEYWORDS_PRIORITY compiled to one alternation per stage, tried in priority
+    order, so a reply costs at most one scan per stage instead of one regex per
+    keyword. Recompiled when STAGE_KEYWORDS_PRIORITY is replaced by another list;
+    code that edits the lists in place calls rebuild().
+    """
+
+    def __init__(self):
+        self._source = None
+        self._patterns = []
+        self._lock = threading.Lock()
+
+    def rebuild(self):
+        """Recompile from the current keyword lists."""
+        with self._lock:
+            self._compile(stage_keywords.STAGE_KEYWORDS_PRIORITY)
+
+    def _compile(self, priority):
+        self._patterns = [
+            # Longest first, so the reported keyword is the most specific one.
+            # Matching lowercased text is about twice as fast as re.IGNORECASE.
+            (stage, re.compile("|".join(_keyword_pattern(k) for k in sorted({k.lower() for k in keywords}, key=len, reverse=True))))
+            for stage, keywords in priority if keywords
+        ]
+        self._source = priority
+
+    def _compiled(self):
+        # An identity check only: cheap enough for every reply
+        priority = stage_keywords.STAGE_KEYWORDS_PRIORITY
+        if priority is not self._source:
+            with self._lock:
+                if priority is not self._source:
+                    self._compile(priority)
+        return self._patterns
+
+    def match(self, text: str) -> Optional[Tuple[str, str]]:
+        """(stage, matched keyword) for the highest-priority stage with a keyword in text."""
+        text = text.lower()
+        for stage, pattern in self._compiled():
+            found = pattern.search(text)
+            if found:
+                return stage, found.group(0)
+        return None
+
+stage_keyword_matcher = StageKeywordMatcher()
+
+def _llm_output_stage(raw: str, reply: str) -> str:
+    """Map the classifier's raw output onto ALLOWED_STAGES ('other' -> collecting_info, else 'unknown')."""
+    logger = logging.getLogger("stage_classifier")
+    stage = raw.strip().lower()
+    logger.info(f"[STAGE LLM] Raw LLM output: '{stage}' for reply: {reply}")
+    if stage not in ALLOWED_STAGES:
+        if stage == "other":
+            logger.info(f"[STAGE LLM] LLM returned 'other', mapping to 'collecting_info' for reply: {reply}")
+            stage = "collecting_info"
+        else:
+            logger.warning(f"[STAGE LLM] LLM returned unknown stage '{stage}' for reply: {reply}")
+            stage = "unknown"
     else:
-        return re.search(re.escape(keyword), text, re.IGNORECASE) is not None
+        logger.info(f"[STAGE LLM] LLM output '{stage}' accepted for reply: {reply}")
+    return stage
 
-@lru_cache(maxsize=128)
 def classify_stage_llm(reply: str) -> str:
     logger = logging.getLogger("stage_classifier")
     try:
-        reply_lower = reply.lower()
-        for stage, keywords in STAGE_KEYWORDS_PRIORITY:
-            for kw in keywords:
-                if keyword_in_text(kw, reply_lower):
-                    logger.info(f"[STAGE OVERRIDE] Detected strong '{stage}' signal in reply: {reply} (matched phrase: '{kw}')")
-                    return stage
-        logger.info(f"[STAGE PROMPT] Classifying reply: {reply}")
-        result = stage_classifier_agent.run_sync({"reply": reply})
-        stage = result.output.stage.strip().lower()
-        logger.info(f"[STAGE LLM] Raw LLM output: '{stage}' for reply: {reply}")
-        if stage not in ALLOWED_STAGES:
-            if stage == "other":
-                logger.info(f"[STAGE LLM] LLM returned 'other', mapping to 'collecting_info' for reply: {reply}")
-                stage = "collecting_info"
-            else:
-                logger.warning(f"[STAGE LLM] LLM returned unknown stage '{stage}' for reply: {reply}")
-                stage = "unknown"
-        else:
-            logger.info(f"[STAGE LLM] LLM output '{stage}' accepted for reply: {reply}")
+        matched = stage_keyword_matcher.match(reply)
+        if matched:
+            logger.info(f"[STAGE OVERRIDE] Detected strong '{matched[0]}' signal in reply: {reply} (matched phrase: '{matched[1]}')")
+            return matched[0]
+        stage = stage_cache.get(reply)
+        if stage is None:
+            logger.info(f"[STAGE PROMPT] Classifying reply: {reply}")
+            generation = stage_cache.generation
+            result = get_stage_classifier_agent().run_sync(reply)
+            stage = _llm_output_stage(result.output.stage, reply)
+            stage_cache.put(reply, stage, generation)
         return stage
     except Exception as e:
         logger.warning(f"[STAGE FALLBACK] LLM failed, using heuristic. Error: {e}")
-        reply_lower = reply.lower()
-        for stage, keywords in STAGE_KEYWORDS_PRIORITY:
-            for word in keywords:
-                if keyword_in_text(word, reply_lower):
-                    logger.info(f"[STAGE FALLBACK] Heuristic matched '{stage}' for reply: {reply} (matched phrase: '{word}')")
-                    return stage
+        matched = stage_keyword_matcher.match(reply)
+        if matched:
+            logger.info(f"[STAGE FALLBACK] Heuristic matched '{matched[0]}' for reply: {reply} (matched phrase: '{matched[1]}')")
+            return matched[0]
         logger.info(f"[STAGE FALLBACK] No heuristic match, returning 'unknown' for reply: {reply}")
         return 'unknown'
 
 async def classify_stage_llm_async(reply: str) -> str:
     logger = logging.getLogger("stage_classifier")
     try:
-        reply_lower = reply.lower()
-        for stage, keywords in STAGE_KEYWORDS_PRIORITY:
-            for kw in keywords:
-                if keyword_in_text(kw, reply_lower):
-                    logger.info(f"[STAGE OVERRIDE] Detected strong '{stage}' signal in reply: {reply} (matched phrase: '{kw}')")
-                    return stage
+        matched = stage_keyword_matcher.match(reply)
+        if matched:
+            logger.info(f"[STAGE OVERRIDE] Detected strong '{matched[0]}' signal in reply: {reply} (matched phrase: '{matched[1]}')")
+            return matched[0]
         logger.info(f"[STAGE PROMPT] Classifying reply: {reply}")
-        result = await stage_classifier_agent.run(reply=reply)
-        stage = result.output.stage.strip().lower()
-        logger.info(f"[STAGE LLM] Raw LLM output: '{stage}' for reply: {reply}")
-        if stage not in ALLOWED_STAGES:
-            if stage == "other":
-                logger.info(f"[STAGE LLM] LLM returned 'other', mapping to 'collecting_info' for reply: {reply}")
-                stage = "collecting_info"
-            else:
-                logger.warning(f"[STAGE LLM] LLM returned unknown stage '{stage}' for reply: {reply}")
-                stage = "unknown"
-        else:
-            logger.info(f"[STAGE LLM] LLM output '{stage}' accepted for reply: {reply}")
-        return stage
+        return await _llm_stage_async(reply)
     except Exception as e:
         logger.warning(f"[STAGE FALLBACK] LLM failed, using heuristic. Error: {e}")
-        reply_lower = reply.lower()
-        for stage, keywords in STAGE_KEYWORDS_PRIORITY:
-            for word in keywords:
-                if keyword_in_text(word, reply_lower):
-                    logger.info(f"[STAGE FALLBACK] Heuristic matched '{stage}' for reply: {reply} (matched phrase: '{word}')")
-                    return stage
+        matched = stage_keyword_matcher.match(reply)
+        if matched:
+            logger.info(f"[STAGE FALLBACK] Heuristic matched '{matched[0]}' for reply: {reply} (matched phrase: '{matched[1]}')")
+            return matched[0]
         logger.info(f"[STAGE FALLBACK] No heuristic match, returning 'unknown' for reply: {reply}")
-        return 'unknown' 
\ No newline at end of file
+        return 'unknown'
+
+async def _classify_with_llm(reply: str) -> str:
+    async with llm_bulkhead.slot():
+        result = await get_stage_classifier_agent().run(reply)
+    return _llm_output_stage(result.output.stage, reply)
+
+async def _llm_stage_async(reply: str) -> str:
+    """LLM classification through the shared cache; identical concurrent replies share one call."""
+    return await stage_cache.get_or_classify(reply, _classify_with_llm)
+
+def extract_stage_marker(text: str) -> Optional[str]:
+    """Stage named by the first known <!-- stage: ... --> marker in text, if any."""
+    for match in STAGE_MARKER_RE.finditer(text or ""):
+        stage = match.group(1).lower()
+        if stage in MARKER_STAGES:
+            return stage
+    return None
+
+def stage_from_messages(messages: List[ModelMessage]) -> Optional[str]:
+    """
+    Stage marker from an agent run's messages: the final text reply first, then the
+    results of the last tool calls. Older tool results are not consulted, since a
+    later step of the run may have moved past them.
+    """
+    for message in reversed(messages):
+        if isinstance(message, ModelResponse):
+            for part in message.parts:
+                if isinstance(part, TextPart) and (stage := extract_stage_marker(part.content)):
+                    return stage
+        elif isinstance(message, ModelRequest):
+            returns = [p for p in message.parts if isinstance(p, ToolReturnPart)]
+            if returns:
+                return next((s for p in returns if (s := extract_stage_marker(p.model_response_str()))), None)
+    return None
+
+def heuristic_stage(reply: str) -> Optional[str]:
+    """First stage in STAGE_KEYWORDS_PRIORITY with a keyword in the reply, else None."""
+    matched = stage_keyword_matcher.match(reply)
+    return matched[0] if matched else None
+
+# How often each stage resolution path was taken since startup
+_stage_paths = Counter()
+_stage_paths_lock = threading.Lock()
+
+def _record_stage_path(path: str, seconds: float):
+    with _stage_paths_lock:
+        _stage_paths[path] += 1
+    STAGE_RESOLUTIONS.inc(path)
+    STAGE_RESOLUTION_DURATION.observe(seconds, path)
+
+def stage_path_counts() -> dict:
+    with _stage_paths_lock:
+        counts = {path: _stage_paths.get(path, 0) for path in ("marker", "heuristic", "llm", "unknown")}
+    total = sum(counts.values())
+    counts["llm_share"] = round(counts["llm"] / total, 4) if total else 0.0
+    return counts
+
+def offline_stage(reply: str, messages: Optional[List[ModelMessage]] = None) -> Tuple[Optional[str], str]:
+    """(stage, "marker" | "heuristic") without calling the LLM, or (None, "llm") when it is needed."""
+    stage = extract_stage_marker(reply) or (stage_from_messages(messages) if messages else None)
+    if stage:
+        return stage, "marker"
+    stage = heuristic_stage(reply)
+    return (stage, "heuristic") if stage else (None, "llm")
+
+async def resolve_stage(reply: str, messages: Optional[List[ModelMessage]] = None) -> str:
+    """
+    Stage of an agent reply, cheapest source first: a stage marker in the reply or
+    its tool results (messages, e.g. result.new_messages()), then the keyword
+    heuristic, and only then the LLM classifier.
+    """
+    logger = logging.getLogger("stage_classifier")
+    start = time.perf_counter()
+    stage, path = offline_stage(reply, messages)
+    if stage is None:
+        try:
+            stage, path = await _llm_stage_async(reply), "llm"
+        except Exception as e:
+            logger.warning(f"[STAGE FALLBACK] LLM classifier failed, returning 'unknown'. Error: {e}")
+            stage, path = "unknown", "unknown"
+    _record_stage_path(path, time.perf_counter() - start)
+    logger.info(f"[STAGE {path.upper()}] Resolved stage '{stage}' for reply: {reply}")
+    return stage
@@ -0,0 +1,142 @@
+"""
+In-process cache of serialized GET responses, invalidated by table versions.
+
+A cache key is (path, normalized query string, versions of the tables the
+response reads), so any committed write to those tables moves readers to a new
+key and the old entries simply age out of the LRU. The versions are read from
+the table_versions table (see backend.database), one primary-key lookup per
+request, so a write made by any worker process invalidates every worker's
+entries. The ETag is derived from the same key, which lets an unchanged list
+answer If-None-Match with a 304 without querying the data itself, and lets any
+worker recognise an ETag issued by another.
+"""
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from backend.database import table_versions
+from backend.fastjson import dumps
+
+class ResponseCache:
+    """Thread-safe LRU bounded by entry count and total body bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body: bytes, headers: dict):
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = (body, headers)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+# Outputs of the agent's read tools, keyed the same way (see llm_agent.memoize_tool)
+tool_cache = ResponseCache(
+    max_entries=int(os.getenv("TOOL_CACHE_SIZE", "256")),
+    max_bytes=int(os.getenv("TOOL_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+)
+
+# Tables each cached read depends on; a committed write to any of them invalidates it.
+# Each must be in database.VERSIONED_TABLES, or writes to it are never seen.
+CHORE_TABLES = ("chores", "chore_assignments")
+MEAL_TABLES = ("meals", "meal_dishes")
+MEMBER_TABLES = ("members",)
+RECIPE_TABLES = ("recipes",)
+
+@lru_cache(maxsize=None)
+def _adapter(response_type):
+    return TypeAdapter(response_type)
+
+def _cache_key(request: Request, db, tables):
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return (request.url.path, query, tuple(tables), table_versions(db, tables))
+
+def _etag(key) -> str:
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def cached_response(request: Request, db, tables, response_type, build) -> Response:
+    """
+    Serve a GET from the cache, or call build() -> (content, headers) and cache its JSON.
+
+    content is serialized with response_type, like FastAPI's response_model would;
+    response_type=None means content is already plain JSON data (dicts, lists).
+    Exceptions from build() (404, 400...) propagate and are not cached.
+    """
+    key = _cache_key(request, db, tables)
+    etag = _etag(key)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=cache_headers)
+    entry = response_cache.get(key)
+    if entry is None:
+        content, headers = build()
+        body = dumps(content) if response_type is None else _adapter(response_type).dump_json(content)
+        entry = (body, headers or {})
+        response_cache.put(key, *entry)
+    body, headers = entry
+    return Response(content=body, media_type="application/json", headers={**headers, **cache_headers})
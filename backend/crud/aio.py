@@ -0,0 +1,40 @@
+import asyncio
+import functools
+import os
+from typing import Any, Callable, TypeVar
+import anyio
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+_limiter = None
+
+def get_db_limiter() -> anyio.CapacityLimiter:
+    """Bounded pool of worker threads shared by all async DB calls (DB_THREADPOOL_SIZE)."""
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(int(os.getenv("DB_THREADPOOL_SIZE", "8")))
+    return _limiter
+
+class AsyncCrud:
+    """
+    Run the synchronous backend.crud functions for one Session off the event loop.
+
+    Calls go through a bounded thread pool so a slow commit never blocks other
+    coroutines. Calls on the same session are serialised, since a Session must
+    not be used from two threads at once.
+    """
+    def __init__(self, db: Session, offload: bool = None):
+        self.db = db
+        if offload is None:
+            offload = os.getenv("ASYNC_DB_MODE", "thread") != "inline"
+        self.offload = offload
+        self._lock = asyncio.Lock()
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call fn(db, *args, **kwargs), e.g. await crud.run(chore_crud.get_chores)."""
+        call = functools.partial(fn, self.db, *args, **kwargs)
+        if not self.offload:
+            return call()
+        async with self._lock:
+            return await anyio.to_thread.run_sync(call, limiter=get_db_limiter())
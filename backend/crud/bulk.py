@@ -0,0 +1,71 @@
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+ID_CHUNK_SIZE = 500
+
+def _chunks(items: List[Any], size: int = ID_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def insert_rows(db: Session, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Batched INSERT ... RETURNING id; ids come back in the same order as rows. Does not commit.
+
+    SQLite assigns rowids in increasing order as the rows of a multi-row INSERT are
+    written, so sorting the returned ids lines them up with the input without
+    falling back to one statement per row (as sort_by_parameter_order does here).
+    """
+    if not rows:
+        return []
+    # render_nulls keeps every row on the same column list, i.e. one batched statement
+    stmt = insert(model).returning(model.id)
+    return sorted(db.execute(stmt, rows, execution_options={"render_nulls": True}).scalars())
+
+def insert_child_rows(db: Session, model, rows: List[Dict[str, Any]]):
+    """Plain executemany INSERT for rows whose ids are not needed. Does not commit."""
+    if rows:
+        db.execute(insert(model), rows)
+
+def existing_ids(db: Session, model, ids: List[int]) -> List[int]:
+    found = set()
+    for chunk in _chunks(list(set(ids))):
+        found.update(db.execute(select(model.id).where(model.id.in_(chunk))).scalars())
+    return [i for i in ids if i in found]
+
+def update_rows(db: Session, model, rows: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+    """executemany UPDATE by primary key. Returns (updated ids, missing ids). Does not commit."""
+    ids = [row["id"] for row in rows]
+    found = set(existing_ids(db, model, ids))
+    present = [row for row in rows if row["id"] in found]
+    if present:
+        db.execute(update(model), present)
+    return [row["id"] for row in present], [i for i in ids if i not in found]
+
+def child_values(db: Session, fk_column, value_column, position_column, owner_ids: List[int]) -> Dict[int, List[Any]]:
+    """Ordered child values per owner id, e.g. {chore_id: [member, ...]}, in one query per id chunk."""
+    values: Dict[int, List[Any]] = {}
+    for chunk in _chunks(owner_ids):
+        stmt = select(fk_column, value_column).where(fk_column.in_(chunk)).order_by(fk_column, position_column)
+        for owner_id, value in db.execute(stmt):
+            values.setdefault(owner_id, []).append(value)
+    return values
+
+def delete_children(db: Session, fk_column, owner_ids: List[int]):
+    """DELETE every child row whose FK column points at one of owner_ids. Does not commit."""
+    for chunk in _chunks(owner_ids):
+        db.execute(delete(fk_column.class_).where(fk_column.in_(chunk)), execution_options={"synchronize_session": False})
+
+def delete_rows(db: Session, model, ids: List[int], children: Iterable[Any] = ()) -> Tuple[List[int], List[int]]:
+    """
+    DELETE rows by id, first removing child rows referencing them through the given FK columns.
+    Returns (deleted ids, missing ids). Does not commit.
+    """
+    found = existing_ids(db, model, ids)
+    for fk_column in children:
+        delete_children(db, fk_column, found)
+    for chunk in _chunks(found):
+        db.execute(delete(model).where(model.id.in_(chunk)), execution_options={"synchronize_session": False})
+    found_set = set(found)
+    return found, [i for i in ids if i not in found_set]
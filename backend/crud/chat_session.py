@@ -0,0 +1,106 @@
+import os
+import uuid
+import zlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List, Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from backend.models import ChatMessageORM, ChatSessionORM
+
+if TYPE_CHECKING:
+    from pydantic_ai.messages import ModelMessage
+
+# Sessions idle for longer than this are treated as gone and evicted
+CHAT_SESSION_TTL_SECONDS = int(os.getenv("CHAT_SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+_APPEND_RETRIES = 5
+
+# pydantic-ai is imported on first (de)serialization, so evicting sessions at startup does not load it
+def _encode(messages: List["ModelMessage"]) -> bytes:
+    from pydantic_ai.messages import ModelMessagesTypeAdapter
+    return zlib.compress(ModelMessagesTypeAdapter.dump_json(messages), 6)
+
+def _decode(blob: bytes) -> List["ModelMessage"]:
+    from pydantic_ai.messages import ModelMessagesTypeAdapter
+    return ModelMessagesTypeAdapter.validate_json(zlib.decompress(blob))
+
+def _now() -> datetime:
+    # Naive UTC, like the DateTime columns store it
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _cutoff(ttl_seconds: Optional[int]) -> datetime:
+    return _now() - timedelta(seconds=CHAT_SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+
+def create_session(db: Session) -> str:
+    """Start an empty conversation and return its id. Also evicts expired sessions."""
+    evict_expired(db, commit=False)
+    now = _now()
+    session_id = uuid.uuid4().hex
+    db.add(ChatSessionORM(id=session_id, message_count=0, version=0, created_at=now, updated_at=now))
+    db.commit()
+    return session_id
+
+def _get_live(db: Session, session_id: str) -> Optional[ChatSessionORM]:
+    row = db.get(ChatSessionORM, session_id, populate_existing=True)
+    if row is None or row.updated_at < _cutoff(None):
+        return None
+    return row
+
+def load_messages(db: Session, session_id: str) -> Optional[List["ModelMessage"]]:
+    """Stored messages of a session, or None if it does not exist or has expired."""
+    row = _get_live(db, session_id)
+    if row is None:
+        return None
+    batches = db.execute(
+        select(ChatMessageORM.messages).where(ChatMessageORM.session_id == session_id).order_by(ChatMessageORM.seq)
+    ).scalars()
+    return [m for blob in batches for m in _decode(blob)]
+
+def append_messages(db: Session, session_id: str, messages: List["ModelMessage"]) -> int:
+    """
+    Append messages to a session and return its new message count.
+
+    The messages are stored as one new batch row, so a turn costs the same however
+    long the conversation is. The session's version column is the optimistic lock:
+    if another worker saved a turn in between, re-read and append after it.
+    """
+    messages = list(messages)
+    for _ in range(_APPEND_RETRIES):
+        row = _get_live(db, session_id)
+        if row is None:
+            raise KeyError(session_id)
+        count = row.message_count + len(messages)
+        result = db.execute(
+            update(ChatSessionORM)
+            .where(ChatSessionORM.id == session_id, ChatSessionORM.version == row.version)
+            .values(message_count=count, version=row.version + 1, updated_at=_now()),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount == 1:
+            db.execute(insert(ChatMessageORM).values(session_id=session_id, seq=row.version + 1, messages=_encode(messages)))
+            db.commit()
+            return count
+        db.rollback()
+        logging.info(f"Chat session {session_id} changed concurrently, retrying append")
+    raise RuntimeError(f"Could not save chat session {session_id}: too many concurrent writes")
+
+def delete_session(db: Session, session_id: str) -> bool:
+    db.execute(delete(ChatMessageORM).where(ChatMessageORM.session_id == session_id), execution_options={"synchronize_session": False})
+    result = db.execute(delete(ChatSessionORM).where(ChatSessionORM.id == session_id), execution_options={"synchronize_session": False})
+    db.commit()
+    return result.rowcount > 0
+
+def evict_expired(db: Session, ttl_seconds: Optional[int] = None, commit: bool = True) -> int:
+    """Delete sessions idle for longer than the TTL; returns how many were removed."""
+    cutoff = _cutoff(ttl_seconds)
+    expired = select(ChatSessionORM.id).where(ChatSessionORM.updated_at < cutoff)
+    db.execute(delete(ChatMessageORM).where(ChatMessageORM.session_id.in_(expired)), execution_options={"synchronize_session": False})
+    result = db.execute(
+        delete(ChatSessionORM).where(ChatSessionORM.updated_at < cutoff),
+        execution_options={"synchronize_session": False},
+    )
+    if commit:
+        db.commit()
+    if result.rowcount:
+        logging.info(f"Evicted {result.rowcount} expired chat sessions")
+    return result.rowcount
@@ -1,14 +1,25 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from backend.models import ChoreORM
+from backend.models import ChoreORM, ChoreAssignmentORM
 from backend.schemas import ChoreCreate
-from typing import List, Optional
+from backend.crud import bulk
+from backend.crud.pagination import Page, keyset_paginate, contains, DEFAULT_PAGE_SIZE
+from typing import List, Optional, Tuple
+from datetime import date
 import logging
 
+CHORE_SORT_COLUMNS = {"id": ChoreORM.id, "start_date": ChoreORM.start_date, "chore_name": ChoreORM.chore_name}
+# Scalar columns of ChoreRead, selected as plain tuples by list_chore_rows
+CHORE_COLUMNS = (
+    ChoreORM.id, ChoreORM.chore_name, ChoreORM.icon, ChoreORM.start_date, ChoreORM.end_date,
+    ChoreORM.due_time, ChoreORM.repetition, ChoreORM.reminder, ChoreORM.type,
+)
+
 def create_chore(db: Session, chore: ChoreCreate) -> ChoreORM:
     db_chore = ChoreORM(
         chore_name=chore.chore_name,
         icon=chore.icon,
-        assigned_members=','.join(chore.assigned_members),
+        assigned_members=list(chore.assigned_members),
         start_date=chore.start_date,
         end_date=chore.end_date,
         due_time=chore.due_time,
@@ -25,6 +36,54 @@ def create_chore(db: Session, chore: ChoreCreate) -> ChoreORM:
 def get_chores(db: Session) -> List[ChoreORM]:
     return db.query(ChoreORM).all()
 
+def list_chores(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+                start_date_from: Optional[date] = None, start_date_to: Optional[date] = None,
+                repetition: Optional[str] = None, member: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    query = _filter_chores(db.query(ChoreORM), start_date_from, start_date_to, repetition, member, name_contains)
+    return keyset_paginate(query, ChoreORM.id, CHORE_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+
+def list_chore_rows(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+                    start_date_from: Optional[date] = None, start_date_to: Optional[date] = None,
+                    repetition: Optional[str] = None, member: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    """Same page as list_chores, but items are plain dicts built from column tuples (no ORM objects)."""
+    query = _filter_chores(db.query(*CHORE_COLUMNS), start_date_from, start_date_to, repetition, member, name_contains)
+    page = keyset_paginate(query, ChoreORM.id, CHORE_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+    members = bulk.child_values(
+        db, ChoreAssignmentORM.chore_id, ChoreAssignmentORM.member_name, ChoreAssignmentORM.position,
+        [row.id for row in page.items],
+    )
+    page.items = [{**row._mapping, "assigned_members": members.get(row.id, [])} for row in page.items]
+    return page
+
+def _filter_chores(query, start_date_from, start_date_to, repetition, member, name_contains=None):
+    if start_date_from:
+        query = query.filter(ChoreORM.start_date >= start_date_from)
+    if start_date_to:
+        query = query.filter(ChoreORM.start_date <= start_date_to)
+    if repetition:
+        query = query.filter(ChoreORM.repetition == repetition)
+    if member:
+        query = query.filter(ChoreORM.id.in_(select(ChoreAssignmentORM.chore_id).where(ChoreAssignmentORM.member_name == member)))
+    if name_contains:
+        query = query.filter(contains(ChoreORM.chore_name, name_contains))
+    return query
+
+def count_chores(db: Session, *, start_date_from: Optional[date] = None, start_date_to: Optional[date] = None,
+                 repetition: Optional[str] = None, member: Optional[str] = None, name_contains: Optional[str] = None) -> int:
+    """Number of rows the same filters would list."""
+    return _filter_chores(db.query(func.count(ChoreORM.id)), start_date_from, start_date_to, repetition, member, name_contains).scalar()
+
+def get_chores_for_member(db: Session, member_name: str) -> List[ChoreORM]:
+    # Uses the member_name index on chore_assignments instead of scanning every chore; in id order
+    return (
+        db.query(ChoreORM)
+        .join(ChoreAssignmentORM, ChoreAssignmentORM.chore_id == ChoreORM.id)
+        .filter(ChoreAssignmentORM.member_name == member_name)
+        .distinct()
+        .order_by(ChoreORM.id)
+        .all()
+    )
+
 def get_chore(db: Session, chore_id: int) -> Optional[ChoreORM]:
     return db.query(ChoreORM).filter(ChoreORM.id == chore_id).first()
 
@@ -34,7 +93,7 @@ def update_chore(db: Session, chore_id: int, chore: ChoreCreate) -> Optional[Cho
         return None
     db_chore.chore_name = chore.chore_name
     db_chore.icon = chore.icon
-    db_chore.assigned_members = ','.join(chore.assigned_members)
+    db_chore.assigned_members = list(chore.assigned_members)
     db_chore.start_date = chore.start_date
     db_chore.end_date = chore.end_date
     db_chore.due_time = chore.due_time
@@ -53,4 +112,40 @@ def delete_chore(db: Session, chore_id: int) -> bool:
     db.delete(db_chore)
     db.commit()
     logging.info(f"Deleted chore ID: {chore_id}")
-    return True 
\ No newline at end of file
+    return True 
+
+def _chore_columns(chore: ChoreCreate) -> dict:
+    return chore.model_dump(exclude={"assigned_members"})
+
+def _assignment_rows(chore_ids: List[int], chores: List[ChoreCreate]) -> List[dict]:
+    return [
+        {"chore_id": chore_id, "position": position, "member_name": name}
+        for chore_id, chore in zip(chore_ids, chores)
+        for position, name in enumerate(chore.assigned_members)
+    ]
+
+def create_chores_bulk(db: Session, chores: List[ChoreCreate]) -> List[int]:
+    """Insert many chores and their assignments in one transaction; returns ids in input order."""
+    ids = bulk.insert_rows(db, ChoreORM, [_chore_columns(c) for c in chores])
+    bulk.insert_child_rows(db, ChoreAssignmentORM, _assignment_rows(ids, chores))
+    db.commit()
+    logging.info(f"Bulk created {len(ids)} chores")
+    return ids
+
+def update_chores_bulk(db: Session, updates: List[Tuple[int, ChoreCreate]]) -> Tuple[List[int], List[int]]:
+    """Replace many chores by id in one transaction. Returns (updated ids, missing ids)."""
+    updated, missing = bulk.update_rows(db, ChoreORM, [{"id": chore_id, **_chore_columns(c)} for chore_id, c in updates])
+    found = set(updated)
+    present = [(chore_id, c) for chore_id, c in updates if chore_id in found]
+    bulk.delete_children(db, ChoreAssignmentORM.chore_id, [chore_id for chore_id, _ in present])
+    bulk.insert_child_rows(db, ChoreAssignmentORM, _assignment_rows([chore_id for chore_id, _ in present], [c for _, c in present]))
+    db.commit()
+    logging.info(f"Bulk updated {len(updated)} chores")
+    return updated, missing
+
+def delete_chores_bulk(db: Session, chore_ids: List[int]) -> Tuple[List[int], List[int]]:
+    """Delete many chores (and their assignments) in one transaction. Returns (deleted ids, missing ids)."""
+    deleted, missing = bulk.delete_rows(db, ChoreORM, chore_ids, children=[ChoreAssignmentORM.chore_id])
+    db.commit()
+    logging.info(f"Bulk deleted {len(deleted)} chores")
+    return deleted, missing
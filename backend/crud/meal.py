@@ -1,16 +1,24 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from backend.models import MealORM
+from backend.models import MealORM, MealDishORM
 from backend.schemas import MealCreate
-from typing import List, Optional
+from backend.crud import bulk
+from backend.crud.pagination import Page, keyset_paginate, contains, DEFAULT_PAGE_SIZE
+from typing import List, Optional, Tuple
+from datetime import date
 import logging
 
+MEAL_SORT_COLUMNS = {"id": MealORM.id, "meal_date": MealORM.meal_date, "meal_name": MealORM.meal_name}
+# Scalar columns of MealRead, selected as plain tuples by list_meal_rows
+MEAL_COLUMNS = (MealORM.id, MealORM.meal_name, MealORM.exist, MealORM.meal_kind, MealORM.meal_date)
+
 def create_meal(db: Session, meal: MealCreate) -> MealORM:
     db_meal = MealORM(
         meal_name=meal.meal_name,
         exist=meal.exist,
         meal_kind=meal.meal_kind,
         meal_date=meal.meal_date,
-        dishes=','.join(meal.dishes) if meal.dishes else None
+        dishes=list(meal.dishes or [])
     )
     db.add(db_meal)
     db.commit()
@@ -21,6 +29,51 @@ def create_meal(db: Session, meal: MealCreate) -> MealORM:
 def get_meals(db: Session) -> List[MealORM]:
     return db.query(MealORM).all()
 
+def list_meals(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+               meal_date_from: Optional[date] = None, meal_date_to: Optional[date] = None,
+               meal_kind: Optional[str] = None, dish: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    query = _filter_meals(db.query(MealORM), meal_date_from, meal_date_to, meal_kind, dish, name_contains)
+    return keyset_paginate(query, MealORM.id, MEAL_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+
+def list_meal_rows(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+                   meal_date_from: Optional[date] = None, meal_date_to: Optional[date] = None,
+                   meal_kind: Optional[str] = None, dish: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    """Same page as list_meals, but items are plain dicts built from column tuples (no ORM objects)."""
+    query = _filter_meals(db.query(*MEAL_COLUMNS), meal_date_from, meal_date_to, meal_kind, dish, name_contains)
+    page = keyset_paginate(query, MealORM.id, MEAL_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+    dishes = bulk.child_values(db, MealDishORM.meal_id, MealDishORM.dish, MealDishORM.position, [row.id for row in page.items])
+    page.items = [{**row._mapping, "dishes": dishes.get(row.id, [])} for row in page.items]
+    return page
+
+def _filter_meals(query, meal_date_from, meal_date_to, meal_kind, dish, name_contains=None):
+    if meal_date_from:
+        query = query.filter(MealORM.meal_date >= meal_date_from)
+    if meal_date_to:
+        query = query.filter(MealORM.meal_date <= meal_date_to)
+    if meal_kind:
+        query = query.filter(MealORM.meal_kind == meal_kind)
+    if dish:
+        query = query.filter(MealORM.id.in_(select(MealDishORM.meal_id).where(MealDishORM.dish == dish)))
+    if name_contains:
+        query = query.filter(contains(MealORM.meal_name, name_contains))
+    return query
+
+def count_meals(db: Session, *, meal_date_from: Optional[date] = None, meal_date_to: Optional[date] = None,
+                meal_kind: Optional[str] = None, dish: Optional[str] = None, name_contains: Optional[str] = None) -> int:
+    """Number of rows the same filters would list."""
+    return _filter_meals(db.query(func.count(MealORM.id)), meal_date_from, meal_date_to, meal_kind, dish, name_contains).scalar()
+
+def get_meals_with_dish(db: Session, dish: str) -> List[MealORM]:
+    # Uses the dish index on meal_dishes instead of scanning every meal; in id order
+    return (
+        db.query(MealORM)
+        .join(MealDishORM, MealDishORM.meal_id == MealORM.id)
+        .filter(MealDishORM.dish == dish)
+        .distinct()
+        .order_by(MealORM.id)
+        .all()
+    )
+
 def get_meal(db: Session, meal_id: int) -> Optional[MealORM]:
     return db.query(MealORM).filter(MealORM.id == meal_id).first()
 
@@ -32,7 +85,7 @@ def update_meal(db: Session, meal_id: int, meal: MealCreate) -> Optional[MealORM
     db_meal.exist = meal.exist
     db_meal.meal_kind = meal.meal_kind
     db_meal.meal_date = meal.meal_date
-    db_meal.dishes = ','.join(meal.dishes) if meal.dishes else None
+    db_meal.dishes = list(meal.dishes or [])
     db.commit()
     db.refresh(db_meal)
     logging.info(f"Updated meal: {db_meal.meal_name} (ID: {db_meal.id})")
@@ -45,4 +98,40 @@ def delete_meal(db: Session, meal_id: int) -> bool:
     db.delete(db_meal)
     db.commit()
     logging.info(f"Deleted meal ID: {meal_id}")
-    return True 
\ No newline at end of file
+    return True
+
+def _meal_columns(meal: MealCreate) -> dict:
+    return meal.model_dump(exclude={"dishes"})
+
+def _dish_rows(meal_ids: List[int], meals: List[MealCreate]) -> List[dict]:
+    return [
+        {"meal_id": meal_id, "position": position, "dish": dish}
+        for meal_id, meal in zip(meal_ids, meals)
+        for position, dish in enumerate(meal.dishes or [])
+    ]
+
+def create_meals_bulk(db: Session, meals: List[MealCreate]) -> List[int]:
+    """Insert many meals and their dishes in one transaction; returns ids in input order."""
+    ids = bulk.insert_rows(db, MealORM, [_meal_columns(m) for m in meals])
+    bulk.insert_child_rows(db, MealDishORM, _dish_rows(ids, meals))
+    db.commit()
+    logging.info(f"Bulk created {len(ids)} meals")
+    return ids
+
+def update_meals_bulk(db: Session, updates: List[Tuple[int, MealCreate]]) -> Tuple[List[int], List[int]]:
+    """Replace many meals by id in one transaction. Returns (updated ids, missing ids)."""
+    updated, missing = bulk.update_rows(db, MealORM, [{"id": meal_id, **_meal_columns(m)} for meal_id, m in updates])
+    found = set(updated)
+    present = [(meal_id, m) for meal_id, m in updates if meal_id in found]
+    bulk.delete_children(db, MealDishORM.meal_id, [meal_id for meal_id, _ in present])
+    bulk.insert_child_rows(db, MealDishORM, _dish_rows([meal_id for meal_id, _ in present], [m for _, m in present]))
+    db.commit()
+    logging.info(f"Bulk updated {len(updated)} meals")
+    return updated, missing
+
+def delete_meals_bulk(db: Session, meal_ids: List[int]) -> Tuple[List[int], List[int]]:
+    """Delete many meals (and their dishes) in one transaction. Returns (deleted ids, missing ids)."""
+    deleted, missing = bulk.delete_rows(db, MealORM, meal_ids, children=[MealDishORM.meal_id])
+    db.commit()
+    logging.info(f"Bulk deleted {len(deleted)} meals")
+    return deleted, missing
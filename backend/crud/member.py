@@ -1,9 +1,15 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from backend.models import FamilyMemberORM
 from backend.schemas import FamilyMemberCreate
-from typing import List, Optional
+from backend.crud import bulk
+from backend.crud.pagination import Page, keyset_paginate, contains, DEFAULT_PAGE_SIZE
+from typing import List, Optional, Tuple
 import logging
 
+MEMBER_SORT_COLUMNS = {"id": FamilyMemberORM.id, "name": FamilyMemberORM.name}
+MEMBER_COLUMNS = (FamilyMemberORM.id, FamilyMemberORM.name, FamilyMemberORM.gender, FamilyMemberORM.avatar)
+
 def create_member(db: Session, member: FamilyMemberCreate) -> FamilyMemberORM:
     db_member = FamilyMemberORM(
         name=member.name,
@@ -19,6 +25,32 @@ def create_member(db: Session, member: FamilyMemberCreate) -> FamilyMemberORM:
 def get_members(db: Session) -> List[FamilyMemberORM]:
     return db.query(FamilyMemberORM).all()
 
+def list_members(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+                 name: Optional[str] = None, gender: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    query = _filter_members(db.query(FamilyMemberORM), name, gender, name_contains)
+    return keyset_paginate(query, FamilyMemberORM.id, MEMBER_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+
+def list_member_rows(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+                     name: Optional[str] = None, gender: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    """Same page as list_members, but items are plain dicts built from column tuples."""
+    query = _filter_members(db.query(*MEMBER_COLUMNS), name, gender, name_contains)
+    page = keyset_paginate(query, FamilyMemberORM.id, MEMBER_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+    page.items = [dict(row._mapping) for row in page.items]
+    return page
+
+def _filter_members(query, name, gender, name_contains=None):
+    if name:
+        query = query.filter(FamilyMemberORM.name == name)
+    if gender:
+        query = query.filter(FamilyMemberORM.gender == gender)
+    if name_contains:
+        query = query.filter(contains(FamilyMemberORM.name, name_contains))
+    return query
+
+def count_members(db: Session, *, name: Optional[str] = None, gender: Optional[str] = None, name_contains: Optional[str] = None) -> int:
+    """Number of rows the same filters would list."""
+    return _filter_members(db.query(func.count(FamilyMemberORM.id)), name, gender, name_contains).scalar()
+
 def get_member(db: Session, member_id: int) -> Optional[FamilyMemberORM]:
     return db.query(FamilyMemberORM).filter(FamilyMemberORM.id == member_id).first()
 
@@ -41,4 +73,25 @@ def delete_member(db: Session, member_id: int) -> bool:
     db.delete(db_member)
     db.commit()
     logging.info(f"Deleted member ID: {member_id}")
-    return True 
\ No newline at end of file
+    return True
+
+def create_members_bulk(db: Session, members: List[FamilyMemberCreate]) -> List[int]:
+    """Insert many members in one transaction; returns ids in input order."""
+    ids = bulk.insert_rows(db, FamilyMemberORM, [m.model_dump() for m in members])
+    db.commit()
+    logging.info(f"Bulk created {len(ids)} members")
+    return ids
+
+def update_members_bulk(db: Session, updates: List[Tuple[int, FamilyMemberCreate]]) -> Tuple[List[int], List[int]]:
+    """Replace many members by id in one transaction. Returns (updated ids, missing ids)."""
+    updated, missing = bulk.update_rows(db, FamilyMemberORM, [{"id": member_id, **m.model_dump()} for member_id, m in updates])
+    db.commit()
+    logging.info(f"Bulk updated {len(updated)} members")
+    return updated, missing
+
+def delete_members_bulk(db: Session, member_ids: List[int]) -> Tuple[List[int], List[int]]:
+    """Delete many members in one transaction. Returns (deleted ids, missing ids)."""
+    deleted, missing = bulk.delete_rows(db, FamilyMemberORM, member_ids)
+    db.commit()
+    logging.info(f"Bulk deleted {len(deleted)} members")
+    return deleted, missing
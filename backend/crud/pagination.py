@@ -0,0 +1,78 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Date, and_, or_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    if isinstance(value, date):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, last_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return sort, value, int(last_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def parse_sort(sort: str, sort_columns: Dict[str, Any]):
+    """Split 'field' / '-field' into (column, descending), validating against sort_columns."""
+    descending = sort.startswith("-")
+    field = sort[1:] if descending else sort
+    if field not in sort_columns:
+        raise ValueError(f"Cannot sort by '{field}'. Choose one of: {', '.join(sort_columns)}")
+    return sort_columns[field], descending
+
+def keyset_paginate(query: Query, id_column, sort_columns: Dict[str, Any], *, sort: str = "id",
+                    limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+    """
+    Seek-based pagination ordered by (sort column, id).
+
+    Instead of OFFSET, each page continues after the last (value, id) pair seen,
+    so any page costs one index range scan no matter how deep it is.
+    limit=None returns everything after the cursor.
+    """
+    sort_column, descending = parse_sort(sort, sort_columns)
+    if cursor:
+        cursor_sort, value, last_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError("Cursor was issued for a different sort order")
+        if isinstance(sort_column.type, Date) and value is not None:
+            value = date.fromisoformat(value)
+        if sort_column is id_column:
+            query = query.filter(id_column < last_id if descending else id_column > last_id)
+        elif descending:
+            query = query.filter(or_(sort_column < value, and_(sort_column == value, id_column < last_id)))
+        else:
+            query = query.filter(or_(sort_column > value, and_(sort_column == value, id_column > last_id)))
+    order = [sort_column.desc(), id_column.desc()] if descending else [sort_column.asc(), id_column.asc()]
+    if sort_column is id_column:
+        order = order[:1]
+    query = query.order_by(*order)
+    if limit is None:
+        return Page(items=query.all())
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort_column.key), getattr(last, id_column.key))
+    return Page(items=rows, next_cursor=next_cursor)
+
+def contains(column, value: str):
+    """Case-insensitive substring filter; % and _ in value match literally."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
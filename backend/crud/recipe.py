@@ -1,7 +1,24 @@
 from sqlalchemy.orm import Session
 from backend.models import RecipeORM
 from backend.schemas import RecipeCreate
-from sqlalchemy import or_
+from backend.crud import bulk
+from backend.crud.pagination import Page, keyset_paginate, contains, DEFAULT_PAGE_SIZE
+from sqlalchemy import func, or_, text
+from typing import List, Optional, Tuple
+
+RECIPE_SORT_COLUMNS = {"id": RecipeORM.id, "name": RecipeORM.name}
+RECIPE_COLUMNS = (RecipeORM.id, RecipeORM.name, RecipeORM.kind, RecipeORM.description)
+
+SEARCH_TOP_K = 10
+# Share of the query's trigrams a recipe name must contain to count as a match
+SEARCH_MIN_SIMILARITY = 0.5
+# FTS candidates (best bm25 first) re-scored by trigram similarity per result slot
+SEARCH_CANDIDATES_PER_RESULT = 20
+
+_FTS_CANDIDATES = text(
+    "SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH :match "
+    "ORDER BY bm25(recipes_fts, 10.0, 2.0, 1.0) LIMIT :limit"
+)
 
 def create_recipe(db: Session, recipe: RecipeCreate):
     db_recipe = RecipeORM(**recipe.model_dump())
@@ -16,9 +33,73 @@ def get_recipe(db: Session, recipe_id: int):
 def get_recipes(db: Session):
     return db.query(RecipeORM).all()
 
-def search_recipes(db: Session, query: str):
-    # Fuzzy search by name (case-insensitive, partial match)
-    return db.query(RecipeORM).filter(RecipeORM.name.ilike(f"%{query}%")).all()
+def list_recipes(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+                 kind: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    query = _filter_recipes(db.query(RecipeORM), kind, name_contains)
+    return keyset_paginate(query, RecipeORM.id, RECIPE_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+
+def list_recipe_rows(db: Session, *, limit: Optional[int] = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, sort: str = "id",
+                     kind: Optional[str] = None, name_contains: Optional[str] = None) -> Page:
+    """Same page as list_recipes, but items are plain dicts built from column tuples."""
+    query = _filter_recipes(db.query(*RECIPE_COLUMNS), kind, name_contains)
+    page = keyset_paginate(query, RecipeORM.id, RECIPE_SORT_COLUMNS, sort=sort, limit=limit, cursor=cursor)
+    page.items = [dict(row._mapping) for row in page.items]
+    return page
+
+def _filter_recipes(query, kind, name_contains=None):
+    if kind:
+        query = query.filter(RecipeORM.kind == kind)
+    if name_contains:
+        query = query.filter(contains(RecipeORM.name, name_contains))
+    return query
+
+def count_recipes(db: Session, *, kind: Optional[str] = None, name_contains: Optional[str] = None) -> int:
+    """Number of rows the same filters would list."""
+    return _filter_recipes(db.query(func.count(RecipeORM.id)), kind, name_contains).scalar()
+
+def _normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+def _trigrams(value: str) -> set:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+def _similarity(query: str, query_trigrams: set, recipe: RecipeORM) -> float:
+    name = _normalize(recipe.name)
+    if query in name:
+        # Whole query appears in the name; shorter names are the closer match
+        return 1.0 + len(query) / max(len(name), 1)
+    score = len(query_trigrams & _trigrams(name)) / len(query_trigrams)
+    other = _normalize(f"{recipe.kind} {recipe.description or ''}")
+    if query in other:
+        score = max(score, 0.9)
+    return score
+
+def search_recipes(db: Session, query: str, limit: int = SEARCH_TOP_K) -> List[RecipeORM]:
+    """
+    Relevance-ranked fuzzy search over recipe name, kind and description, top `limit` results.
+
+    On SQLite the recipes_fts trigram index supplies candidates sharing any trigram
+    with the query (so typos still hit); they are re-ranked by the share of query
+    trigrams found in the name. Queries shorter than a trigram use a name LIKE.
+    """
+    q = _normalize(query)
+    if not q:
+        return []
+    if len(q) < 3 or db.get_bind().dialect.name != "sqlite":
+        return db.query(RecipeORM).filter(contains(RecipeORM.name, q)).order_by(RecipeORM.name).limit(limit).all()
+    query_trigrams = _trigrams(q)
+    match = " OR ".join('"' + t.replace('"', '""') + '"' for t in sorted(query_trigrams))
+    ids = db.execute(_FTS_CANDIDATES, {"match": match, "limit": limit * SEARCH_CANDIDATES_PER_RESULT}).scalars().all()
+    if not ids:
+        return []
+    rank = {recipe_id: position for position, recipe_id in enumerate(ids)}
+    scored = [
+        (_similarity(q, query_trigrams, recipe), recipe)
+        for recipe in db.query(RecipeORM).filter(RecipeORM.id.in_(ids)).all()
+    ]
+    scored = [item for item in scored if item[0] >= SEARCH_MIN_SIMILARITY]
+    scored.sort(key=lambda item: (-item[0], rank[item[1].id]))
+    return [recipe for _, recipe in scored[:limit]]
 
 def delete_recipe(db: Session, recipe_id: int):
     recipe = db.query(RecipeORM).filter(RecipeORM.id == recipe_id).first()
@@ -37,4 +118,22 @@ def update_recipe(db: Session, recipe_id: int, recipe: RecipeCreate):
     db_recipe.description = recipe.description
     db.commit()
     db.refresh(db_recipe)
-    return db_recipe 
\ No newline at end of file
+    return db_recipe
+
+def create_recipes_bulk(db: Session, recipes: List[RecipeCreate]) -> List[int]:
+    """Insert many recipes in one transaction; returns ids in input order."""
+    ids = bulk.insert_rows(db, RecipeORM, [r.model_dump() for r in recipes])
+    db.commit()
+    return ids
+
+def update_recipes_bulk(db: Session, updates: List[Tuple[int, RecipeCreate]]):
+    """Replace many recipes by id in one transaction. Returns (updated ids, missing ids)."""
+    updated, missing = bulk.update_rows(db, RecipeORM, [{"id": recipe_id, **r.model_dump()} for recipe_id, r in updates])
+    db.commit()
+    return updated, missing
+
+def delete_recipes_bulk(db: Session, recipe_ids: List[int]):
+    """Delete many recipes in one transaction. Returns (deleted ids, missing ids)."""
+    deleted, missing = bulk.delete_rows(db, RecipeORM, recipe_ids)
+    db.commit()
+    return deleted, missing
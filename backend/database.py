@@ -1,12 +1,224 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import os
+import time
+import secrets
+import threading
+import logging
+from itertools import chain
+from sqlalchemy import Column, Integer, String, Table, create_engine, event, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from backend.metrics import DB_POOL_CHECKOUT_WAIT, DB_STATEMENT_DURATION
 
 Base = declarative_base()
 
-def get_engine(db_url=None):
+DEFAULT_DB_URL = "sqlite:///./app.db"
+
+def get_db_url():
+    """Resolve the database URL, honouring TEST_DB_URL then DATABASE_URL."""
+    return os.environ.get("TEST_DB_URL") or os.environ.get("DATABASE_URL") or DEFAULT_DB_URL
+
+def _is_memory_sqlite(db_url):
+    return db_url.startswith("sqlite") and (":memory:" in db_url or db_url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"))
+
+def get_pool_settings():
+    """Pool sizing knobs, configurable via environment variables."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "0").lower() in ("1", "true", "yes"),
+    }
+
+# PRAGMAs applied to every new SQLite connection, selected with SQLITE_PROFILE.
+# "performance": WAL lets readers run alongside the single writer, and
+# synchronous=NORMAL only fsyncs at checkpoints (still corruption-safe in WAL).
+SQLITE_PROFILES = {
+    "legacy": {},
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+    },
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+        "cache_size": -64000,  # KiB (negative) => 64 MB page cache
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PRAGMAS = ("journal_mode", "synchronous", "busy_timeout", "foreign_keys", "cache_size", "mmap_size", "temp_store")
+
+def get_sqlite_pragmas(profile=None, memory=False):
+    """PRAGMAs for a profile, with per-PRAGMA overrides from SQLITE_<NAME> env vars."""
+    profile = profile or os.getenv("SQLITE_PROFILE", "performance")
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE '{profile}'. Choose one of: {', '.join(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name in SQLITE_PRAGMAS:
+        value = os.getenv(f"SQLITE_{name.upper()}")
+        if value:
+            pragmas[name] = value
+    if memory:
+        # No WAL or memory mapping for in-memory databases
+        pragmas.pop("journal_mode", None)
+        pragmas.pop("mmap_size", None)
+    return pragmas
+
+def _apply_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waits (opening a new connection included)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+def get_engine(db_url=None, sqlite_profile=None, **pool_kwargs):
     if db_url is None:
-        db_url = "sqlite:///./app.db"
-    return create_engine(db_url, connect_args={"check_same_thread": False})
+        db_url = DEFAULT_DB_URL
+    connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
+    memory = _is_memory_sqlite(db_url)
+    if memory:
+        # In-memory SQLite uses a singleton pool; sizing options do not apply
+        pool_kwargs = {}
+    else:
+        pool_kwargs.setdefault("poolclass", TimedQueuePool)
+    engine = create_engine(db_url, connect_args=connect_args, **pool_kwargs)
+    if db_url.startswith("sqlite"):
+        pragmas = get_sqlite_pragmas(sqlite_profile, memory=memory)
+        if pragmas:
+            _apply_pragmas(engine, pragmas)
+            logging.getLogger("database").debug(f"SQLite PRAGMAs for {db_url}: {pragmas}")
+    return engine
+
+_STATEMENT_OPERATIONS = {"select", "insert", "update", "delete", "pragma", "begin", "commit", "rollback"}
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_start"].pop()
+    operation = statement.lstrip()[:8].split(None, 1)[0].lower() if statement.strip() else "other"
+    DB_STATEMENT_DURATION.observe(elapsed, operation if operation in _STATEMENT_OPERATIONS else "other")
+
+@event.listens_for(Engine, "handle_error")
+def _drop_statement_timer(context):
+    starts = context.connection.info.get("statement_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
 
 def get_session_local(engine):
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Process-wide registry: one engine and sessionmaker per DB URL
+_registry = {}
+_registry_lock = threading.Lock()
+
+def get_registered_engine(db_url=None):
+    """Return the shared engine for db_url, creating it (with pool settings) on first use."""
+    return _get_entry(db_url)[0]
+
+def get_registered_sessionmaker(db_url=None):
+    """Return the shared sessionmaker bound to the engine for db_url."""
+    return _get_entry(db_url)[1]
+
+def _get_entry(db_url):
+    if db_url is None:
+        db_url = get_db_url()
+    entry = _registry.get(db_url)
+    if entry is None:
+        with _registry_lock:
+            entry = _registry.get(db_url)
+            if entry is None:
+                engine = get_engine(db_url, **get_pool_settings())
+                entry = (engine, get_session_local(engine))
+                _registry[db_url] = entry
+    return entry
+
+def registered_engines():
+    with _registry_lock:
+        return [engine for engine, _ in _registry.values()]
+
+def dispose_engines():
+    """Dispose every registered engine and clear the registry (app shutdown)."""
+    with _registry_lock:
+        entries = list(_registry.values())
+        _registry.clear()
+    for engine, _ in entries:
+        engine.dispose()
+
+# Per-table write versions, kept in the table_versions table. Every flush or bulk
+# statement that writes to a table bumps its row in the same transaction, so the
+# bump commits (or rolls back) with the write and every worker process reads the
+# same versions; caches key on them instead of re-reading the data. The
+# GENERATION row gets a random value whenever table_versions is created, so a
+# recreated database never reuses the versions of the one it replaced.
+GENERATION = "__generation__"
+
+# The tables some cache in backend.cache reads. Writes to any other table (chat
+# sessions, for one) skip the extra UPDATE, which on SQLite would contend for the
+# single write lock for nothing.
+VERSIONED_TABLES = frozenset({"chores", "chore_assignments", "meals", "meal_dishes", "members", "recipes"})
+
+TABLE_VERSIONS = Table(
+    "table_versions", Base.metadata,
+    Column("name", String, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+def table_versions(db, tables):
+    """Database generation followed by the version of each table, as a tuple in the given order."""
+    names = (GENERATION, *tables)
+    rows = dict(db.execute(select(TABLE_VERSIONS.c.name, TABLE_VERSIONS.c.version).where(TABLE_VERSIONS.c.name.in_(names))).all())
+    return tuple(rows.get(name, 0) for name in names)
+
+def bump_table_versions(connection, tables):
+    """Bump the versions of tables (those in VERSIONED_TABLES) within connection's current transaction."""
+    tables = sorted(VERSIONED_TABLES.intersection(tables))
+    if not tables:
+        return
+    bumped = connection.execute(
+        update(TABLE_VERSIONS).where(TABLE_VERSIONS.c.name.in_(tables)).values(version=TABLE_VERSIONS.c.version + 1)
+    ).rowcount
+    if bumped < len(tables):
+        # Tables versioned after table_versions was created
+        existing = set(connection.execute(select(TABLE_VERSIONS.c.name).where(TABLE_VERSIONS.c.name.in_(tables))).scalars())
+        connection.execute(insert(TABLE_VERSIONS), [{"name": t, "version": 1} for t in tables if t not in existing])
+
+@event.listens_for(TABLE_VERSIONS, "after_create")
+def _seed_table_versions(target, connection, **kw):
+    rows = [{"name": GENERATION, "version": secrets.randbits(31)}]
+    rows += [{"name": name, "version": 0} for name in sorted(VERSIONED_TABLES)]
+    connection.execute(insert(target), rows)
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_tables(session, flush_context):
+    tables = {t.name for obj in chain(session.new, session.dirty, session.deleted) for t in inspect(obj).mapper.tables}
+    bump_table_versions(session.connection(), tables)
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_executed_tables(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the unit of work
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table.name
+        if table in VERSIONED_TABLES:
+            bump_table_versions(orm_execute_state.session.connection(), [table])
@@ -1,13 +1,10 @@
-import os
-from backend.database import get_engine, get_session_local
+from backend.database import get_registered_sessionmaker
 from sqlalchemy.orm import Session
 
 def get_db():
-    db_url = os.environ.get("TEST_DB_URL")
-    engine = get_engine(db_url)
-    SessionLocal = get_session_local(engine)
+    SessionLocal = get_registered_sessionmaker()
     db: Session = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
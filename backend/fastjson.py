@@ -0,0 +1,34 @@
+"""
+Fast JSON encoding for API responses.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise, so the app runs either way (pip install orjson to enable it).
+"""
+import os
+import json
+from datetime import date, datetime
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    """Compact JSON bytes; dates and datetimes are written in ISO format."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def strict_responses() -> bool:
+    """STRICT_RESPONSES=1 builds list responses from ORM objects validated through the Read schemas."""
+    return os.getenv("STRICT_RESPONSES", "0").lower() in ("1", "true", "yes")
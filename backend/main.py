@@ -1,34 +1,60 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
-from typing import List, Optional, Dict, Any
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 from backend.models import Chore, Meal, FamilyMember
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from datetime import date
 from fastapi.middleware.cors import CORSMiddleware
 from backend.schemas import ChoreCreate, ChoreRead, MealCreate, MealRead, FamilyMemberCreate, FamilyMemberRead, RecipeCreate, RecipeRead
+from backend.schemas import BulkItemError, BulkCreateResult, BulkUpdateResult, BulkDeleteRequest, BulkDeleteResult
 from backend.crud import chore as chore_crud, meal as meal_crud, member as member_crud, recipe as recipe_crud
+from backend.crud import chat_session as chat_session_crud
+from backend.crud.pagination import Page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from backend.deps import get_db
 from backend.logging_config import setup_logging, get_logger
-from backend.database import Base, get_engine
+from backend.database import Base, get_registered_engine, get_registered_sessionmaker, dispose_engines, registered_engines
+from backend.metrics import AGENT_RUN_DURATION, MetricsMiddleware, registry as metrics_registry
+from backend.migrations import upgrade as upgrade_schema
+from backend.cache import cached_response, response_cache, tool_cache, CHORE_TABLES, MEAL_TABLES, MEMBER_TABLES, RECIPE_TABLES
+from backend.fastjson import FastJSONResponse, strict_responses
+from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
 import traceback
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi import Body
-from backend.agents.llm_agent import HouseholdAssistantAgent, AssistantDeps
+from backend.agents.prompt_watcher import prompt_watcher, hot_reload_enabled
 import json
-from backend.utils import normalize_message_history
-from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelRequest, ModelResponse, UserPromptPart, SystemPromptPart, TextPart
-from pydantic_core import to_jsonable_python
 import re
 import logging
 import os
-import openai
+import threading
 from functools import lru_cache
-from backend.agents.stage_classifier import classify_stage_llm, classify_stage_llm_async
+from backend.agents.stage_cache import stage_cache
+from backend.agents.bulkhead import BulkheadFull, llm_bulkhead
+
+# pydantic-ai, the agents and the stage classifier are imported by the chat
+# endpoints on first use, so importing the app (and serving the CRUD API) does not load them
+if TYPE_CHECKING:
+    from backend.agents.history import HistoryManager
+    from backend.agents.llm_agent import AssistantDeps, HouseholdAssistantAgent
 
 setup_logging()
 logger = get_logger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled engine per process: created here, disposed on shutdown
+    engine = get_registered_engine()
+    upgrade_schema(engine)
+    with get_registered_sessionmaker()() as db:
+        chat_session_crud.evict_expired(db)
+    # Prompt hot-reload runs only in a served app; the agents themselves are built on first use
+    if hot_reload_enabled():
+        prompt_watcher.start()
+    yield
+    prompt_watcher.stop()
+    dispose_engines()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,11 +62,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
+
+def _pool_connections_in_use():
+    return {(engine.url.database or engine.url.drivername,): engine.pool.checkedout()
+            for engine in registered_engines() if hasattr(engine.pool, "checkedout")}
 
-# Create tables if not exist
-engine = get_engine()
-Base.metadata.create_all(bind=engine)
+metrics_registry.gauge("db_pool_connections_in_use", "Pooled DB connections currently checked out", ("database",), _pool_connections_in_use)
+metrics_registry.gauge("llm_slots_in_use", "Agent and classifier runs holding an LLM bulkhead slot", (), lambda: {(): llm_bulkhead.stats()["active"]})
+metrics_registry.gauge("llm_slots_queued", "Agent and classifier runs waiting for an LLM bulkhead slot", (), lambda: {(): llm_bulkhead.stats()["queued"]})
 
 # In-memory storage
 chores: List[Chore] = []
@@ -50,13 +82,51 @@ members: List[FamilyMember] = []
 chore_id_counter = 1
 meal_id_counter = 1
 
-# Initialize the household assistant agent
-household_agent = HouseholdAssistantAgent()
+_household_agent = None
+_history_manager = None
+_agents_lock = threading.Lock()
+
+def get_household_agent() -> "HouseholdAssistantAgent":
+    """The household assistant agent, built on first use so importing this module stays cheap."""
+    global _household_agent
+    if _household_agent is None:
+        with _agents_lock:
+            if _household_agent is None:
+                from backend.agents.llm_agent import HouseholdAssistantAgent
+                _household_agent = HouseholdAssistantAgent()
+    return _household_agent
+
+def get_history_manager() -> "HistoryManager":
+    """Keeps the history sent to the agent within HISTORY_TOKEN_BUDGET; created on first use."""
+    global _history_manager
+    if _history_manager is None:
+        with _agents_lock:
+            if _history_manager is None:
+                from backend.agents.history import HistoryManager
+                _history_manager = HistoryManager()
+    return _history_manager
+
+def __getattr__(name):
+    # `from backend.main import household_agent` (or history_manager) keeps working, and builds it then
+    if name == "household_agent":
+        return get_household_agent()
+    if name == "history_manager":
+        return get_history_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Request, agent, tool, stage classifier and DB timings in the Prometheus text format."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {**response_cache.stats(), "tools": tool_cache.stats()}
+
 # Chore endpoints
 @app.post("/chores", response_model=ChoreRead)
 def create_chore(chore: ChoreCreate, db: Session = Depends(get_db)):
@@ -64,15 +134,48 @@ def create_chore(chore: ChoreCreate, db: Session = Depends(get_db)):
     return _chore_orm_to_read(db_chore)
 
 @app.get("/chores", response_model=List[ChoreRead])
-def list_chores(db: Session = Depends(get_db)):
-    return [_chore_orm_to_read(c) for c in chore_crud.get_chores(db)]
+def list_chores(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    start_date_from: Optional[date] = None,
+    start_date_to: Optional[date] = None,
+    repetition: Optional[str] = None,
+    member: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return _list_response(
+        request, db, CHORE_TABLES, List[ChoreRead], chore_crud.list_chores, chore_crud.list_chore_rows, _chore_orm_to_read,
+        limit=limit, cursor=cursor, sort=sort,
+        start_date_from=start_date_from, start_date_to=start_date_to, repetition=repetition, member=member,
+    )
+
+@app.post("/chores/bulk", response_model=BulkCreateResult)
+def create_chores_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    chores = _validate_batch(ChoreCreate, items)
+    return {"ids": chore_crud.create_chores_bulk(db, chores)}
+
+@app.put("/chores/bulk", response_model=BulkUpdateResult)
+def update_chores_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    updates = [(item.id, ChoreCreate(**item.model_dump(exclude={"id"}))) for item in _validate_batch(ChoreRead, items)]
+    updated, not_found = chore_crud.update_chores_bulk(db, updates)
+    return {"updated": updated, "not_found": not_found}
+
+@app.post("/chores/bulk/delete", response_model=BulkDeleteResult)
+def delete_chores_bulk(req: BulkDeleteRequest, db: Session = Depends(get_db)):
+    _check_batch_size(req.ids)
+    deleted, not_found = chore_crud.delete_chores_bulk(db, req.ids)
+    return {"deleted": deleted, "not_found": not_found}
 
 @app.get("/chores/{chore_id}", response_model=ChoreRead)
-def get_chore(chore_id: int, db: Session = Depends(get_db)):
-    c = chore_crud.get_chore(db, chore_id)
-    if not c:
-        raise HTTPException(status_code=404, detail="Chore not found")
-    return _chore_orm_to_read(c)
+def get_chore(chore_id: int, request: Request, db: Session = Depends(get_db)):
+    def build():
+        c = chore_crud.get_chore(db, chore_id)
+        if not c:
+            raise HTTPException(status_code=404, detail="Chore not found")
+        return _chore_orm_to_read(c), None
+    return cached_response(request, db, CHORE_TABLES, ChoreRead, build)
 
 @app.put("/chores/{chore_id}", response_model=ChoreRead)
 def update_chore(chore_id: int, chore: ChoreCreate, db: Session = Depends(get_db)):
@@ -95,15 +198,48 @@ def create_meal(meal: MealCreate, db: Session = Depends(get_db)):
     return _meal_orm_to_read(db_meal)
 
 @app.get("/meals", response_model=List[MealRead])
-def list_meals(db: Session = Depends(get_db)):
-    return [_meal_orm_to_read(m) for m in meal_crud.get_meals(db)]
+def list_meals(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    meal_date_from: Optional[date] = None,
+    meal_date_to: Optional[date] = None,
+    meal_kind: Optional[str] = None,
+    dish: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return _list_response(
+        request, db, MEAL_TABLES, List[MealRead], meal_crud.list_meals, meal_crud.list_meal_rows, _meal_orm_to_read,
+        limit=limit, cursor=cursor, sort=sort,
+        meal_date_from=meal_date_from, meal_date_to=meal_date_to, meal_kind=meal_kind, dish=dish,
+    )
+
+@app.post("/meals/bulk", response_model=BulkCreateResult)
+def create_meals_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    meals = _validate_batch(MealCreate, items)
+    return {"ids": meal_crud.create_meals_bulk(db, meals)}
+
+@app.put("/meals/bulk", response_model=BulkUpdateResult)
+def update_meals_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    updates = [(item.id, MealCreate(**item.model_dump(exclude={"id"}))) for item in _validate_batch(MealRead, items)]
+    updated, not_found = meal_crud.update_meals_bulk(db, updates)
+    return {"updated": updated, "not_found": not_found}
+
+@app.post("/meals/bulk/delete", response_model=BulkDeleteResult)
+def delete_meals_bulk(req: BulkDeleteRequest, db: Session = Depends(get_db)):
+    _check_batch_size(req.ids)
+    deleted, not_found = meal_crud.delete_meals_bulk(db, req.ids)
+    return {"deleted": deleted, "not_found": not_found}
 
 @app.get("/meals/{meal_id}", response_model=MealRead)
-def get_meal(meal_id: int, db: Session = Depends(get_db)):
-    m = meal_crud.get_meal(db, meal_id)
-    if not m:
-        raise HTTPException(status_code=404, detail="Meal not found")
-    return _meal_orm_to_read(m)
+def get_meal(meal_id: int, request: Request, db: Session = Depends(get_db)):
+    def build():
+        m = meal_crud.get_meal(db, meal_id)
+        if not m:
+            raise HTTPException(status_code=404, detail="Meal not found")
+        return _meal_orm_to_read(m), None
+    return cached_response(request, db, MEAL_TABLES, MealRead, build)
 
 @app.put("/meals/{meal_id}", response_model=MealRead)
 def update_meal(meal_id: int, meal: MealCreate, db: Session = Depends(get_db)):
@@ -126,15 +262,45 @@ def create_member(member: FamilyMemberCreate, db: Session = Depends(get_db)):
     return db_member
 
 @app.get("/members", response_model=List[FamilyMemberRead])
-def list_members(db: Session = Depends(get_db)):
-    return member_crud.get_members(db)
+def list_members(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    name: Optional[str] = None,
+    gender: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return _list_response(
+        request, db, MEMBER_TABLES, List[FamilyMemberRead], member_crud.list_members, member_crud.list_member_rows, None,
+        limit=limit, cursor=cursor, sort=sort, name=name, gender=gender,
+    )
+
+@app.post("/members/bulk", response_model=BulkCreateResult)
+def create_members_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    members = _validate_batch(FamilyMemberCreate, items)
+    return {"ids": member_crud.create_members_bulk(db, members)}
+
+@app.put("/members/bulk", response_model=BulkUpdateResult)
+def update_members_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    updates = [(item.id, FamilyMemberCreate(**item.model_dump(exclude={"id"}))) for item in _validate_batch(FamilyMemberRead, items)]
+    updated, not_found = member_crud.update_members_bulk(db, updates)
+    return {"updated": updated, "not_found": not_found}
+
+@app.post("/members/bulk/delete", response_model=BulkDeleteResult)
+def delete_members_bulk(req: BulkDeleteRequest, db: Session = Depends(get_db)):
+    _check_batch_size(req.ids)
+    deleted, not_found = member_crud.delete_members_bulk(db, req.ids)
+    return {"deleted": deleted, "not_found": not_found}
 
 @app.get("/members/{member_id}", response_model=FamilyMemberRead)
-def get_member(member_id: int, db: Session = Depends(get_db)):
-    m = member_crud.get_member(db, member_id)
-    if not m:
-        raise HTTPException(status_code=404, detail="Member not found")
-    return m
+def get_member(member_id: int, request: Request, db: Session = Depends(get_db)):
+    def build():
+        m = member_crud.get_member(db, member_id)
+        if not m:
+            raise HTTPException(status_code=404, detail="Member not found")
+        return m, None
+    return cached_response(request, db, MEMBER_TABLES, FamilyMemberRead, build)
 
 @app.put("/members/{member_id}", response_model=FamilyMemberRead)
 def update_member(member_id: int, member: FamilyMemberCreate, db: Session = Depends(get_db)):
@@ -157,19 +323,49 @@ def create_recipe(recipe: RecipeCreate, db: Session = Depends(get_db)):
     return db_recipe
 
 @app.get("/recipes", response_model=List[RecipeRead])
-def list_recipes(db: Session = Depends(get_db)):
-    return recipe_crud.get_recipes(db)
+def list_recipes(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    kind: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return _list_response(
+        request, db, RECIPE_TABLES, List[RecipeRead], recipe_crud.list_recipes, recipe_crud.list_recipe_rows, None,
+        limit=limit, cursor=cursor, sort=sort, kind=kind,
+    )
 
-@app.get("/recipes/{recipe_id}", response_model=RecipeRead)
-def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
-    r = recipe_crud.get_recipe(db, recipe_id)
-    if not r:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    return r
+@app.post("/recipes/bulk", response_model=BulkCreateResult)
+def create_recipes_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    recipes = _validate_batch(RecipeCreate, items)
+    return {"ids": recipe_crud.create_recipes_bulk(db, recipes)}
+
+@app.put("/recipes/bulk", response_model=BulkUpdateResult)
+def update_recipes_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    updates = [(item.id, RecipeCreate(**item.model_dump(exclude={"id"}))) for item in _validate_batch(RecipeRead, items)]
+    updated, not_found = recipe_crud.update_recipes_bulk(db, updates)
+    return {"updated": updated, "not_found": not_found}
 
+@app.post("/recipes/bulk/delete", response_model=BulkDeleteResult)
+def delete_recipes_bulk(req: BulkDeleteRequest, db: Session = Depends(get_db)):
+    _check_batch_size(req.ids)
+    deleted, not_found = recipe_crud.delete_recipes_bulk(db, req.ids)
+    return {"deleted": deleted, "not_found": not_found}
+
+# Declared before /recipes/{recipe_id} so "search" is not parsed as an id
 @app.get("/recipes/search", response_model=List[RecipeRead])
-def search_recipes(q: str, db: Session = Depends(get_db)):
-    return recipe_crud.search_recipes(db, q)
+def search_recipes(request: Request, q: str, limit: int = Query(recipe_crud.SEARCH_TOP_K, ge=1, le=100), db: Session = Depends(get_db)):
+    return cached_response(request, db, RECIPE_TABLES, List[RecipeRead], lambda: (recipe_crud.search_recipes(db, q, limit=limit), None))
+
+@app.get("/recipes/{recipe_id}", response_model=RecipeRead)
+def get_recipe(recipe_id: int, request: Request, db: Session = Depends(get_db)):
+    def build():
+        r = recipe_crud.get_recipe(db, recipe_id)
+        if not r:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        return r, None
+    return cached_response(request, db, RECIPE_TABLES, RecipeRead, build)
 
 @app.delete("/recipes/{recipe_id}", response_model=dict)
 def delete_recipe(recipe_id: int, db: Session = Depends(get_db)):
@@ -178,6 +374,55 @@ def delete_recipe(recipe_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Recipe not found")
     return {"detail": "Recipe deleted"}
 
+# Helpers for bulk endpoints
+
+MAX_BULK_ITEMS = int(os.getenv("MAX_BULK_ITEMS", "5000"))
+
+def _check_batch_size(items):
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(items)} items (max {MAX_BULK_ITEMS})")
+
+def _validate_batch(schema, items):
+    """Validate every item before touching the DB; reject the whole batch with per-item errors."""
+    _check_batch_size(items)
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append(schema.model_validate(item))
+        except ValidationError as e:
+            errors.append(BulkItemError(index=index, errors=json.loads(e.json(include_url=False))).model_dump())
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": f"{len(errors)} of {len(items)} items are invalid", "errors": errors})
+    return valid
+
+# Helpers for paginated list endpoints
+
+def _run_page_query(list_fn, db, **params) -> Page:
+    try:
+        return list_fn(db, **params)
+    except ValueError as e:
+        # Bad cursor or sort field
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _list_response(request: Request, db, tables, response_type, list_fn, rows_fn, to_read, **params):
+    """
+    Cached list response. By default rows are selected as column tuples and encoded
+    straight to JSON (rows_fn); STRICT_RESPONSES=1 loads ORM objects with list_fn and
+    serializes them through the Read schema instead.
+    """
+    strict = strict_responses()
+    def build():
+        page = _run_page_query(list_fn if strict else rows_fn, db, **params)
+        items = [to_read(i) for i in page.items] if strict and to_read else page.items
+        return items, _page_headers(request, page)
+    return cached_response(request, db, tables, response_type if strict else None, build)
+
+def _page_headers(request: Request, page: Page) -> dict:
+    if not page.next_cursor:
+        return {}
+    next_url = request.url.include_query_params(cursor=page.next_cursor)
+    return {"X-Next-Cursor": page.next_cursor, "Link": f'<{next_url}>; rel="next"'}
+
 # Helper functions to convert ORM to Pydantic response
 
 def _chore_orm_to_read(orm):
@@ -185,7 +430,7 @@ def _chore_orm_to_read(orm):
         id=orm.id,
         chore_name=orm.chore_name,
         icon=orm.icon,
-        assigned_members=orm.assigned_members.split(",") if orm.assigned_members else [],
+        assigned_members=list(orm.assigned_members),
         start_date=orm.start_date,
         end_date=orm.end_date,
         due_time=orm.due_time,
@@ -201,7 +446,7 @@ def _meal_orm_to_read(orm):
         exist=orm.exist,
         meal_kind=orm.meal_kind,
         meal_date=orm.meal_date,
-        dishes=orm.dishes.split(",") if orm.dishes else []
+        dishes=list(orm.dishes)
     )
 
 # Stage-based conversational flow for Chore
@@ -376,6 +621,7 @@ def _decode_message(m):
     return m  # fallback
 
 def openai_to_model_messages(history):
+    from pydantic_ai.messages import ModelRequest, ModelResponse, UserPromptPart, SystemPromptPart, TextPart
     result = []
     for msg in history:
         role = msg.get("role")
@@ -388,27 +634,157 @@ def openai_to_model_messages(history):
             result.append(ModelResponse(parts=[TextPart(content=content)]))
     return result
 
+async def _chat_history(data: dict, deps: "AssistantDeps"):
+    """
+    (message history, session id, HistoryReport) for a chat request.
+
+    With a session_id (or no message_history at all) the history is the session's
+    stored pydantic-ai messages; an unknown or expired id starts a new session.
+    Otherwise the client-sent message_history is converted as before (session id None).
+    Either way it is windowed to the token budget before it reaches the agent.
+    """
+    if "session_id" not in data and "message_history" in data:
+        history, session_id = openai_to_model_messages(data.get("message_history", [])), None
+    else:
+        session_id = data.get("session_id")
+        history = await deps.crud.run(chat_session_crud.load_messages, session_id) if session_id else None
+        if history is None:
+            session_id = await deps.crud.run(chat_session_crud.create_session)
+            history = []
+    history, report = await get_history_manager().prepare(history)
+    return history, session_id, report
+
+async def _save_chat_turn(deps: "AssistantDeps", session_id, result):
+    if session_id:
+        await deps.crud.run(chat_session_crud.append_messages, session_id, result.new_messages())
+
+BUSY_REPLY = "**Assistant busy:** too many conversations at once, please try again in a moment."
+
+def _busy_payload(session_id, raw_message_history) -> dict:
+    busy = {"stage": "error", "reply": BUSY_REPLY}
+    busy.update({"session_id": session_id} if session_id else {"message_history": raw_message_history})
+    return busy
+
+def _busy_response(error: BulkheadFull, session_id, raw_message_history):
+    headers = {"Retry-After": str(max(1, round(error.retry_after)))}
+    return JSONResponse(_busy_payload(session_id, raw_message_history), status_code=503, headers=headers)
+
 @app.post("/chat/")
 async def chat_endpoint(data: dict = Body(...), db: Session = Depends(get_db)):
-    from backend.main import household_agent, openai_to_model_messages
-    import re
-    import logging
+    from backend.agents.llm_agent import AssistantDeps
+    from backend.agents.stage_classifier import resolve_stage
     message = data.get("message", "")
     raw_message_history = data.get("message_history", [])
-    message_history = openai_to_model_messages(raw_message_history)
     deps = AssistantDeps(db=db)
     logger = logging.getLogger("chat_endpoint")
+    session_id = data.get("session_id")
     try:
-        agent = household_agent.agent
-        if hasattr(agent, "run") and callable(getattr(agent, "run")):
-            result = await agent.run(message, deps=deps, message_history=message_history)
-        else:
-            result = agent.run_sync(message, deps=deps, message_history=message_history)
+        async with llm_bulkhead.slot():
+            message_history, session_id, history_report = await _chat_history(data, deps)
+            agent = get_household_agent().agent
+            with AGENT_RUN_DURATION.time("chat"):
+                if hasattr(agent, "run") and callable(getattr(agent, "run")):
+                    result = await agent.run(message, deps=deps, message_history=message_history)
+                else:
+                    result = agent.run_sync(message, deps=deps, message_history=message_history)
         reply = result.output if hasattr(result, 'output') else str(result)
-        # Use LLM classifier for stage, fallback to heuristic if needed
-        stage = await classify_stage_llm_async(reply)
+        await _save_chat_turn(deps, session_id, result)
+        # Stage marker from the reply or its tool results, then heuristics, then the LLM classifier
+        stage = await resolve_stage(reply, result.new_messages())
         logger.info(f"Classified stage: {stage} | Reply: {reply}")
-        return JSONResponse({"stage": stage, "reply": reply, "message_history": raw_message_history})
+        response = {"stage": stage, "reply": reply, "history_tokens_saved": history_report.tokens_saved}
+        response.update({"session_id": session_id} if session_id else {"message_history": raw_message_history})
+        return JSONResponse(response)
+    except BulkheadFull as e:
+        logger.warning(f"Chat request rejected, assistant busy: {e}")
+        return _busy_response(e, session_id, raw_message_history)
     except Exception as e:
         logger.exception("Error in /chat/ endpoint")
-        return JSONResponse({"stage": "error", "reply": f"**Assistant error:** Internal server error: {str(e)}", "message_history": raw_message_history}, status_code=200)
+        error = {"stage": "error", "reply": f"**Assistant error:** Internal server error: {str(e)}"}
+        error.update({"session_id": session_id} if session_id else {"message_history": raw_message_history})
+        return JSONResponse(error, status_code=200)
+
+@app.delete("/chat/sessions/{session_id}", response_model=dict)
+async def delete_chat_session(session_id: str, db: Session = Depends(get_db)):
+    from backend.agents.llm_agent import AssistantDeps
+    if not await AssistantDeps(db=db).crud.run(chat_session_crud.delete_session, session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return {"detail": "Chat session deleted"}
+
+@app.get("/llm/stats")
+def llm_stats():
+    """Outbound LLM concurrency: running and queued calls, rejections, retries and queue wait times."""
+    return llm_bulkhead.stats()
+
+@app.get("/chat/stage-stats")
+def chat_stage_stats():
+    """How often a reply's stage came from a marker, the keyword heuristic or the LLM classifier."""
+    from backend.agents.stage_classifier import stage_path_counts
+    return {**stage_path_counts(), "cache": stage_cache.stats()}
+
+def _sse(event: str, data) -> str:
+    """One Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _updated_history(raw_message_history, message, reply):
+    history = list(raw_message_history)
+    if not history or history[-1] != {"role": "user", "content": message}:
+        history.append({"role": "user", "content": message})
+    history.append({"role": "assistant", "content": reply})
+    return history
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(data: dict = Body(...), db: Session = Depends(get_db)):
+    """
+    Streaming /chat/: text deltas arrive as `token` events while the agent runs, then one
+    `done` event carries the stage, the full reply and the session_id (or, for clients
+    still sending message_history, the updated history).
+    """
+    from backend.agents.llm_agent import AssistantDeps
+    from backend.agents.stage_classifier import resolve_stage
+    message = data.get("message", "")
+    raw_message_history = data.get("message_history", [])
+    deps = AssistantDeps(db=db)
+    logger = logging.getLogger("chat_stream_endpoint")
+
+    async def events():
+        # Flush headers and a first frame straight away so time to first byte
+        # does not wait on the model
+        yield _sse("start", {})
+        reply = ""
+        session_id = data.get("session_id")
+        try:
+            async with llm_bulkhead.slot():
+                message_history, session_id, history_report = await _chat_history(data, deps)
+                with AGENT_RUN_DURATION.time("chat_stream"):
+                    async with get_household_agent().agent.run_stream(message, deps=deps, message_history=message_history) as result:
+                        async for delta in result.stream_text(delta=True, debounce_by=None):
+                            reply += delta
+                            yield _sse("token", {"text": delta})
+            await _save_chat_turn(deps, session_id, result)
+            stage = await resolve_stage(reply, result.new_messages())
+            logger.info(f"Classified stage: {stage} | Reply: {reply}")
+            done = {"stage": stage, "reply": reply, "history_tokens_saved": history_report.tokens_saved}
+            done.update({"session_id": session_id} if session_id else {"message_history": _updated_history(raw_message_history, message, reply)})
+            yield _sse("done", done)
+        except BulkheadFull as e:
+            logger.warning(f"Chat stream rejected, assistant busy: {e}")
+            yield _sse("done", _busy_payload(session_id, raw_message_history))
+        except Exception as e:
+            logger.exception("Error in /chat/stream endpoint")
+            error = {"stage": "error", "reply": f"**Assistant error:** Internal server error: {str(e)}"}
+            error.update({"session_id": session_id} if session_id else {"message_history": raw_message_history})
+            yield _sse("done", error)
+        finally:
+            # The get_db dependency is torn down before a streamed body is sent;
+            # release whatever connection the agent tools checked out meanwhile
+            db.close()
+
+    if llm_bulkhead.saturated():
+        # Answer before any stream starts, so the client sees a plain 503
+        return _busy_response(BulkheadFull("LLM queue full"), data.get("session_id"), raw_message_history)
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
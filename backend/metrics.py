@@ -0,0 +1,210 @@
+"""
+In-process metrics in the Prometheus text format, served at GET /metrics.
+
+Counters and histograms are plain dicts of label values guarded by one lock per
+metric; an observation is a bisect and a few additions, cheap enough to keep on
+in production. Values are per process: with several workers, scrape each one
+(or let the scraper aggregate them).
+
+  http_request_duration_seconds     every request, by method, route template and status
+  agent_run_duration_seconds        household agent runs (/chat/ and /chat/stream), by outcome
+  agent_tool_duration_seconds       each agent tool call, by tool and outcome
+  llm_request_duration_seconds      single provider model requests, by model
+  stage_resolutions_total           how a reply's stage was resolved: marker, heuristic, llm or unknown
+  stage_resolution_duration_seconds time spent resolving the stage, by path
+  db_statement_duration_seconds     SQL statements, by operation (select, insert, ...)
+  db_pool_checkout_wait_seconds     waits for a pooled connection
+plus gauges read at scrape time (pool connections in use, LLM bulkhead slots).
+"""
+import time
+import threading
+import functools
+from bisect import bisect_left
+from typing import Callable, Dict, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in sorted(values.items()):
+            yield f"{self.name}_total{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}  # labels -> [count per bucket (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(labelvalues)
+        return series[2] if series else 0
+
+    def time(self, *labelvalues):
+        """
+        Context manager observing the time spent in its block. When the last label is
+        "outcome" and no value is given for it, it is filled in as "ok" or "error".
+        """
+        return _Timer(self, labelvalues)
+
+    def samples(self):
+        with self._lock:
+            series = {labels: (list(counts), total, n) for labels, (counts, total, n) in self._series.items()}
+        for labelvalues, (counts, total, n) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {n}"
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram: Histogram, labelvalues: Tuple):
+        self.histogram, self.labelvalues = histogram, labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        labelvalues = self.labelvalues
+        if len(labelvalues) == len(self.histogram.labelnames) - 1 and self.histogram.labelnames[-1] == "outcome":
+            labelvalues += ("ok" if exc_type is None else "error",)
+        self.histogram.observe(time.perf_counter() - self.start, *labelvalues)
+
+class Gauge:
+    """Read when scraped: collect() returns {label values: value}."""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], collect: Callable[[], Dict[Tuple, float]]):
+        self.name, self.help, self.labelnames, self.collect = name, help, tuple(labelnames), collect
+
+    def samples(self):
+        for labelvalues, value in sorted(self.collect().items()):
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, labelnames, collect) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the response body is sent", ("method", "route", "status"))
+AGENT_RUN_DURATION = registry.histogram(
+    "agent_run_duration_seconds", "Household agent run time, model calls and tool calls included", ("endpoint", "outcome"))
+AGENT_TOOL_DURATION = registry.histogram(
+    "agent_tool_duration_seconds", "Agent tool call latency", ("tool", "outcome"))
+LLM_REQUEST_DURATION = registry.histogram(
+    "llm_request_duration_seconds", "Provider model request latency (streams: until the stream is closed)", ("model",))
+STAGE_RESOLUTIONS = registry.counter(
+    "stage_resolutions", "Reply stages resolved, by the path that resolved them", ("path",))
+STAGE_RESOLUTION_DURATION = registry.histogram(
+    "stage_resolution_duration_seconds", "Time to resolve a reply's stage", ("path",))
+DB_STATEMENT_DURATION = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement execution time", ("operation",), DB_BUCKETS)
+DB_POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time to get a connection from the pool, opening one included", (), DB_BUCKETS)
+
+def timed_tool(fn):
+    """Record each call of an agent tool in agent_tool_duration_seconds."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with AGENT_TOOL_DURATION.time(name):
+            return await fn(*args, **kwargs)
+    return wrapper
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request; streamed responses are timed until their last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # The route template, not the raw path, so ids do not become label values
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, scope["method"], path, str(status))
@@ -0,0 +1,98 @@
+"""
+Schema migrations for existing SQLite databases.
+
+Run once against an old app.db with:
+
+    python -m backend.migrations [db_url]
+
+The same steps run (idempotently) at app startup, so a fresh checkout of an
+old database is upgraded before the first request.
+"""
+import sys
+import logging
+from sqlalchemy import inspect, insert, text
+from backend.database import Base, get_engine
+from backend.models import ChoreAssignmentORM, MealDishORM, RECIPE_FTS_DDL
+
+logger = logging.getLogger("migrations")
+
+def _split_legacy_list(value):
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def _move_list_column(conn, table, column, owner_fk, target_table, value_column):
+    """Copy a comma-separated legacy column into its association table, then drop it."""
+    rows = conn.execute(text(f"SELECT id, {column} FROM {table}")).all()
+    payload = [
+        {owner_fk: row_id, "position": position, value_column: value}
+        for row_id, raw in rows
+        for position, value in enumerate(_split_legacy_list(raw))
+    ]
+    if payload:
+        conn.execute(insert(target_table), payload)
+    # Requires SQLite >= 3.35 (ALTER TABLE ... DROP COLUMN)
+    conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+    logger.info(f"Migrated {len(payload)} values from {table}.{column} into {target_table.name}")
+    return len(payload)
+
+def _ensure_indexes(conn):
+    """create_all only indexes new tables; add indexes declared since a table was created."""
+    created = []
+    for table in Base.metadata.sorted_tables:
+        existing = {ix["name"] for ix in inspect(conn).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    if created:
+        logger.info(f"Created indexes: {', '.join(created)}")
+    return created
+
+def _ensure_recipe_search(conn):
+    """Create the recipes_fts index (and its sync triggers) for databases that predate it."""
+    if conn.dialect.name != "sqlite" or "recipes_fts" in inspect(conn).get_table_names():
+        return 0
+    for statement in RECIPE_FTS_DDL:
+        conn.execute(text(statement))
+    conn.execute(text("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')"))
+    count = conn.execute(text("SELECT COUNT(*) FROM recipes")).scalar()
+    logger.info(f"Indexed {count} recipes for full-text search")
+    return count
+
+def upgrade(engine):
+    """Bring the database at engine up to the current schema. Safe to run repeatedly."""
+    Base.metadata.create_all(bind=engine)
+    migrated = {}
+    with engine.begin() as conn:
+        columns = {t: {c["name"] for c in inspect(conn).get_columns(t)} for t in ("chores", "meals")}
+        if "assigned_members" in columns["chores"]:
+            migrated["chore_assignments"] = _move_list_column(
+                conn, "chores", "assigned_members", "chore_id", ChoreAssignmentORM.__table__, "member_name"
+            )
+        if "dishes" in columns["meals"]:
+            migrated["meal_dishes"] = _move_list_column(
+                conn, "meals", "dishes", "meal_id", MealDishORM.__table__, "dish"
+            )
+        created = _ensure_indexes(conn)
+        if created:
+            migrated["indexes"] = len(created)
+        indexed = _ensure_recipe_search(conn)
+        if indexed:
+            migrated["recipes_fts"] = indexed
+    return migrated
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    db_url = argv[0] if argv else None
+    engine = get_engine(db_url)
+    migrated = upgrade(engine)
+    engine.dispose()
+    if migrated:
+        for name, count in migrated.items():
+            print(f"{name}: {count}")
+    else:
+        print("Database already up to date.")
+
+if __name__ == "__main__":
+    main()
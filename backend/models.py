@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date
-from sqlalchemy import Column, Integer, String, Date, Boolean, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, LargeBinary, ForeignKey, Index, DDL, event
+from sqlalchemy.orm import relationship
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.ext.orderinglist import ordering_list
 from backend.database import Base
 
 class FamilyMember(BaseModel):
@@ -34,13 +37,36 @@ class ChoreORM(Base):
     id = Column(Integer, primary_key=True, index=True)
     chore_name = Column(String, nullable=False)
     icon = Column(String, nullable=True)
-    assigned_members = Column(Text, nullable=False)  # Comma-separated
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=True)
     due_time = Column(String, default="23:59")
     repetition = Column(String, nullable=False)
     reminder = Column(String, nullable=True)
     type = Column(String, nullable=True)
+    __table_args__ = (
+        # Keyset pagination and date-range / repetition filters on GET /chores
+        Index("ix_chores_start_date_id", "start_date", "id"),
+        Index("ix_chores_repetition_start_date", "repetition", "start_date"),
+    )
+    assignments = relationship(
+        "ChoreAssignmentORM",
+        order_by="ChoreAssignmentORM.position",
+        collection_class=ordering_list("position"),
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
+    # List of member names, backed by the chore_assignments table
+    assigned_members = association_proxy(
+        "assignments", "member_name", creator=lambda name: ChoreAssignmentORM(member_name=name)
+    )
+
+class ChoreAssignmentORM(Base):
+    __tablename__ = "chore_assignments"
+    id = Column(Integer, primary_key=True)
+    chore_id = Column(Integer, ForeignKey("chores.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    member_name = Column(String, nullable=False, index=True)
+    __table_args__ = (Index("ix_chore_assignments_chore_id_position", "chore_id", "position"),)
 
 class MealORM(Base):
     __tablename__ = "meals"
@@ -49,18 +75,76 @@ class MealORM(Base):
     exist = Column(Boolean, nullable=False)
     meal_kind = Column(String, nullable=False)
     meal_date = Column(Date, nullable=False)
-    dishes = Column(Text, nullable=True)  # Comma-separated
+    __table_args__ = (
+        Index("ix_meals_meal_date_id", "meal_date", "id"),
+        Index("ix_meals_meal_kind_meal_date", "meal_kind", "meal_date"),
+    )
+    dish_rows = relationship(
+        "MealDishORM",
+        order_by="MealDishORM.position",
+        collection_class=ordering_list("position"),
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
+    # List of dish names, backed by the meal_dishes table
+    dishes = association_proxy("dish_rows", "dish", creator=lambda dish: MealDishORM(dish=dish))
+
+class MealDishORM(Base):
+    __tablename__ = "meal_dishes"
+    id = Column(Integer, primary_key=True)
+    meal_id = Column(Integer, ForeignKey("meals.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    dish = Column(String, nullable=False, index=True)
+    __table_args__ = (Index("ix_meal_dishes_meal_id_position", "meal_id", "position"),)
 
 class FamilyMemberORM(Base):
     __tablename__ = "members"
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     gender = Column(String, nullable=True)
     avatar = Column(String, nullable=True)
 
 class RecipeORM(Base):
     __tablename__ = "recipes"
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    kind = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
+    kind = Column(String, nullable=False, index=True)
     description = Column(String, nullable=True)
+
+class ChatSessionORM(Base):
+    """Server-side /chat/ conversation; its messages are the ChatMessageORM batches in seq order."""
+    __tablename__ = "chat_sessions"
+    id = Column(String(32), primary_key=True)
+    message_count = Column(Integer, nullable=False, default=0)
+    # Bumped on every append and used as the new batch's seq; appends check it so concurrent turns never collide
+    version = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False, index=True)
+
+class ChatMessageORM(Base):
+    """One appended batch of a session's native pydantic-ai messages, JSON-encoded and zlib-compressed. Never rewritten."""
+    __tablename__ = "chat_messages"
+    session_id = Column(String(32), ForeignKey("chat_sessions.id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    messages = Column(LargeBinary, nullable=False)
+
+# Full-text index over recipes: an FTS5 trigram table (substring and typo-tolerant
+# matching) that mirrors the recipes table through triggers, so every write path,
+# including bulk executemany, keeps it in sync. SQLite only.
+RECIPE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5("
+    "name, kind, description, content='recipes', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN "
+    "INSERT INTO recipes_fts(rowid, name, kind, description) VALUES (new.id, new.name, new.kind, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN "
+    "INSERT INTO recipes_fts(recipes_fts, rowid, name, kind, description) "
+    "VALUES ('delete', old.id, old.name, old.kind, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE ON recipes BEGIN "
+    "INSERT INTO recipes_fts(recipes_fts, rowid, name, kind, description) "
+    "VALUES ('delete', old.id, old.name, old.kind, old.description); "
+    "INSERT INTO recipes_fts(rowid, name, kind, description) VALUES (new.id, new.name, new.kind, new.description); END",
+]
+
+for _statement in RECIPE_FTS_DDL:
+    event.listen(RecipeORM.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(RecipeORM.__table__, "after_drop", DDL("DROP TABLE IF EXISTS recipes_fts").execute_if(dialect="sqlite"))
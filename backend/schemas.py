@@ -56,4 +56,24 @@ class RecipeCreate(RecipeBase):
 
 class RecipeRead(RecipeBase):
     id: int
-    model_config = dict(from_attributes=True) 
\ No newline at end of file
+    model_config = dict(from_attributes=True) 
+
+# Bulk operations
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[dict]
+
+class BulkCreateResult(BaseModel):
+    ids: List[int]
+
+class BulkUpdateResult(BaseModel):
+    updated: List[int]
+    not_found: List[int]
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[int]
+
+class BulkDeleteResult(BaseModel):
+    deleted: List[int]
+    not_found: List[int]
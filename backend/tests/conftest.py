@@ -4,6 +4,8 @@ import os
 from backend.database import get_engine, get_session_local, Base
 from backend.main import app
 from backend.deps import get_db
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import FunctionModel
 
 @pytest.fixture(scope='session')
 def test_db_url():
@@ -39,4 +41,21 @@ def override_get_db(db_session):
         yield db_session
     app.dependency_overrides[get_db] = _get_db_override
     yield
-    app.dependency_overrides.pop(get_db, None) 
\ No newline at end of file
+    app.dependency_overrides.pop(get_db, None) 
+
+@pytest.fixture
+def tool_then_reply():
+    """
+    FunctionModel that calls one tool (no arguments) per turn, then answers with
+    reply, or reply(messages) if it is callable. seen, if given, collects the
+    messages each turn started from.
+    """
+    def factory(tool_name, reply="Done.", seen=None):
+        def handler(messages, info):
+            if isinstance(messages[-1].parts[-1], ToolReturnPart):
+                return ModelResponse(parts=[TextPart(reply(messages) if callable(reply) else reply)])
+            if seen is not None:
+                seen.append(list(messages))
+            return ModelResponse(parts=[ToolCallPart(tool_name, {})])
+        return FunctionModel(handler)
+    return factory
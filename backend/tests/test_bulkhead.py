@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_ai.exceptions import ModelHTTPError
+from backend.agents import bulkhead as bulkhead_module
+from backend.agents.bulkhead import Bulkhead, BulkheadFull, retry_rate_limited
+
+def test_bulkhead_limits_queues_and_rejects():
+    bulkhead = Bulkhead(max_concurrent=1, max_queue=1, queue_timeout=5)
+    order = []
+
+    async def worker(name, hold):
+        async with bulkhead.slot():
+            order.append(name)
+            await hold.wait()
+
+    async def run():
+        first_done, second_done = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(worker("first", first_done))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(worker("second", second_done))
+        await asyncio.sleep(0)
+        assert bulkhead.stats()["active"] == 1 and bulkhead.stats()["queued"] == 1
+        assert bulkhead.saturated()
+        with pytest.raises(BulkheadFull):
+            await bulkhead.acquire()
+        first_done.set()
+        second_done.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+    stats = bulkhead.stats()
+    assert order == ["first", "second"]
+    assert stats["admitted"] == 2 and stats["rejected"] == 1
+    assert stats["active"] == 0 and stats["queued"] == 0 and stats["wait_max_ms"] > 0
+
+def test_bulkhead_queue_timeout_frees_its_place():
+    bulkhead = Bulkhead(max_concurrent=1, max_queue=1, queue_timeout=0.02)
+
+    async def run():
+        await bulkhead.acquire()
+        with pytest.raises(BulkheadFull):
+            await bulkhead.acquire()
+        bulkhead.release()
+        async with bulkhead.slot():
+            pass
+
+    asyncio.run(run())
+    assert bulkhead.stats()["timeouts"] == 1 and bulkhead.stats()["active"] == 0
+
+def test_retry_rate_limited_only_retries_429(monkeypatch):
+    monkeypatch.setattr(bulkhead_module, "LLM_RETRY_BASE_SECONDS", 0.001)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ModelHTTPError(429, "test-model")
+        return "ok"
+
+    async def broken():
+        attempts.append(1)
+        raise ModelHTTPError(500, "test-model")
+
+    assert asyncio.run(retry_rate_limited(flaky)) == "ok" and len(attempts) == 3
+    attempts.clear()
+    with pytest.raises(ModelHTTPError):
+        asyncio.run(retry_rate_limited(broken))
+    assert len(attempts) == 1
+
+def test_chat_busy_when_bulkhead_full(db_session, monkeypatch):
+    from backend import main
+    monkeypatch.setattr(main, "llm_bulkhead", Bulkhead(max_concurrent=0, max_queue=0, queue_timeout=1))
+    client = TestClient(main.app)
+    for path in ("/chat/", "/chat/stream"):
+        resp = client.post(path, json={"message": "Add a chore", "session_id": "abc"})
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+        assert resp.json()["stage"] == "error" and resp.json()["session_id"] == "abc"
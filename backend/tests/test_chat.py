@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from backend.main import app, household_agent
@@ -179,4 +180,179 @@ def test_chat_stage_marker_in_reply(db_session):
     assert resp.status_code == 200
     data = resp.json()
     reply = data["reply"]
-    assert "<!-- stage: collecting_info" in reply, f"Stage marker not found in reply: {reply}" 
\ No newline at end of file
+    assert "<!-- stage: collecting_info" in reply, f"Stage marker not found in reply: {reply}"
+
+def test_chat_stream_emits_tokens_then_done(db_session):
+    """
+    /chat/stream sends a start frame, text deltas as token events, and a final done
+    event with the stage and the updated message history.
+    """
+    from fastapi.testclient import TestClient
+    from backend.main import app, household_agent
+    from pydantic_ai.models.function import FunctionModel
+
+    async def stream_reply(messages, info):
+        for chunk in ["Meal ", "created ", "successfully!"]:
+            yield chunk
+
+    client = TestClient(app)
+    history = [{"role": "user", "content": "Add pasta for dinner"}]
+    with household_agent.agent.override(model=FunctionModel(stream_function=stream_reply)):
+        with client.stream("POST", "/chat/stream", json={"message": "Add pasta for dinner", "message_history": history}) as resp:
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/event-stream")
+            frames = [f for f in resp.read().decode().split("\n\n") if f]
+    events = [(f.split("\n")[0][len("event: "):], json.loads(f.split("\n")[1][len("data: "):])) for f in frames]
+    assert events[0][0] == "start"
+    tokens = [data["text"] for name, data in events if name == "token"]
+    assert "".join(tokens) == "Meal created successfully!" and len(tokens) == 3
+    name, done = events[-1]
+    assert name == "done"
+    assert done["reply"] == "Meal created successfully!"
+    assert done["stage"] == "created"
+    assert done["message_history"] == history + [{"role": "assistant", "content": "Meal created successfully!"}]
+
+def test_chat_stage_from_tool_marker_skips_classifier(db_session, tool_then_reply):
+    """
+    A stage marker in the tool results decides the stage even when the final reply
+    has neither a marker nor a keyword, so the LLM classifier is never called.
+    """
+    from fastapi.testclient import TestClient
+    from backend.main import app, household_agent
+    from backend.agents.stage_classifier import stage_path_counts
+
+    before = stage_path_counts()
+    client = TestClient(app)
+    with household_agent.agent.override(model=tool_then_reply("list_chores", "Here is the list you asked for.")):
+        resp = client.post("/chat/", json={"message": "Show my chores", "message_history": []})
+    assert resp.json()["stage"] == "confirming_info"
+    after = client.get("/chat/stage-stats").json()
+    assert after["marker"] == before["marker"] + 1
+    assert after["llm"] == before["llm"] and after["unknown"] == before["unknown"]
+
+def test_list_tools_memoized_until_write(db_session, monkeypatch):
+    """
+    Repeated list_members calls within and across runs are served from the tool cache;
+    a committed write to the members table, from this process or another, makes the next call query again.
+    """
+    import asyncio
+    from backend.agents.llm_agent import HouseholdAssistantAgent, AssistantDeps
+    from sqlalchemy import insert
+    from backend.crud import member as member_crud
+    from backend.database import bump_table_versions, get_engine
+    from backend.models import FamilyMemberORM
+    from backend.schemas import FamilyMemberCreate
+    from pydantic_ai.models.function import FunctionModel
+    from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+
+    queries = []
+    list_member_rows = member_crud.list_member_rows
+    monkeypatch.setattr(member_crud, "list_member_rows", lambda *a, **kw: queries.append(1) or list_member_rows(*a, **kw))
+
+    def handler(messages, info):
+        if len(messages) < 5:
+            return ModelResponse(parts=[ToolCallPart("list_members", {})])
+        return ModelResponse(parts=[TextPart("Done.")])
+
+    agent = HouseholdAssistantAgent()
+    deps = AssistantDeps(db=db_session)
+
+    async def run():
+        with agent.agent.override(model=FunctionModel(handler)):
+            result = await agent.agent.run("Who is in the family?", deps=deps)
+        return [p.content for m in result.new_messages() for p in m.parts if getattr(p, "part_kind", "") == "tool-return"]
+
+    first = asyncio.run(run())
+    assert len(first) == 2 and first[0] == first[1] and len(queries) == 1
+    asyncio.run(run())
+    assert len(queries) == 1
+    member_crud.create_member(db_session, FamilyMemberCreate(name="Robin"))
+    after_write = asyncio.run(run())
+    assert len(queries) == 2 and "Robin" in after_write[0]
+    # What another worker's commit leaves behind: the row and its table version, no in-process state
+    other_worker = get_engine(str(db_session.get_bind().url))
+    with other_worker.begin() as conn:
+        conn.execute(insert(FamilyMemberORM.__table__).values(name="Casey"))
+        bump_table_versions(conn, ["members"])
+    other_worker.dispose()
+    after_other_write = asyncio.run(run())
+    assert len(queries) == 3 and "Casey" in after_other_write[0]
+
+def test_parallel_write_and_memoized_list_share_the_session_safely(db_session, monkeypatch):
+    """
+    create_chore and list_chores in one model response run as parallel tasks; the
+    memoized list reads its table versions through crud, so the session is never
+    used from two threads at once (nor from the event loop).
+    """
+    import asyncio
+    import threading
+    import time
+    from backend.agents import llm_agent
+    from backend.agents.llm_agent import HouseholdAssistantAgent, AssistantDeps
+    from backend.crud import chore as chore_crud
+    from pydantic_ai.models.function import FunctionModel
+    from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+
+    active, overlaps, loop_threads = [0], [], []
+    def exclusive(fn, delay=0.0):
+        def wrapper(*args, **kwargs):
+            if threading.current_thread() is threading.main_thread():
+                loop_threads.append(fn.__name__)
+            active[0] += 1
+            if active[0] > 1:
+                overlaps.append(fn.__name__)
+            try:
+                time.sleep(delay)
+                return fn(*args, **kwargs)
+            finally:
+                active[0] -= 1
+        return wrapper
+    monkeypatch.setattr(chore_crud, "create_chore", exclusive(chore_crud.create_chore, delay=0.05))
+    monkeypatch.setattr(llm_agent, "table_versions", exclusive(llm_agent.table_versions))
+
+    def handler(messages, info):
+        if len(messages) == 1:
+            return ModelResponse(parts=[
+                ToolCallPart("create_chore", {"chore_name": "Laundry", "assigned_members": ["Alex"], "start_date": "2024-01-01", "repetition": "weekly"}),
+                ToolCallPart("list_chores", {}),
+            ])
+        return ModelResponse(parts=[TextPart("Done.")])
+
+    agent = HouseholdAssistantAgent()
+    with agent.agent.override(model=FunctionModel(handler)):
+        result = asyncio.run(agent.agent.run("Add laundry and show my chores", deps=AssistantDeps(db=db_session)))
+    returns = {p.tool_name: p.content for m in result.new_messages() for p in m.parts if getattr(p, "part_kind", "") == "tool-return"}
+    assert "Chore Created" in returns["create_chore"] and "list_chores" in returns
+    assert overlaps == [] and loop_threads == []
+
+def test_list_tools_filter_cap_and_count(db_session, monkeypatch):
+    """list_* tools filter on the server, cap their rows with an "N more" note, and can return counts only."""
+    import asyncio
+    from datetime import date
+    from types import SimpleNamespace
+    from backend.agents import llm_agent
+    from backend.agents.llm_agent import HouseholdAssistantAgent, AssistantDeps
+    from backend.crud import chore as chore_crud
+    from backend.schemas import ChoreCreate
+
+    chore_crud.create_chores_bulk(db_session, [
+        ChoreCreate(chore_name=f"{'Dishes' if i % 2 else 'Laundry'} {i}", assigned_members=["Alex" if i < 10 else "Sam"],
+                    start_date=date(2024, 1, 1 + i), repetition="weekly")
+        for i in range(30)
+    ])
+    monkeypatch.setattr(llm_agent, "TOOL_LIST_LIMIT", 5)
+    list_chores = HouseholdAssistantAgent().agent._function_tools["list_chores"].function
+    ctx = SimpleNamespace(deps=AssistantDeps(db=db_session))
+    call = lambda **kwargs: asyncio.run(list_chores(ctx, **kwargs))
+
+    capped = call()
+    assert capped.count("| Laundry") + capped.count("| Dishes") == 5
+    assert "Showing 5 of 30; 25 more" in capped
+    filtered = call(name_contains="dish", member="Sam", start_date_to="2024-01-20")
+    assert "Laundry" not in filtered and "Showing 5 of 5" not in filtered and filtered.count("| Dishes") == 5
+    assert call(name_contains="DISHES", count_only=True) == "<!-- stage: confirming_info -->\n15 chores match."
+    assert call(start_date_from="next week").startswith("<!-- stage: error -->")
+
+    monkeypatch.setattr(llm_agent, "TOOL_OUTPUT_TOKEN_BUDGET", 80)
+    tight = call(member="Sam")
+    assert "more. Narrow the list" in tight and llm_agent.count_tokens(tight) <= 120
@@ -33,4 +33,42 @@ def test_chore_crud(db_session):
     # Delete
     ok = delete_chore(db_session, db_chore.id)
     assert ok
-    assert get_chore(db_session, db_chore.id) is None 
\ No newline at end of file
+    assert get_chore(db_session, db_chore.id) is None
+
+def test_async_crud_offloads_to_thread(db_session):
+    """
+    AsyncCrud runs the same CRUD functions on the bounded DB thread pool.
+    """
+    import asyncio
+    import threading
+    from backend.crud.aio import AsyncCrud
+    crud = AsyncCrud(db_session, offload=True)
+    loop_thread = threading.get_ident()
+    seen = []
+
+    def which_thread(db):
+        seen.append(threading.get_ident())
+        return get_chores(db)
+
+    async def flow():
+        chore = ChoreCreate(chore_name="Dishes", assigned_members=["Alex"], start_date=date.today(), repetition="daily")
+        created = await crud.run(create_chore, chore)
+        chores = await crud.run(which_thread)
+        return created, chores
+
+    created, chores = asyncio.run(flow())
+    assert any(c.id == created.id for c in chores)
+    assert seen and seen[0] != loop_thread
+
+def test_chore_assignments_keep_order(db_session):
+    """
+    assigned_members round-trips through the chore_assignments table in order, and updates replace it.
+    """
+    chore = ChoreCreate(chore_name="Vacuum", assigned_members=["Jamie", "Alex"], start_date=date.today(), repetition="weekly")
+    db_chore = create_chore(db_session, chore)
+    assert list(get_chore(db_session, db_chore.id).assigned_members) == ["Jamie", "Alex"]
+    update_chore(db_session, db_chore.id, chore.model_copy(update={"assigned_members": ["Sam"]}))
+    assert list(get_chore(db_session, db_chore.id).assigned_members) == ["Sam"]
+    from backend.crud.chore import get_chores_for_member
+    assert [c.id for c in get_chores_for_member(db_session, "Sam")] == [db_chore.id]
+    assert get_chores_for_member(db_session, "Jamie") == []
@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+from backend.database import get_registered_engine, get_registered_sessionmaker, dispose_engines, get_db_url
+from backend.main import app
+import backend.database as database
+
+def test_engine_registry_reuses_engine_per_url(test_db_url):
+    """
+    The same engine and sessionmaker are returned for a URL until they are disposed.
+    """
+    assert get_db_url() == test_db_url
+    engine = get_registered_engine()
+    assert get_registered_engine(test_db_url) is engine
+    assert get_registered_sessionmaker() is get_registered_sessionmaker(test_db_url)
+    assert get_registered_sessionmaker().kw["bind"] is engine
+    dispose_engines()
+    assert test_db_url not in database._registry
+    assert get_registered_engine() is not engine
+
+def test_pool_settings_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "60")
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = get_registered_engine(url)
+    try:
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 2
+        assert engine.pool._recycle == 60
+    finally:
+        dispose_engines()
+
+def test_lifespan_creates_and_disposes_engine(test_db_url):
+    with TestClient(app) as client:
+        assert test_db_url in database._registry
+        assert client.get("/health").status_code == 200
+    assert test_db_url not in database._registry
+
+def test_sqlite_profile_pragmas(monkeypatch, tmp_path):
+    from sqlalchemy import text
+    monkeypatch.setenv("SQLITE_CACHE_SIZE", "-2000")
+    engine = database.get_engine(f"sqlite:///{tmp_path / 'perf.db'}", sqlite_profile="performance")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -2000
+    engine.dispose()
+    legacy = database.get_engine(f"sqlite:///{tmp_path / 'legacy.db'}", sqlite_profile="legacy")
+    with legacy.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    legacy.dispose()
@@ -1,9 +1,13 @@
+import os
+import sys
+import subprocess
 from fastapi.testclient import TestClient
 from backend.main import app
 from datetime import date
 import pytest
 
 client = TestClient(app)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 
 def test_create_and_list_member():
     """
@@ -164,4 +168,179 @@ def test_meal_step_flow():
     # Confirm
     r = client.post("/meal/step", json={"current_data": {"meal_name": "Pasta", "exist": True, "meal_kind": "dinner", "meal_date": today}, "confirm": True})
     assert r.json()["stage"] == "created"
-    assert "id" in r.json() 
\ No newline at end of file
+    assert "id" in r.json()
+
+def test_list_chores_keyset_pagination_and_filters():
+    """
+    Test cursor pagination, sorting and server-side filters on GET /chores.
+    """
+    for i, (member, repetition) in enumerate([("Alex", "daily"), ("Jamie", "weekly"), ("Alex", "weekly"), ("Sam", "daily"), ("Alex", "daily")]):
+        r = client.post("/chores", json={
+            "chore_name": f"Chore {i}", "assigned_members": [member], "start_date": f"2024-01-0{5 - i}", "repetition": repetition
+        })
+        assert r.status_code == 200
+    seen = []
+    params = {"limit": 2, "sort": "start_date"}
+    while True:
+        r = client.get("/chores", params=params)
+        assert r.status_code == 200
+        assert len(r.json()) <= 2
+        seen.extend(c["start_date"] for c in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        assert 'rel="next"' in r.headers["Link"]
+        params["cursor"] = cursor
+    assert seen == sorted(seen) and len(seen) == 5
+    r = client.get("/chores", params={"member": "Alex", "repetition": "daily", "sort": "-start_date"})
+    assert [c["chore_name"] for c in r.json()] == ["Chore 0", "Chore 4"]
+    r = client.get("/chores", params={"start_date_from": "2024-01-02", "start_date_to": "2024-01-03"})
+    assert sorted(c["chore_name"] for c in r.json()) == ["Chore 2", "Chore 3"]
+    assert client.get("/chores", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/chores", params={"sort": "reminder"}).status_code == 400
+
+def test_list_meals_filters():
+    for name, kind, day in [("Oats", "breakfast", "2024-02-01"), ("Soup", "dinner", "2024-02-02"), ("Stew", "dinner", "2024-02-03")]:
+        client.post("/meals", json={"meal_name": name, "exist": False, "meal_kind": kind, "meal_date": day, "dishes": [name]})
+    r = client.get("/meals", params={"meal_kind": "dinner", "meal_date_from": "2024-02-03"})
+    assert [m["meal_name"] for m in r.json()] == ["Stew"]
+    r = client.get("/meals", params={"dish": "Soup"})
+    assert [m["meal_name"] for m in r.json()] == ["Soup"]
+
+def test_bulk_chore_endpoints():
+    """
+    Test bulk create, update and delete of chores in single transactions.
+    """
+    items = [
+        {"chore_name": f"Bulk {i}", "assigned_members": ["Alex", "Jamie"][: i % 2 + 1], "start_date": "2024-03-01", "repetition": "daily"}
+        for i in range(3)
+    ]
+    r = client.post("/chores/bulk", json=items)
+    assert r.status_code == 200
+    ids = r.json()["ids"]
+    assert len(ids) == 3
+    assert client.get(f"/chores/{ids[1]}").json()["assigned_members"] == ["Alex", "Jamie"]
+    # One invalid item rejects the whole batch, with errors reported per index
+    r = client.post("/chores/bulk", json=[items[0], {"chore_name": "No date"}])
+    assert r.status_code == 422
+    assert [e["index"] for e in r.json()["detail"]["errors"]] == [1]
+    # Update
+    r = client.put("/chores/bulk", json=[{**items[0], "id": ids[0], "assigned_members": ["Sam"]}, {**items[0], "id": 99999}])
+    assert r.json() == {"updated": [ids[0]], "not_found": [99999]}
+    assert client.get(f"/chores/{ids[0]}").json()["assigned_members"] == ["Sam"]
+    # Delete
+    r = client.post("/chores/bulk/delete", json={"ids": ids[:2] + [99999]})
+    assert r.json() == {"deleted": ids[:2], "not_found": [99999]}
+    assert client.get(f"/chores/{ids[0]}").status_code == 404
+    assert client.get(f"/chores/{ids[2]}").status_code == 200
+
+def test_bulk_recipe_and_meal_create():
+    r = client.post("/recipes/bulk", json=[{"name": "Soup", "kind": "dinner"}, {"name": "Toast", "kind": "breakfast"}])
+    assert r.status_code == 200 and len(r.json()["ids"]) == 2
+    r = client.post("/meals/bulk", json=[{"meal_name": "Feast", "exist": False, "meal_kind": "dinner", "meal_date": "2024-03-02", "dishes": ["Soup", "Bread"]}])
+    meal_id = r.json()["ids"][0]
+    assert client.get(f"/meals/{meal_id}").json()["dishes"] == ["Soup", "Bread"]
+
+def test_recipe_search_ranked_and_in_sync():
+    """
+    /recipes/search is routed (not shadowed by /recipes/{id}), tolerates typos,
+    ranks closer names first and follows updates and deletes.
+    """
+    ids = client.post("/recipes/bulk", json=[
+        {"name": "Spaghetti Bolognese", "kind": "dinner", "description": "Classic Italian pasta."},
+        {"name": "Spaghetti", "kind": "dinner"},
+        {"name": "Chicken Curry", "kind": "dinner", "description": "Spicy and savory."},
+    ]).json()["ids"]
+    r = client.get("/recipes/search", params={"q": "spaghetti"})
+    assert r.status_code == 200
+    assert [x["name"] for x in r.json()] == ["Spaghetti", "Spaghetti Bolognese"]
+    assert [x["name"] for x in client.get("/recipes/search", params={"q": "chiken cury"}).json()] == ["Chicken Curry"]
+    assert [x["name"] for x in client.get("/recipes/search", params={"q": "italian"}).json()] == ["Spaghetti Bolognese"]
+    assert len(client.get("/recipes/search", params={"q": "spaghetti", "limit": 1}).json()) == 1
+    assert client.get("/recipes/search", params={"q": "Unicorn Pie"}).json() == []
+    client.put("/recipes/bulk", json=[{"id": ids[2], "name": "Thai Green Curry", "kind": "dinner"}])
+    assert [x["name"] for x in client.get("/recipes/search", params={"q": "green curry"}).json()] == ["Thai Green Curry"]
+    client.delete(f"/recipes/{ids[1]}")
+    assert [x["name"] for x in client.get("/recipes/search", params={"q": "spaghetti"}).json()] == ["Spaghetti Bolognese"]
+    # Short queries use LIKE; its wildcards in the query match literally
+    assert client.get("/recipes/search", params={"q": "_"}).json() == []
+    assert client.get("/recipes/search", params={"q": "%"}).json() == []
+
+def test_list_cache_etag_and_invalidation():
+    """
+    Unchanged lists are served from the cache (or 304 with If-None-Match); any write moves the ETag.
+    """
+    from backend.cache import response_cache
+    client.post("/members", json={"name": "Alex"})
+    first = client.get("/members")
+    etag = first.headers["ETag"]
+    before = response_cache.stats()
+    again = client.get("/members")
+    assert again.json() == first.json() and again.headers["ETag"] == etag
+    assert response_cache.stats()["hits"] == before["hits"] + 1
+    not_modified = client.get("/members", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert client.get("/cache/stats").json()["not_modified"] == before["not_modified"] + 1
+    # Query params are part of the key
+    assert client.get("/members", params={"name": "Nobody"}).json() == []
+    # Single-row and bulk writes both invalidate
+    client.post("/members/bulk", json=[{"name": "Sam"}])
+    changed = client.get("/members", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [m["name"] for m in changed.json()] == ["Alex", "Sam"]
+    member_id = changed.json()[1]["id"]
+    assert client.get(f"/members/{member_id}").json()["name"] == "Sam"
+    client.put(f"/members/{member_id}", json={"name": "Samantha"})
+    assert client.get(f"/members/{member_id}").json()["name"] == "Samantha"
+    client.delete(f"/members/{member_id}")
+    assert client.get(f"/members/{member_id}").status_code == 404
+
+def test_cached_tables_are_versioned():
+    from backend import cache
+    from backend.database import VERSIONED_TABLES
+    for tables in (cache.CHORE_TABLES, cache.MEAL_TABLES, cache.MEMBER_TABLES, cache.RECIPE_TABLES):
+        assert VERSIONED_TABLES.issuperset(tables)
+
+def test_list_cache_sees_writes_from_other_workers(test_db_url):
+    """
+    Versions live in the database, so a write committed by another worker process invalidates this one's cache.
+    """
+    client.post("/members", json={"name": "Alex"})
+    etag = client.get("/members").headers["ETag"]
+    assert client.get("/members", headers={"If-None-Match": etag}).status_code == 304
+    code = (
+        "from backend.database import get_engine, get_session_local\n"
+        "from backend.models import FamilyMemberORM\n"
+        f"db = get_session_local(get_engine({test_db_url!r}))()\n"
+        "db.add(FamilyMemberORM(name='Sam'))\n"
+        "db.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True)
+    changed = client.get("/members", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [m["name"] for m in changed.json()] == ["Alex", "Sam"]
+
+def test_fast_and_strict_list_responses_match(monkeypatch):
+    """
+    The column-projection fast path returns exactly what the strict ORM + schema path does.
+    """
+    from backend.cache import response_cache
+    client.post("/chores/bulk", json=[
+        {"chore_name": "Laundry", "assigned_members": ["Alex", "Sam"], "start_date": "2024-01-01", "repetition": "weekly"},
+        {"chore_name": "Dishes", "assigned_members": ["Sam"], "start_date": "2024-01-02", "end_date": "2024-02-01", "repetition": "daily"},
+    ])
+    client.post("/meals/bulk", json=[
+        {"meal_name": "Pasta", "exist": True, "meal_kind": "dinner", "meal_date": "2024-01-01", "dishes": ["Spaghetti", "Salad"]},
+        {"meal_name": "Toast", "exist": False, "meal_kind": "breakfast", "meal_date": "2024-01-02"},
+    ])
+    client.post("/members/bulk", json=[{"name": "Alex", "gender": "male"}])
+    client.post("/recipes/bulk", json=[{"name": "Curry", "kind": "dinner"}])
+    for path in ("/chores?sort=-start_date&limit=1", "/meals", "/members", "/recipes"):
+        monkeypatch.setenv("STRICT_RESPONSES", "1")
+        response_cache.clear()
+        strict = client.get(path)
+        monkeypatch.setenv("STRICT_RESPONSES", "0")
+        response_cache.clear()
+        fast = client.get(path)
+        assert fast.json() == strict.json() and fast.json()
+        assert fast.headers.get("X-Next-Cursor") == strict.headers.get("X-Next-Cursor")
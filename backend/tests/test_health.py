@@ -1,9 +1,35 @@
+import os
+import sys
+import threading
+import subprocess
 from fastapi.testclient import TestClient
 from backend.main import app
 
 client = TestClient(app)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 
 def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"} 
\ No newline at end of file
+    assert response.json() == {"status": "ok"}
+
+def test_import_has_no_side_effects():
+    # A fresh interpreter: this test session has already imported (and used) the app
+    code = (
+        "import sys, threading, backend.main as m\n"
+        "assert m._household_agent is None and m._history_manager is None\n"
+        "assert 'pydantic_ai' not in sys.modules\n"
+        "from backend.agents import stage_classifier\n"
+        "assert stage_classifier._stage_classifier_agent is None\n"
+        "assert 'openai' not in sys.modules\n"
+        "assert threading.active_count() == 1, threading.enumerate()\n"
+    )
+    env = {**os.environ, "OPENAI_API_KEY": "sk-test"}
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True)
+
+def test_lifespan_starts_and_stops_prompt_watcher():
+    watcher_running = lambda: any(t.name == "prompt-watcher" for t in threading.enumerate())
+    with TestClient(app) as started:
+        assert started.get("/health").status_code == 200
+        assert watcher_running()
+    assert not watcher_running()
@@ -0,0 +1,64 @@
+import asyncio
+from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+from backend.agents.history import HistoryManager, message_tokens, split_turns
+
+def _conversation(n_turns, words=15):
+    messages = []
+    for i in range(n_turns):
+        parts = [UserPromptPart(f"turn {i}: " + "plan meals " * words)]
+        if i == 0:
+            parts.insert(0, SystemPromptPart("You are a household assistant."))
+        messages.append(ModelRequest(parts=parts))
+        messages.append(ModelResponse(parts=[TextPart(f"reply {i}: " + "sure thing " * words)]))
+    return messages
+
+def _recording_summarizer(calls):
+    async def summarize(previous, transcript):
+        calls.append((previous, transcript))
+        return f"summary #{len(calls)}"
+    return summarize
+
+def test_history_under_budget_is_untouched():
+    manager = HistoryManager(budget_tokens=10_000, keep_turns=2, summarize=_recording_summarizer([]))
+    messages = _conversation(3)
+    windowed, report = asyncio.run(manager.prepare(messages))
+    assert windowed is messages and report.tokens_saved == 0
+
+def test_history_window_keeps_system_prompt_and_recent_turns():
+    calls = []
+    manager = HistoryManager(budget_tokens=1000, keep_turns=2, summarize=_recording_summarizer(calls))
+    messages = _conversation(12)
+    windowed, report = asyncio.run(manager.prepare(messages))
+    assert report.summary == "regenerated" and len(calls) == 1
+    assert report.tokens_after <= 1000 and report.tokens_saved == message_tokens(messages) - report.tokens_after
+    first = windowed[0].parts
+    assert first[0].content == "You are a household assistant."
+    assert first[1].content.endswith("summary #1")
+    assert windowed[-2:] == messages[-2:]
+    system_parts, turns = split_turns(windowed)
+    assert len(turns) == 12 - report.turns_summarized
+
+def test_history_summary_is_cached_until_the_window_moves():
+    calls = []
+    manager = HistoryManager(budget_tokens=1000, keep_turns=2, summarize=_recording_summarizer(calls))
+    messages = _conversation(12)
+    _, first = asyncio.run(manager.prepare(messages))
+    # One more turn still fits in the headroom left after the window moved
+    _, second = asyncio.run(manager.prepare(messages + _conversation(13)[-2:]))
+    assert second.summary == "cached" and len(calls) == 1
+    assert second.turns_summarized == first.turns_summarized
+    # Keep talking until the window has to move again; the summary rolls forward
+    longer = _conversation(20)
+    _, third = asyncio.run(manager.prepare(longer))
+    assert third.summary == "regenerated" and len(calls) == 2
+    previous, transcript = calls[1]
+    assert previous == "summary #1"
+    assert f"turn {first.turns_summarized}:" in transcript and "turn 0:" not in transcript
+
+def test_history_falls_back_to_extractive_summary():
+    async def broken(previous, transcript):
+        raise RuntimeError("model unavailable")
+    manager = HistoryManager(budget_tokens=1000, keep_turns=2, summarize=broken)
+    windowed, report = asyncio.run(manager.prepare(_conversation(12)))
+    assert report.tokens_saved > 0
+    assert "Assistant: reply" in windowed[0].parts[1].content
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from pydantic_ai.models.function import FunctionModel
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from backend.agents.llm_agent import HouseholdAssistantAgent, AssistantDeps
+from backend.agents.llm_backend import Cassette, CassetteMiss, RecordingModel, build_model, replay_model
+from backend.crud import member as member_crud
+
+def _live_model(calls):
+    def handler(messages, info):
+        calls.append(len(messages))
+        if len(messages) == 1:
+            return ModelResponse(parts=[ToolCallPart("create_member", {"name": "Robin"})])
+        return ModelResponse(parts=[TextPart("Robin has been added to the family.")])
+    return FunctionModel(handler)
+
+def test_record_then_replay_runs_tools_offline(db_session, tmp_path):
+    agent = HouseholdAssistantAgent()
+    deps = AssistantDeps(db=db_session)
+    path = str(tmp_path / "household.json")
+    calls = []
+
+    async def run(model):
+        with agent.agent.override(model=model):
+            return (await agent.agent.run("Add Robin to the family", deps=deps)).output
+
+    recorded = asyncio.run(run(RecordingModel(_live_model(calls), Cassette(path))))
+    assert len(calls) == 2
+    replayed = asyncio.run(run(replay_model(Cassette(path))))
+    assert replayed == recorded and len(calls) == 2  # the live model was not called again
+    # The replayed tool call really ran: Robin exists twice now
+    assert [m.name for m in member_crud.list_members(db_session, limit=None).items] == ["Robin", "Robin"]
+
+    async def stream():
+        with agent.agent.override(model=replay_model(Cassette(path), token_ms=1)):
+            async with agent.agent.run_stream("Add Robin to the family", deps=deps) as result:
+                return [delta async for delta in result.stream_text(delta=True, debounce_by=None)]
+    deltas = asyncio.run(stream())
+    assert "".join(deltas) == recorded and len(deltas) > 1
+
+    with pytest.raises(CassetteMiss):
+        asyncio.run(agent.agent.run("Something never recorded", deps=deps, model=replay_model(Cassette(path))))
+
+def test_build_model_follows_llm_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_CASSETTE_DIR", str(tmp_path))
+    monkeypatch.setenv("LLM_BACKEND", "replay")
+    assert isinstance(build_model("openai:gpt-4o", "household"), FunctionModel)
+    monkeypatch.setenv("LLM_BACKEND", "record")
+    assert isinstance(build_model("openai:gpt-4o", "household"), RecordingModel)
+    monkeypatch.setenv("LLM_BACKEND", "bogus")
+    with pytest.raises(ValueError):
+        build_model("openai:gpt-4o", "household")
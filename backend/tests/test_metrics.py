@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+from backend.main import app, household_agent
+from backend.metrics import (
+    AGENT_RUN_DURATION, AGENT_TOOL_DURATION, DB_POOL_CHECKOUT_WAIT, DB_STATEMENT_DURATION,
+    HTTP_REQUEST_DURATION, STAGE_RESOLUTIONS, MetricsRegistry,
+)
+
+client = TestClient(app)
+
+def test_histogram_and_counter_exposition():
+    registry = MetricsRegistry()
+    runs = registry.histogram("run_seconds", "Run time", ("kind", "outcome"), buckets=(0.1, 1.0))
+    calls = registry.counter("calls", "Calls", ("path",))
+    runs.observe(0.05, "a", "ok")
+    runs.observe(5, "a", "ok")
+    try:
+        with runs.time("b"):
+            raise ValueError
+    except ValueError:
+        pass
+    calls.inc('say "hi"')
+    text = registry.render()
+    assert "# TYPE run_seconds histogram" in text
+    assert 'run_seconds_bucket{kind="a",outcome="ok",le="0.1"} 1' in text
+    assert 'run_seconds_bucket{kind="a",outcome="ok",le="+Inf"} 2' in text
+    assert 'run_seconds_count{kind="a",outcome="ok"} 2' in text
+    assert 'run_seconds_count{kind="b",outcome="error"} 1' in text
+    assert 'calls_total{path="say \\"hi\\""} 1' in text
+
+def test_metrics_endpoint_times_routes_and_db():
+    before = HTTP_REQUEST_DURATION.count("GET", "/chores/{chore_id}", "404")
+    statements, checkouts = DB_STATEMENT_DURATION.count("select"), DB_POOL_CHECKOUT_WAIT.count()
+    assert client.get("/chores/987654").status_code == 404
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain")
+    # Labelled by the route template, not the raw path
+    assert HTTP_REQUEST_DURATION.count("GET", "/chores/{chore_id}", "404") == before + 1
+    assert 'route="/chores/{chore_id}",status="404"' in resp.text
+    assert DB_STATEMENT_DURATION.count("select") > statements
+    assert DB_POOL_CHECKOUT_WAIT.count() > checkouts
+    assert "db_pool_connections_in_use" in resp.text and "llm_slots_in_use" in resp.text
+
+def test_chat_records_agent_tool_and_stage_metrics(tool_then_reply):
+    runs, tools = AGENT_RUN_DURATION.count("chat", "ok"), AGENT_TOOL_DURATION.count("list_chores", "ok")
+    markers = STAGE_RESOLUTIONS.value("marker")
+    with household_agent.agent.override(model=tool_then_reply("list_chores", "Here is the list you asked for.")):
+        assert client.post("/chat/", json={"message": "Show my chores", "message_history": []}).status_code == 200
+    assert AGENT_RUN_DURATION.count("chat", "ok") == runs + 1
+    assert AGENT_TOOL_DURATION.count("list_chores", "ok") == tools + 1
+    assert STAGE_RESOLUTIONS.value("marker") == markers + 1
@@ -0,0 +1,46 @@
+import sqlite3
+from backend.database import get_engine, get_session_local
+from backend.migrations import upgrade
+from backend.crud.chore import get_chore, get_chores_for_member
+from backend.crud.meal import get_meal, get_meals_with_dish
+from backend.crud.recipe import search_recipes
+
+LEGACY_SCHEMA = """
+CREATE TABLE chores (id INTEGER NOT NULL, chore_name VARCHAR NOT NULL, icon VARCHAR, assigned_members TEXT NOT NULL,
+    start_date DATE NOT NULL, end_date DATE, due_time VARCHAR, repetition VARCHAR NOT NULL, reminder VARCHAR, type VARCHAR, PRIMARY KEY (id));
+CREATE TABLE meals (id INTEGER NOT NULL, meal_name VARCHAR NOT NULL, exist BOOLEAN NOT NULL, meal_kind VARCHAR NOT NULL,
+    meal_date DATE NOT NULL, dishes TEXT, PRIMARY KEY (id));
+INSERT INTO chores VALUES (1, 'Laundry', NULL, 'Alex,Jamie', '2024-01-01', NULL, '23:59', 'weekly', NULL, 'rotate');
+INSERT INTO chores VALUES (2, 'Dishes', NULL, 'Jamie', '2024-01-02', NULL, '23:59', 'daily', NULL, NULL);
+INSERT INTO meals VALUES (1, 'Pasta', 1, 'dinner', '2024-01-01', 'Spaghetti,Salad');
+INSERT INTO meals VALUES (2, 'Toast', 0, 'breakfast', '2024-01-02', NULL);
+CREATE TABLE recipes (id INTEGER NOT NULL, name VARCHAR NOT NULL, kind VARCHAR NOT NULL, description VARCHAR, PRIMARY KEY (id));
+INSERT INTO recipes VALUES (1, 'Spaghetti Bolognese', 'dinner', NULL);
+"""
+
+def test_upgrade_moves_comma_separated_lists(tmp_path):
+    """
+    A database in the old comma-separated format is migrated into the association tables, once.
+    """
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+    engine = get_engine(f"sqlite:///{db_path}")
+    migrated = upgrade(engine)
+    assert migrated["chore_assignments"] == 3
+    assert migrated["meal_dishes"] == 2
+    assert migrated["indexes"] > 0
+    assert migrated["recipes_fts"] == 1
+    assert upgrade(engine) == {}
+    db = get_session_local(engine)()
+    try:
+        assert list(get_chore(db, 1).assigned_members) == ["Alex", "Jamie"]
+        assert [c.chore_name for c in get_chores_for_member(db, "Jamie")] == ["Laundry", "Dishes"]
+        assert list(get_meal(db, 1).dishes) == ["Spaghetti", "Salad"]
+        assert list(get_meal(db, 2).dishes) == []
+        assert [m.meal_name for m in get_meals_with_dish(db, "Salad")] == ["Pasta"]
+        assert [r.name for r in search_recipes(db, "bolognese")] == ["Spaghetti Bolognese"]
+    finally:
+        db.close()
+        engine.dispose()
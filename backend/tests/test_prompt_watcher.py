@@ -0,0 +1,84 @@
+import time
+from pydantic_ai.models.function import FunctionModel
+from pydantic_ai.messages import ModelResponse, SystemPromptPart, TextPart
+from backend.agents import llm_agent
+from backend.agents.llm_agent import HouseholdAssistantAgent, AssistantDeps
+from backend.agents.prompt_watcher import PromptWatcher
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_burst_of_writes_is_one_reload(tmp_path):
+    path = tmp_path / "prompt.md"
+    path.write_text("v1", encoding="utf-8")
+    now = [0.0]
+    # Binary fractions, so the clock arithmetic is exact
+    watcher = PromptWatcher(debounce_seconds=0.25, poll_seconds=1, use_watchdog=False, clock=lambda: now[0])
+    published = []
+    watcher.subscribe(str(path), published.append)
+    first = watcher.snapshot(str(path))
+    assert (first.text, first.version) == ("v1", 1)
+
+    def wake_up():
+        # One pass of the watcher thread's loop, at the current clock
+        with watcher._lock:
+            due = watcher._due(now[0])
+        watcher._publish(due)
+
+    for text in ("v2 partial", "v2 almost", "v2"):
+        path.write_text(text, encoding="utf-8")
+        watcher.changed(str(path))
+        now[0] += 0.125
+        wake_up()
+    assert published == []  # never quiet for the whole debounce period yet
+    now[0] += 0.125
+    wake_up()
+    assert [(s.text, s.version) for s in published] == [("v2", 2)]
+    assert watcher.snapshot(str(path)) is published[0]
+    assert first.text == "v1"  # snapshots are never changed in place
+
+    path.write_text("v2", encoding="utf-8")  # same content again: nothing new to publish
+    watcher.changed(str(path))
+    now[0] += 1
+    wake_up()
+    assert len(published) == 1 and watcher.events == 4
+
+def test_polling_thread_publishes_changes(tmp_path):
+    path = tmp_path / "prompt.md"
+    path.write_text("v1", encoding="utf-8")
+    watcher = PromptWatcher(debounce_seconds=0.05, poll_seconds=0.01, use_watchdog=False)
+    published = []
+    watcher.subscribe(str(path), published.append)
+    watcher.snapshot(str(path))
+    watcher.start()
+    try:
+        path.write_text("v2 with a different size", encoding="utf-8")
+        assert _wait_for(lambda: published, timeout=10)
+        assert published[0].text == "v2 with a different size"
+    finally:
+        watcher.stop()
+
+def test_reloaded_system_prompt_applies_to_next_run(db_session, tmp_path, monkeypatch):
+    path = tmp_path / "household_agent_system.md"
+    path.write_text("Prompt one", encoding="utf-8")
+    monkeypatch.setattr(llm_agent, "PROMPT_PATH", str(path))
+    seen = []
+
+    def handler(messages, info):
+        seen.append([p.content for p in messages[0].parts if isinstance(p, SystemPromptPart)])
+        return ModelResponse(parts=[TextPart("ok")])
+
+    agent = HouseholdAssistantAgent()
+    deps = AssistantDeps(db=db_session)
+    with agent.agent.override(model=FunctionModel(handler)):
+        first = agent.agent.run_sync("hi", deps=deps)
+        path.write_text("Prompt two", encoding="utf-8")
+        agent.reload_prompt()
+        agent.agent.run_sync("hi", deps=deps)
+        # An ongoing conversation gets the new prompt too, not the one stored in its history
+        agent.agent.run_sync("again", deps=deps, message_history=first.all_messages())
+    assert seen == [["Prompt one"], ["Prompt two"], ["Prompt two"]]
+    assert agent.system_prompt == "Prompt two"
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+from backend.agents import stage_keywords
+from backend.agents.stage_classifier import heuristic_stage, keyword_in_text, offline_stage, stage_keyword_matcher
+
+CASES_PATH = os.path.join(os.path.dirname(__file__), '../../tools/stage_classifier_test_cases.json')
+
+def _per_keyword_stage(reply):
+    for stage, keywords in stage_keywords.STAGE_KEYWORDS_PRIORITY:
+        if any(keyword_in_text(kw, reply.lower()) for kw in keywords):
+            return stage
+    return None
+
+def test_compiled_matcher_keeps_priority_and_word_boundaries():
+    with open(CASES_PATH, encoding='utf-8') as f:
+        replies = [case['reply'] for case in json.load(f)]
+    replies += [
+        "Sorry, the chore has been created.",  # error outranks created
+        "This is the history of the chore.",    # 'hi' only as a whole word
+        "Hi! Could you tell me more?",          # greeting outranks collecting_info
+        "Nothing to see here",
+    ]
+    for reply in replies:
+        assert heuristic_stage(reply) == _per_keyword_stage(reply), reply
+    assert heuristic_stage(replies[-4]) == "error"
+    assert heuristic_stage(replies[-3]) is None
+    assert stage_keyword_matcher.match("Meal CREATED!") == ("created", "meal created")
+
+def test_compiled_matcher_rebuilds_when_keywords_change(monkeypatch):
+    assert heuristic_stage("Kumquat time") is None
+    monkeypatch.setattr(stage_keywords, "STAGE_KEYWORDS_PRIORITY", [("greeting", ["kumquat"]), *stage_keywords.STAGE_KEYWORDS_PRIORITY])
+    assert heuristic_stage("Kumquat time") == "greeting"
+    monkeypatch.undo()
+    assert heuristic_stage("Kumquat time") is None
+    # Lists edited in place are picked up on rebuild()
+    greeting = dict(stage_keywords.STAGE_KEYWORDS_PRIORITY)["greeting"]
+    greeting.append("kumquat")
+    try:
+        stage_keyword_matcher.rebuild()
+        assert heuristic_stage("Kumquat time") == "greeting"
+    finally:
+        greeting.remove("kumquat")
+        stage_keyword_matcher.rebuild()
+    assert heuristic_stage("Kumquat time") is None
+
+def test_stage_cache_coalesces_concurrent_calls():
+    from backend.agents.stage_cache import StageCache
+    cache = StageCache(max_entries=10, max_bytes=1024, ttl_seconds=60)
+    calls = []
+
+    async def classify(reply):
+        calls.append(reply)
+        await asyncio.sleep(0.01)
+        return "collecting_info"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_classify("Which day?", classify) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["collecting_info"] * 5
+    assert calls == ["Which day?"]
+    assert cache.stats()["coalesced"] == 4
+    assert asyncio.run(cache.get_or_classify("Which day?", classify)) == "collecting_info"
+    assert len(calls) == 1
+
+def test_stage_cache_ttl_bytes_and_invalidation():
+    from backend.agents.stage_cache import StageCache
+    now = [0.0]
+    cache = StageCache(max_entries=10, max_bytes=40, ttl_seconds=5, clock=lambda: now[0])
+    cache.put("a" * 10, "created")
+    cache.put("b" * 10, "error")
+    cache.put("c" * 10, "created")  # over 40 bytes: the oldest entry goes
+    assert cache.get("a" * 10) is None and cache.get("b" * 10) == "error"
+    now[0] = 6
+    assert cache.get("b" * 10) is None and cache.stats()["expirations"] == 1
+    generation = cache.generation
+    cache.clear()
+    cache.put("d", "created", generation)  # started under the old prompt
+    assert cache.get("d") is None
+
+def test_reload_prompt_clears_stage_cache():
+    from backend.agents.stage_cache import stage_cache
+    from backend.agents.stage_classifier import reload_prompt
+    stage_cache.put("Anything else?", "collecting_info")
+    reload_prompt()
+    assert stage_cache.get("Anything else?") is None
+
+def test_offline_stage_prefers_marker_then_heuristic():
+    assert offline_stage("<!-- stage: confirming_info -->\nChore created?") == ("confirming_info", "marker")
+    assert offline_stage("Sorry, something went wrong.") == ("error", "heuristic")
+    assert offline_stage("Nothing to see here") == (None, "llm")
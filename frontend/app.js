@@ -8,6 +8,7 @@ let stepError = '';
 
 // --- Chat UI State ---
 let chatMessages = [];
+let chatSessionId = null; // server-side conversation; the backend keeps the history
 let chatLoading = false;
 let chatError = '';
 
@@ -590,7 +591,7 @@ function renderCreated(message, id) {
   document.getElementById('backBtn').onclick = renderMenu;
 }
 
-async function fetchAndShowList(listMode) {
+async function fetchAndShowList(listMode, cursor = null, previousRows = []) {
   stepLoading = false;
   stepError = '';
   let endpoint, label;
@@ -604,15 +605,20 @@ async function fetchAndShowList(listMode) {
     endpoint = '/recipes';
     label = 'Recipes';
   }
-  const res = await fetch(`http://localhost:8000${endpoint}`);
-  const data = await res.json();
+  // Lists are paginated server-side; X-Next-Cursor points at the next page
+  const url = cursor ? `http://localhost:8000${endpoint}?cursor=${encodeURIComponent(cursor)}` : `http://localhost:8000${endpoint}`;
+  const res = await fetch(url);
+  const data = previousRows.concat(await res.json());
+  const nextCursor = res.headers.get('X-Next-Cursor');
   app.innerHTML = `
     <h2 class="text-xl font-semibold text-blue-700 mb-4">All ${label}</h2>
     ${renderTable(data, label.toLowerCase())}
-    <div class="mt-6 flex justify-center">
+    <div class="mt-6 flex justify-center gap-3">
+      ${nextCursor ? '<button class="px-4 py-2 bg-blue-600 text-white rounded shadow hover:bg-blue-700 transition" id="loadMoreBtn">Load more</button>' : ''}
       <button class="px-4 py-2 bg-gray-400 text-white rounded shadow hover:bg-gray-600 transition" id="backBtn">Back to Menu</button>
     </div>
   `;
+  if (nextCursor) document.getElementById('loadMoreBtn').onclick = () => fetchAndShowList(listMode, nextCursor, data);
   document.getElementById('backBtn').onclick = renderMenu;
 }
 
@@ -942,37 +948,72 @@ function handleChatSubmit(e) {
   chatError = '';
   renderMenu();
   scrollChatToBottom();
-  // Send to backend with full message history
-  fetch('http://localhost:8000/chat/', {
+  // Send only the new message; the reply streams back as Server-Sent Events
+  const payload = chatSessionId ? { message: msg, session_id: chatSessionId } : { message: msg };
+  const botMessage = { role: 'bot', content: '', stage: null };
+  let renderScheduled = false;
+  const scheduleRender = () => {
+    // Coalesce token bursts into one repaint per frame
+    if (renderScheduled) return;
+    renderScheduled = true;
+    requestAnimationFrame(() => {
+      renderScheduled = false;
+      renderMenu();
+      scrollChatToBottom();
+    });
+  };
+  const handleEvent = (event, data) => {
+    if (event === 'token') {
+      // Input stays disabled (chatLoading) until the done event arrives
+      if (!chatMessages.includes(botMessage)) chatMessages.push(botMessage);
+      botMessage.content += data.text;
+      scheduleRender();
+    } else if (event === 'done') {
+      console.log('[STAGE CLASSIFIER] Final stage:', data.stage, '| Reply:', data.reply);
+      if (data.session_id) chatSessionId = data.session_id;
+      if (!chatMessages.includes(botMessage)) chatMessages.push(botMessage);
+      botMessage.content = data.reply || 'Sorry, I did not understand that.';
+      botMessage.stage = data.reply ? data.stage : 'error';
+      chatLoading = false;
+      scheduleRender();
+    }
+  };
+  fetch('http://localhost:8000/chat/stream', {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({
-      message: msg,
-      message_history: chatMessages.map(m => ({
-        role: m.role === 'bot' ? 'assistant' : m.role,
-        content: m.content
-      }))
-    })
+    headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+    body: JSON.stringify(payload)
   })
-    .then(res => res.json())
-    .then(data => {
-      if (typeof data === 'string') {
-        try {
-          data = JSON.parse(data);
-        } catch (e) {
-          // Optionally keep this error log for rare parse issues
-          console.error('Failed to parse data:', data);
+    .then(async res => {
+      if (res.status === 503) {
+        // Assistant busy: the body is a ready-made error reply
+        handleEvent('done', await res.json());
+        return;
+      }
+      if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          let event = 'message';
+          let data = '';
+          frame.split('\n').forEach(line => {
+            if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+          });
+          if (data) handleEvent(event, JSON.parse(data));
         }
       }
-      console.log('[STAGE CLASSIFIER] Final stage:', data.stage, '| Reply:', data.reply);
-      if (data && data.reply) {
-        chatMessages.push({ role: 'bot', content: data.reply, stage: data.stage });
-      } else {
-        chatMessages.push({ role: 'bot', content: 'Sorry, I did not understand that.', stage: 'error' });
+      if (chatLoading) {
+        // Stream ended without a done event
+        handleEvent('done', { reply: botMessage.content, stage: 'unknown' });
       }
-      chatLoading = false;
-      renderMenu();
-      scrollChatToBottom();
     })
     .catch(err => {
       chatError = 'Error contacting assistant.';
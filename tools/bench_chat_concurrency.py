@@ -0,0 +1,103 @@
+"""
+Benchmark concurrent /chat/ throughput with DB calls run inline on the event loop
+versus offloaded to the bounded DB thread pool (backend.crud.aio.AsyncCrud).
+
+The LLM is replaced by a local FunctionModel that calls the list_chores tool and
+then replies, and every SQL statement is delayed to simulate a slow disk, so the
+numbers isolate how much the event loop is blocked by database I/O.
+
+    python tools/bench_chat_concurrency.py --requests 64 --concurrency 16 --db-latency-ms 20
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def setup_app(db_path: str, db_latency: float, n_chores: int, concurrency: int):
+    os.environ['TEST_DB_URL'] = f"sqlite:///{db_path}"
+    # Enough pooled connections for every in-flight request; inline mode would
+    # otherwise block the loop on pool checkout and deadlock until the timeout
+    os.environ['DB_POOL_SIZE'] = str(concurrency)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-offline-benchmark')
+    from sqlalchemy import event
+    from pydantic_ai import models
+    from pydantic_ai.models.function import FunctionModel, AgentInfo
+    from pydantic_ai.messages import ModelResponse, ToolCallPart, TextPart, ToolReturnPart
+    from backend.database import Base, get_registered_engine, get_registered_sessionmaker
+    from backend.main import app, household_agent
+    from backend.crud import chore as chore_crud
+    from backend.schemas import ChoreCreate
+    from datetime import date
+
+    models.ALLOW_MODEL_REQUESTS = False
+    engine = get_registered_engine()
+    Base.metadata.create_all(bind=engine)
+    db = get_registered_sessionmaker()()
+    for i in range(n_chores):
+        chore_crud.create_chore(db, ChoreCreate(
+            chore_name=f"Chore {i}", assigned_members=["Alex"], start_date=date.today(), repetition="weekly"
+        ))
+    db.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _slow_disk(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(db_latency)
+
+    async def handler(messages, info: AgentInfo):
+        if any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+            return ModelResponse(parts=[TextPart("Here is the chore summary.")])
+        return ModelResponse(parts=[ToolCallPart("list_chores", {})])
+
+    household_agent.agent.model = FunctionModel(handler)
+    return app
+
+
+async def run_load(app, n_requests: int, concurrency: int):
+    import httpx
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(i):
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post("/chat/", json={"message": f"List all chores ({i})", "message_history": []})
+                latencies.append(time.perf_counter() - t0)
+                assert r.status_code == 200 and r.json()["stage"] != "error", r.text
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        'rps': n_requests / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /chat/ throughput: inline vs thread-offloaded DB access.")
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--db-latency-ms', type=float, default=20.0, help='Simulated latency added to every SQL statement')
+    parser.add_argument('--chores', type=int, default=50, help='Rows seeded into the chores table')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = setup_app(os.path.join(tmp, 'bench.db'), args.db_latency_ms / 1000, args.chores, args.concurrency)
+        print(f"{args.requests} requests, concurrency {args.concurrency}, {args.db_latency_ms:.0f} ms per SQL statement\n")
+        print(f"{'mode':<8} {'req/s':>8} {'p50 ms':>9} {'max ms':>9}")
+        for mode in ('inline', 'thread'):
+            os.environ['ASYNC_DB_MODE'] = mode
+            stats = asyncio.run(run_load(app, args.requests, args.concurrency))
+            print(f"{mode:<8} {stats['rps']:>8.1f} {stats['p50_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark time to first byte of /chat/ versus the streaming /chat/stream endpoint.
+
+The LLM is replaced by a local FunctionModel that emits a reply as a stream of
+tokens with a fixed delay between them (and the same total delay for the
+non-streaming call), so the numbers show how long a user waits before seeing
+anything at a given generation speed.
+
+    python tools/bench_chat_ttfb.py --tokens 60 --token-ms 25 --requests 10
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def setup_app(db_path: str, n_tokens: int, token_delay: float):
+    os.environ['TEST_DB_URL'] = f"sqlite:///{db_path}"
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-offline-benchmark')
+    from pydantic_ai import models
+    from pydantic_ai.models.function import FunctionModel
+    from pydantic_ai.messages import ModelResponse, TextPart
+    from backend.database import Base, get_registered_engine
+    from backend.main import app, household_agent
+
+    models.ALLOW_MODEL_REQUESTS = False
+    Base.metadata.create_all(bind=get_registered_engine())
+    words = [f"word{i} " for i in range(n_tokens - 1)] + ["Chore created successfully!"]
+
+    async def handler(messages, info):
+        await asyncio.sleep(token_delay * n_tokens)
+        return ModelResponse(parts=[TextPart("".join(words))])
+
+    async def stream_handler(messages, info):
+        for word in words:
+            await asyncio.sleep(token_delay)
+            yield word
+
+    household_agent.agent.model = FunctionModel(handler, stream_function=stream_handler)
+    return app
+
+
+async def post_asgi(app, path: str, payload: dict):
+    """
+    POST straight to the ASGI app and time the first body frame, the first reply
+    text and the end of the response (httpx's ASGITransport buffers the whole
+    body, which would hide streaming).
+    """
+    body = json.dumps(payload).encode()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        'client': ('127.0.0.1', 1234), 'server': ('bench', 80),
+    }
+    sent = False
+    first = first_text = None
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal first, first_text
+        chunk = message.get('body') if message['type'] == 'http.response.body' else None
+        if not chunk:
+            return
+        now = time.perf_counter()
+        first = first or now
+        if first_text is None and (b'event: token' in chunk or b'"reply"' in chunk):
+            first_text = now
+
+    t0 = time.perf_counter()
+    await app(scope, receive, send)
+    return first - t0, first_text - t0, time.perf_counter() - t0
+
+
+async def measure(app, path: str, n_requests: int):
+    samples = [await post_asgi(app, path, {"message": f"Add a chore ({i})", "message_history": []}) for i in range(n_requests)]
+    p50 = lambda values: sorted(values)[len(values) // 2] * 1000
+    return {
+        'ttfb_p50_ms': p50([s[0] for s in samples]),
+        'first_text_p50_ms': p50([s[1] for s in samples]),
+        'total_p50_ms': p50([s[2] for s in samples]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first byte: /chat/ vs /chat/stream.")
+    parser.add_argument('--tokens', type=int, default=60, help='Tokens in the simulated reply')
+    parser.add_argument('--token-ms', type=float, default=25.0, help='Simulated generation time per token')
+    parser.add_argument('--requests', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = setup_app(os.path.join(tmp, 'bench.db'), args.tokens, args.token_ms / 1000)
+        print(f"{args.requests} sequential requests, {args.tokens} tokens at {args.token_ms:.0f} ms each\n")
+        print(f"{'endpoint':<14} {'TTFB p50 ms':>12} {'first text ms':>14} {'total p50 ms':>13}")
+        for path in ('/chat/', '/chat/stream'):
+            stats = asyncio.run(measure(app, path, args.requests))
+            print(f"{path:<14} {stats['ttfb_p50_ms']:>12.1f} {stats['first_text_p50_ms']:>14.1f} {stats['total_p50_ms']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
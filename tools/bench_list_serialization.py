@@ -0,0 +1,105 @@
+"""
+Benchmark list serialization: ORM + schema validation versus the column-projection fast path.
+
+For each dataset size, seeds a file database with chores (and their assignments)
+and times building the full JSON body for every row:
+
+  original  ORM objects -> ChoreRead -> response_model re-validation -> jsonable_encoder -> json.dumps
+  strict    ORM objects -> ChoreRead -> pydantic dump_json (STRICT_RESPONSES=1)
+  fast      column tuples -> dicts -> backend.fastjson.dumps (default; orjson when installed)
+
+    python tools/bench_list_serialization.py --rows 10000 100000 --repeat 3
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import date, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from backend.database import get_engine, get_session_local
+from backend.migrations import upgrade
+from backend.crud import chore as chore_crud
+from backend.schemas import ChoreCreate, ChoreRead
+from backend import fastjson
+
+MEMBERS = ["Alex", "Sam", "Jordan", "Taylor"]
+CHORES_ADAPTER = TypeAdapter(List[ChoreRead])
+
+
+def to_read(orm):
+    return ChoreRead(
+        id=orm.id, chore_name=orm.chore_name, icon=orm.icon, assigned_members=list(orm.assigned_members),
+        start_date=orm.start_date, end_date=orm.end_date, due_time=orm.due_time, repetition=orm.repetition,
+        reminder=orm.reminder, type=orm.type,
+    )
+
+
+def original(db):
+    items = [to_read(c) for c in chore_crud.list_chores(db, limit=None).items]
+    validated = CHORES_ADAPTER.validate_python(items, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False).encode("utf-8")
+
+
+def strict(db):
+    items = [to_read(c) for c in chore_crud.list_chores(db, limit=None).items]
+    return CHORES_ADAPTER.dump_json(items)
+
+
+def fast(db):
+    return fastjson.dumps(chore_crud.list_chore_rows(db, limit=None).items)
+
+
+def seed(SessionLocal, n_rows: int):
+    db = SessionLocal()
+    start = date(2024, 1, 1)
+    chore_crud.create_chores_bulk(db, [
+        ChoreCreate(
+            chore_name=f"Chore {i}", assigned_members=MEMBERS[: 1 + i % 3],
+            start_date=start + timedelta(days=i % 365), repetition="weekly", type="rotate",
+        )
+        for i in range(n_rows)
+    ])
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time full-table JSON list responses: strict ORM path vs column-projection fast path.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per path; the best time is reported')
+    args = parser.parse_args()
+
+    print(f"JSON encoder for the fast path: {'orjson' if fastjson.orjson else 'stdlib json'}\n")
+    print(f"{'rows':>8} {'path':<9} {'best ms':>9} {'rows/s':>11} {'body KB':>9} {'speedup':>8}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = get_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            upgrade(engine)
+            SessionLocal = get_session_local(engine)
+            seed(SessionLocal, n_rows)
+            results = {}
+            for name, fn in (("original", original), ("strict", strict), ("fast", fast)):
+                best, body = None, b""
+                for _ in range(args.repeat):
+                    db = SessionLocal()  # fresh identity map each run
+                    t0 = time.perf_counter()
+                    body = fn(db)
+                    elapsed = time.perf_counter() - t0
+                    db.close()
+                    best = elapsed if best is None else min(best, elapsed)
+                results[name] = (best, body)
+            assert json.loads(results["fast"][1]) == json.loads(results["strict"][1])
+            baseline = results["original"][0]
+            for name, (best, body) in results.items():
+                print(f"{n_rows:>8} {name:<9} {best * 1000:>9.1f} {n_rows / best:>11,.0f} {len(body) / 1024:>9.0f} {baseline / best:>7.1f}x")
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark concurrent SQLite reads and writes under each SQLITE_PROFILE.
+
+Seeds a file database with a realistic household dataset (chores with assigned
+members, meals with dishes), then runs reader threads paging through filtered
+chore/meal lists while writer threads create and update chores, committing
+after every change like the API does. Reports throughput, read latency and
+"database is locked" errors per profile.
+
+    python tools/bench_sqlite_profile.py --chores 20000 --meals 20000 --readers 8 --writers 2 --seconds 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import OperationalError
+from backend.database import SQLITE_PROFILES, get_engine, get_session_local
+from backend.migrations import upgrade
+from backend.crud import chore as chore_crud, meal as meal_crud
+from backend.schemas import ChoreCreate, MealCreate
+
+MEMBERS = ["Alex", "Sam", "Jordan", "Taylor", "Riley", "Casey"]
+REPETITIONS = ["daily", "weekly", "monthly"]
+MEAL_KINDS = ["breakfast", "lunch", "dinner"]
+DISHES = ["Pasta", "Salad", "Soup", "Curry", "Tacos", "Pancakes", "Stir fry", "Risotto"]
+
+
+def seed(SessionLocal, n_chores: int, n_meals: int):
+    rng = random.Random(0)
+    start = date(2024, 1, 1)
+    db = SessionLocal()
+    chore_crud.create_chores_bulk(db, [
+        ChoreCreate(
+            chore_name=f"Chore {i}",
+            assigned_members=rng.sample(MEMBERS, rng.randint(1, 3)),
+            start_date=start + timedelta(days=rng.randrange(365)),
+            repetition=rng.choice(REPETITIONS),
+        )
+        for i in range(n_chores)
+    ])
+    meal_crud.create_meals_bulk(db, [
+        MealCreate(
+            meal_name=f"Meal {i}",
+            exist=True,
+            meal_kind=rng.choice(MEAL_KINDS),
+            meal_date=start + timedelta(days=rng.randrange(365)),
+            dishes=rng.sample(DISHES, rng.randint(1, 3)),
+        )
+        for i in range(n_meals)
+    ])
+    db.commit()
+    db.close()
+
+
+def reader(SessionLocal, stop, stats, seed_value):
+    rng = random.Random(seed_value)
+    while not stop.is_set():
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        try:
+            if rng.random() < 0.5:
+                page = chore_crud.list_chores(db, limit=100, member=rng.choice(MEMBERS), sort="start_date")
+            else:
+                page = meal_crud.list_meals(db, limit=100, meal_kind=rng.choice(MEAL_KINDS), sort="meal_date")
+            # Touch the association proxies so child rows are loaded too
+            for row in page.items:
+                list(getattr(row, 'assigned_members', None) or getattr(row, 'dishes', None) or [])
+            stats['read_latencies'].append(time.perf_counter() - t0)
+        except OperationalError:
+            stats['read_errors'] += 1
+        finally:
+            db.close()
+
+
+def writer(SessionLocal, stop, stats, seed_value, max_chore_id):
+    rng = random.Random(seed_value)
+    while not stop.is_set():
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        try:
+            if rng.random() < 0.5:
+                chore_crud.create_chore(db, ChoreCreate(
+                    chore_name="Bench chore", assigned_members=[rng.choice(MEMBERS)],
+                    start_date=date.today(), repetition=rng.choice(REPETITIONS),
+                ))
+            else:
+                chore_crud.update_chore(db, rng.randint(1, max_chore_id), ChoreCreate(
+                    chore_name="Updated chore", assigned_members=rng.sample(MEMBERS, 2),
+                    start_date=date.today(), repetition=rng.choice(REPETITIONS),
+                ))
+            stats['write_latencies'].append(time.perf_counter() - t0)
+        except OperationalError:
+            db.rollback()
+            stats['write_errors'] += 1
+        finally:
+            db.close()
+
+
+def run_profile(profile: str, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = get_engine(db_url, sqlite_profile=profile, pool_size=args.readers + args.writers, max_overflow=0)
+        upgrade(engine)
+        SessionLocal = get_session_local(engine)
+        seed(SessionLocal, args.chores, args.meals)
+
+        stats = {'read_latencies': [], 'write_latencies': [], 'read_errors': 0, 'write_errors': 0}
+        stop = threading.Event()
+        threads = [threading.Thread(target=reader, args=(SessionLocal, stop, stats, i)) for i in range(args.readers)]
+        threads += [
+            threading.Thread(target=writer, args=(SessionLocal, stop, stats, 1000 + i, args.chores))
+            for i in range(args.writers)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    reads = sorted(stats['read_latencies'])
+    writes = sorted(stats['write_latencies'])
+    pct = lambda values, q: values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else float('nan')
+    return {
+        'reads_s': len(reads) / args.seconds,
+        'writes_s': len(writes) / args.seconds,
+        'read_p50_ms': pct(reads, 0.5),
+        'read_p95_ms': pct(reads, 0.95),
+        'write_p95_ms': pct(writes, 0.95),
+        'errors': stats['read_errors'] + stats['write_errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent SQLite read/write throughput per SQLITE_PROFILE.")
+    parser.add_argument('--chores', type=int, default=20000)
+    parser.add_argument('--meals', type=int, default=20000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--profiles', nargs='+', default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{args.chores} chores, {args.meals} meals, {args.readers} readers, {args.writers} writers, {args.seconds:.0f}s per profile\n")
+    print(f"{'profile':<12} {'reads/s':>9} {'writes/s':>9} {'read p50':>9} {'read p95':>9} {'write p95':>10} {'errors':>7}")
+    for profile in args.profiles:
+        s = run_profile(profile, args)
+        print(f"{profile:<12} {s['reads_s']:>9.1f} {s['writes_s']:>9.1f} {s['read_p50_ms']:>8.1f}ms "
+              f"{s['read_p95_ms']:>8.1f}ms {s['write_p95_ms']:>9.1f}ms {s['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Offline accuracy and latency of the stage resolution paths that skip the LLM.
+
+Runs over tools/stage_classifier_test_cases.json and the examples file with no
+network, in two modes:
+
+  served     backend.agents.stage_classifier.offline_stage, exactly as /chat/
+             resolves a reply before it falls back to the LLM: the stage
+             marker first, then the STAGE_KEYWORDS_PRIORITY heuristic
+  heuristic  the keyword heuristic alone, on the replies with their stage
+             markers removed, i.e. what a reply without a marker gets
+
+For each mode it prints the coverage (the share of replies resolved without the
+LLM), the accuracy of those resolved replies, a confusion matrix of expected
+against resolved stage ("llm" marks replies left to the classifier), and the
+time per reply. --show-errors lists the misresolved replies, and --output
+writes everything as JSON.
+
+    python tools/bench_stage_heuristic.py
+    python tools/bench_stage_heuristic.py --repeat 500 --show-errors --output heuristic.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.agents.stage_classifier import STAGE_MARKER_RE, offline_stage, stage_keyword_matcher
+
+TOOLS_DIR = os.path.dirname(__file__)
+CASE_FILES = ['stage_classifier_test_cases.json', 'stage_classifier_examples.json']
+
+
+def load_cases():
+    cases, seen = [], set()
+    for name in CASE_FILES:
+        path = os.path.join(TOOLS_DIR, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for case in json.load(f):
+                key = (case['reply'], case['expected_stage'])
+                if key not in seen:
+                    seen.add(key)
+                    cases.append(case)
+    return cases
+
+
+def served(reply):
+    return offline_stage(reply)
+
+
+def heuristic(reply):
+    matched = stage_keyword_matcher.match(STAGE_MARKER_RE.sub("", reply))
+    return (matched[0], "heuristic") if matched else (None, "llm")
+
+
+MODES = {"served": served, "heuristic": heuristic}
+
+
+def evaluate(resolve, cases, repeat: int) -> dict:
+    confusion = defaultdict(Counter)  # expected -> resolved (or "llm") -> count
+    paths = Counter()
+    errors = []
+    per_reply_us = []
+    for case in cases:
+        reply, expected = case['reply'], case['expected_stage']
+        stage, path = resolve(reply)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            resolve(reply)
+        per_reply_us.append((time.perf_counter() - start) / repeat * 1e6)
+        paths[path] += 1
+        confusion[expected][stage or "llm"] += 1
+        if stage is not None and stage != expected:
+            errors.append({"description": case.get('description', ''), "expected": expected, "got": stage, "path": path, "reply": reply})
+    resolved = len(cases) - paths["llm"]
+    correct = sum(counts[expected] for expected, counts in confusion.items())
+    per_reply_us.sort()
+    return {
+        "cases": len(cases),
+        "coverage": round(resolved / len(cases), 4) if cases else 0.0,
+        "paths": dict(paths),
+        "accuracy_resolved": round(correct / resolved, 4) if resolved else 0.0,
+        "confusion": {expected: dict(counts) for expected, counts in sorted(confusion.items())},
+        "latency_us": {
+            "mean": round(sum(per_reply_us) / len(per_reply_us), 2) if per_reply_us else 0.0,
+            "p50": round(per_reply_us[len(per_reply_us) // 2], 2) if per_reply_us else 0.0,
+            "p95": round(per_reply_us[min(len(per_reply_us) - 1, int(0.95 * len(per_reply_us)))], 2) if per_reply_us else 0.0,
+            "max": round(per_reply_us[-1], 2) if per_reply_us else 0.0,
+        },
+        "errors": errors,
+    }
+
+
+def print_report(mode: str, report: dict, show_errors: bool):
+    paths = ", ".join(f"{path} {n}" for path, n in sorted(report["paths"].items()))
+    print(f"== {mode}: {report['cases']} replies ({paths})")
+    print(f"coverage {report['coverage']:.1%} resolved without the LLM, accuracy {report['accuracy_resolved']:.1%} of those")
+    lat = report["latency_us"]
+    print(f"latency per reply: mean {lat['mean']:.1f} us, p50 {lat['p50']:.1f} us, p95 {lat['p95']:.1f} us, max {lat['max']:.1f} us")
+    columns = sorted({c for counts in report["confusion"].values() for c in counts} - {"llm"}) + ["llm"]
+    width = max(len(c) for c in columns + list(report["confusion"])) + 2
+    corner = "expected \\ got"
+    print(f"\n{corner:<{width}}" + "".join(f"{c:>{width}}" for c in columns))
+    for expected, counts in report["confusion"].items():
+        print(f"{expected:<{width}}" + "".join(f"{counts.get(c, 0):>{width}}" for c in columns))
+    if show_errors and report["errors"]:
+        print("\nmisresolved:")
+        for e in report["errors"]:
+            print(f"  [{e['path']}] expected {e['expected']}, got {e['got']}: {e['description'] or e['reply'][:80]}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coverage, confusion matrix and latency of the marker and keyword stage paths (no LLM, no network).")
+    parser.add_argument('--mode', choices=('all', *MODES), default='all')
+    parser.add_argument('--repeat', type=int, default=200, help='Timed repetitions per reply')
+    parser.add_argument('--show-errors', action='store_true', help='List replies resolved to the wrong stage')
+    parser.add_argument('--output', default=None, help='Write the reports as JSON')
+    args = parser.parse_args()
+
+    cases = load_cases()
+    modes = MODES if args.mode == 'all' else {args.mode: MODES[args.mode]}
+    reports = {mode: evaluate(resolve, cases, args.repeat) for mode, resolve in modes.items()}
+    for mode, report in reports.items():
+        print_report(mode, report, args.show_errors)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+        print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
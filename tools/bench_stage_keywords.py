@@ -0,0 +1,82 @@
+"""
+Benchmark the stage keyword heuristic: one regex per keyword versus the compiled matcher.
+
+Runs both over every reply in tools/stage_classifier_test_cases.json (plus the
+examples file), checks they pick the same stage, and reports the time per reply.
+
+  per-keyword  the previous implementation: re.sub + a fresh regex for each of the ~80 keywords
+  compiled     backend.agents.stage_classifier.stage_keyword_matcher (one alternation per stage)
+
+    python tools/bench_stage_keywords.py --repeat 200
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.agents.stage_keywords import STAGE_KEYWORDS_PRIORITY
+from backend.agents.stage_classifier import stage_keyword_matcher
+
+TOOLS_DIR = os.path.dirname(__file__)
+CASE_FILES = ['stage_classifier_test_cases.json', 'stage_classifier_examples.json']
+
+
+def per_keyword_in_text(keyword, text):
+    text_clean = re.sub(r'[^\w\s]', ' ', text)
+    if re.match(r'^\w+$', keyword):
+        return re.search(rf'\b{re.escape(keyword)}\b', text_clean, re.IGNORECASE) is not None
+    return re.search(re.escape(keyword), text, re.IGNORECASE) is not None
+
+
+def per_keyword(reply):
+    reply_lower = reply.lower()
+    for stage, keywords in STAGE_KEYWORDS_PRIORITY:
+        for kw in keywords:
+            if per_keyword_in_text(kw, reply_lower):
+                return stage
+    return None
+
+
+def compiled(reply):
+    matched = stage_keyword_matcher.match(reply)
+    return matched[0] if matched else None
+
+
+def load_replies():
+    replies = []
+    for name in CASE_FILES:
+        path = os.path.join(TOOLS_DIR, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                replies.extend(case['reply'] for case in json.load(f) if 'reply' in case)
+    return replies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the stage keyword heuristic: per-keyword regexes vs the compiled matcher.")
+    parser.add_argument('--repeat', type=int, default=200, help='Passes over the test replies')
+    args = parser.parse_args()
+
+    replies = load_replies()
+    mismatches = [r for r in replies if per_keyword(r) != compiled(r)]
+    assert not mismatches, f"Matchers disagree on {len(mismatches)} replies, e.g. {mismatches[0]!r}"
+
+    print(f"{len(replies)} replies x {args.repeat} passes\n")
+    print(f"{'matcher':<12} {'us/reply':>9} {'speedup':>8}")
+    baseline = None
+    for name, fn in (('per-keyword', per_keyword), ('compiled', compiled)):
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            for reply in replies:
+                fn(reply)
+        per_reply = (time.perf_counter() - t0) / (len(replies) * args.repeat)
+        baseline = baseline or per_reply
+        print(f"{name:<12} {per_reply * 1e6:>9.1f} {baseline / per_reply:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark worker cold start: importing backend.main, running the app's startup
+hooks, and serving the first requests.
+
+Every run is a fresh interpreter against a new temporary SQLite database, so
+nothing is warm. The runs record:
+  import        import backend.main
+  startup       the lifespan startup (schema upgrade, session eviction, prompt watchers)
+  first_health  the first GET /health
+  first_list    the first GET /chores
+  first_chat    the first POST /chat/, which builds the agents (LLM_BACKEND=test, no network)
+  cold_start    from spawning the interpreter until the first /health response
+The tool prints the median, min and max over --runs runs. It writes the results
+as JSON tagged with the git commit (--output), and --compare OLD.json prints
+the change. --top-imports N also lists the slowest modules that backend.main
+imports directly, measured with python -X importtime.
+
+    python tools/bench_startup.py --runs 5
+    python tools/bench_startup.py --output after.json --compare before.json --top-imports 10
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PHASES = ("import", "startup", "first_health", "first_list", "first_chat", "cold_start")
+
+
+def child(spawned_at: float):
+    """One cold start, run in a fresh interpreter; prints the timings as JSON."""
+    sys.path.insert(0, ROOT)
+    timings = {}
+    t0 = time.perf_counter()
+    from backend.main import app
+    timings["import"] = time.perf_counter() - t0
+
+    async def run():
+        import httpx
+        t0 = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["startup"] = time.perf_counter() - t0
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                for phase, method, path, body in (
+                    ("first_health", "GET", "/health", None),
+                    ("first_list", "GET", "/chores", None),
+                    ("first_chat", "POST", "/chat/", {"message": "List all chores", "message_history": []}),
+                ):
+                    t0 = time.perf_counter()
+                    resp = await client.request(method, path, json=body)
+                    resp.raise_for_status()
+                    timings[phase] = time.perf_counter() - t0
+                    if phase == "first_health":
+                        timings["cold_start"] = time.time() - spawned_at
+
+    asyncio.run(run())
+    print(json.dumps({phase: round(seconds * 1000, 2) for phase, seconds in timings.items()}))
+
+
+def child_env(db_path: str) -> dict:
+    return {
+        **os.environ,
+        "TEST_DB_URL": f"sqlite:///{db_path}",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-offline-benchmark"),
+        "LLM_BACKEND": "test",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def cold_start(tmp: str, run: int) -> dict:
+    env = child_env(os.path.join(tmp, f"startup{run}.db"))
+    spawned_at = time.time()
+    out = subprocess.run([sys.executable, __file__, "--child", str(spawned_at)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def top_imports(tmp: str, n: int):
+    """(module, cumulative ms) of the slowest direct imports of backend.main."""
+    env = child_env(os.path.join(tmp, "importtime.db"))
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend.main"], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # -X importtime indents a module two spaces per level below the module that imported it
+        if cumulative.strip().isdigit() and len(name) - len(name.lstrip()) == 3:
+            rows.append((name.strip(), int(cumulative) / 1000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:n]
+
+
+def summarize(samples):
+    return {
+        phase: {
+            "median_ms": round(statistics.median(s[phase] for s in samples), 2),
+            "min_ms": round(min(s[phase] for s in samples), 2),
+            "max_ms": round(max(s[phase] for s in samples), 2),
+        }
+        for phase in PHASES
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(float(sys.argv[2]))
+        return
+    parser = argparse.ArgumentParser(description="Import time and time to first served request of backend.main, in fresh interpreters.")
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts to measure')
+    parser.add_argument('--top-imports', type=int, default=0, help='Also list the N slowest direct imports of backend.main')
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(__file__), 'bench_startup_results.json'))
+    parser.add_argument('--compare', default=None, help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        samples = [cold_start(tmp, i) for i in range(args.runs)]
+        imports = top_imports(tmp, args.top_imports) if args.top_imports else []
+
+    results = {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": args.runs, "phases": summarize(samples)}
+    print(f"{args.runs} cold starts\n")
+    print(f"{'phase':<14} {'median ms':>10} {'min ms':>9} {'max ms':>9}")
+    for phase, s in results["phases"].items():
+        print(f"{phase:<14} {s['median_ms']:>10.1f} {s['min_ms']:>9.1f} {s['max_ms']:>9.1f}")
+    if imports:
+        print("\nslowest direct imports of backend.main (cumulative ms)")
+        for name, ms in imports:
+            print(f"  {name:<40} {ms:>8.1f}")
+        results["top_imports"] = [{"module": name, "cumulative_ms": ms} for name, ms in imports]
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        print(f"\nvs {old.get('commit', '?')}: change in median")
+        for phase, s in results["phases"].items():
+            before = old.get("phases", {}).get(phase, {}).get("median_ms")
+            if before:
+                print(f"{phase:<14} {(s['median_ms'] - before) / before * 100:+.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Load test backend.main:app: throughput and tail latency per endpoint under a request mix.
+
+Workers keep --concurrency requests in flight for --duration seconds (or until
+--requests are sent), each picking an endpoint at random with the weights of
+--mix. By default the app runs in-process over httpx's ASGI transport against a
+seeded temporary SQLite database, and /chat/ is answered by a local model
+stand-in that calls list_chores and replies after --chat-latency-ms. The stand-in
+never touches the network. --chat-model env keeps whatever LLM_BACKEND selects
+instead (e.g. replay cassettes); --base-url targets a running server.
+
+Results are printed and written as JSON (--output), tagged with the git
+commit, so runs can be compared: --compare OLD.json prints the change per endpoint.
+
+    python tools/load_test.py --duration 20 --concurrency 32
+    python tools/load_test.py --mix chat=1 --concurrency 16 --chat-latency-ms 300
+    python tools/load_test.py --output after.json --compare before.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+import subprocess
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_MIX = "list_chores=4,list_meals=3,recipe_search=3,chore_step=2,meal_step=2,chat=1"
+MEMBERS = ["Alex", "Sam", "Jordan", "Taylor"]
+RECIPES = ["Mapo Tofu", "Spaghetti Carbonara", "Chicken Curry", "Caesar Salad", "Beef Stew", "Pancakes", "Fried Rice", "Tomato Soup"]
+SEARCHES = ["tofu", "spag", "curry", "salad", "stew", "pancake", "rice", "soup", "chiken", "carbonara"]
+KINDS = ["breakfast", "lunch", "dinner", "snack"]
+
+
+def chore_step_request(rng):
+    data = {"chore_name": f"Load chore {rng.randrange(10 ** 6)}", "assigned_members": rng.sample(MEMBERS, 2),
+            "start_date": (date.today() + timedelta(days=rng.randrange(30))).isoformat(), "repetition": "weekly"}
+    variant = rng.choice(("collecting", "confirming", "create"))
+    if variant == "collecting":
+        data.pop(rng.choice(list(data)))
+    return "POST", "/chore/step", {"current_data": data, "confirm": variant == "create"}
+
+
+def meal_step_request(rng):
+    data = {"meal_name": rng.choice(RECIPES), "meal_kind": rng.choice(KINDS),
+            "meal_date": (date.today() + timedelta(days=rng.randrange(30))).isoformat(), "dishes": [rng.choice(RECIPES)]}
+    variant = rng.choice(("search", "confirming", "create"))
+    if variant != "search":
+        data["exist"] = True
+    return "POST", "/meal/step", {"current_data": data, "confirm": variant == "create"}
+
+
+SCENARIOS = {
+    "list_chores": lambda rng: ("GET", "/chores?limit=50", None),
+    "list_meals": lambda rng: ("GET", "/meals?limit=50", None),
+    "recipe_search": lambda rng: ("GET", f"/recipes/search?q={rng.choice(SEARCHES)}", None),
+    "chore_step": chore_step_request,
+    "meal_step": meal_step_request,
+    "chat": lambda rng: ("POST", "/chat/", {"message": f"List all chores ({rng.randrange(10 ** 6)})", "message_history": []}),
+}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown endpoint '{name}' in --mix; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def setup_app(db_path: str, seed_rows: int, chat_model: str, chat_latency: float):
+    os.environ['TEST_DB_URL'] = f"sqlite:///{db_path}"
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-offline-load-test')
+    from pydantic_ai.models.function import FunctionModel
+    from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+    from backend.database import Base, get_registered_engine, get_registered_sessionmaker
+    from backend.main import app, household_agent
+    from backend.crud import chore as chore_crud, meal as meal_crud, recipe as recipe_crud
+    from backend.schemas import ChoreCreate, MealCreate, RecipeCreate
+
+    Base.metadata.create_all(bind=get_registered_engine())
+    db = get_registered_sessionmaker()()
+    start = date.today()
+    recipe_crud.create_recipes_bulk(db, [
+        RecipeCreate(name=f"{RECIPES[i % len(RECIPES)]} {i}", kind=KINDS[i % 4], description="Seeded recipe")
+        for i in range(seed_rows)
+    ])
+    chore_crud.create_chores_bulk(db, [
+        ChoreCreate(chore_name=f"Chore {i}", assigned_members=MEMBERS[: 1 + i % 3], start_date=start + timedelta(days=i % 60), repetition="weekly")
+        for i in range(seed_rows)
+    ])
+    meal_crud.create_meals_bulk(db, [
+        MealCreate(meal_name=RECIPES[i % len(RECIPES)], exist=True, meal_kind=KINDS[i % 4], meal_date=start + timedelta(days=i % 60), dishes=[RECIPES[(i + 1) % len(RECIPES)]])
+        for i in range(seed_rows)
+    ])
+    db.close()
+
+    if chat_model == "standin":
+        async def handler(messages, info):
+            await asyncio.sleep(chat_latency)
+            if any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+                return ModelResponse(parts=[TextPart("<!-- stage: confirming_info -->\nHere are your chores.")])
+            return ModelResponse(parts=[ToolCallPart("list_chores", {})])
+
+        household_agent.agent.model = FunctionModel(handler)
+    return app
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_load(client, mix: dict, concurrency: int, duration: float, max_requests: int, seed: int):
+    names, weights = list(mix), list(mix.values())
+    samples = defaultdict(list)
+    errors = defaultdict(lambda: defaultdict(int))
+    sent = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        nonlocal sent
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline and (not max_requests or sent < max_requests):
+            sent += 1
+            name = rng.choices(names, weights)[0]
+            method, path, body = SCENARIOS[name](rng)
+            t0 = time.perf_counter()
+            try:
+                resp = await client.request(method, path, json=body)
+                ok = resp.status_code < 400 and not (name == "chat" and resp.json().get("stage") == "error")
+                status = str(resp.status_code)
+            except Exception as e:
+                ok, status = False, type(e).__name__
+            elapsed = time.perf_counter() - t0
+            if ok:
+                samples[name].append(elapsed)
+            else:
+                errors[name][status] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - t0
+
+    endpoints = {}
+    for name in names:
+        latencies = sorted(samples[name])
+        n_errors = sum(errors[name].values())
+        endpoints[name] = {
+            "requests": len(latencies) + n_errors,
+            "errors": n_errors,
+            "error_statuses": dict(errors[name]),
+            "rps": round(len(latencies) / wall, 2),
+            **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 2) for p in (50, 95, 99)},
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+    total_ok = sum(len(v) for v in samples.values())
+    return {"wall_seconds": round(wall, 3), "total_rps": round(total_ok / wall, 2), "endpoints": endpoints}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def print_results(results: dict):
+    print(f"{'endpoint':<14} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, s in results["endpoints"].items():
+        print(f"{name:<14} {s['requests']:>8} {s['errors']:>7} {s['rps']:>8.1f} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f}")
+    print(f"\ntotal {results['total_rps']:.1f} req/s over {results['wall_seconds']:.1f} s")
+
+
+def print_comparison(old: dict, new: dict):
+    print(f"\nvs {old.get('commit', '?')}: change in req/s and p95 / p99 latency")
+    for name, s in new["endpoints"].items():
+        before = old.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        change = lambda key: f"{(s[key] - before[key]) / before[key] * 100:+.1f}%" if before[key] else "n/a"
+        print(f"{name:<14} req/s {change('rps'):>8}   p95 {change('p95_ms'):>8}   p99 {change('p99_ms'):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test CRUD, step and chat endpoints; report RPS and p50/p95/p99 per endpoint.")
+    parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0: run for --duration)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Endpoint weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--seed-rows', type=int, default=500, help='Chores, meals and recipes seeded into the temporary DB')
+    parser.add_argument('--chat-model', choices=('standin', 'env'), default='standin', help='standin: local FunctionModel; env: the model LLM_BACKEND selects')
+    parser.add_argument('--chat-latency-ms', type=float, default=200.0, help='Delay of each stand-in model response')
+    parser.add_argument('--base-url', default=None, help='Load a running server instead of the in-process app')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the request mix')
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(__file__), 'load_test_results.json'))
+    parser.add_argument('--compare', default=None, help='Earlier results JSON to compare against')
+    parser.add_argument('--verbose', action='store_true', help='Keep the app\'s INFO logging (off by default so logging does not dominate the numbers)')
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    import httpx
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        else:
+            app = setup_app(os.path.join(tmp, 'load.db'), args.seed_rows, args.chat_model, args.chat_latency_ms / 1000)
+            if not args.verbose:
+                logging.disable(logging.INFO)
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=60)
+
+        async def run():
+            async with client:
+                return await run_load(client, mix, args.concurrency, args.duration, args.requests, args.seed)
+
+        print(f"concurrency {args.concurrency}, mix {args.mix}, {'target ' + args.base_url if args.base_url else 'in-process app'}\n")
+        results = asyncio.run(run())
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: getattr(args, k) for k in ('concurrency', 'duration', 'requests', 'mix', 'seed_rows', 'chat_model', 'chat_latency_ms', 'base_url', 'seed')},
+        **results,
+    }
+    print_results(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
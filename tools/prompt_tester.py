@@ -2,17 +2,23 @@ import os
 import sys
 import json
 import argparse
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Optional
 import time
 
 # Ensure project root is in sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.agents.stage_classifier import classify_stage_llm
+from backend.agents import stage_classifier
+from backend.agents.stage_classifier import classify_stage_llm_async, classifier_prompt_snapshot, CLASSIFIER_MODEL
+from backend.agents.llm_backend import llm_backend
+from backend.agents.bulkhead import llm_bulkhead
 
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), '../prompts/stage_classifier_prompt.md')
 TEST_CASES_PATH = os.path.join(os.path.dirname(__file__), 'stage_classifier_test_cases.json')
 RESULTS_PATH = os.path.join(os.path.dirname(__file__), 'stage_classifier_test_results.json')
+CACHE_PATH = os.path.join(os.path.dirname(__file__), 'stage_classifier_cache.json')
 
 
 def load_prompt() -> str:
@@ -40,15 +46,72 @@ def load_test_cases(extra_examples_path: str = None) -> List[Dict[str, Any]]:
         return all_cases
     return base_cases
 
-def run_test_case(reply: str, expected_stage: str) -> Dict[str, Any]:
-    got_stage = classify_stage_llm(reply)
+class ResultCache:
+    """Stages from earlier runs, on disk, keyed by (prompt hash, model, reply) so unchanged cases are not re-billed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+        self.hits = 0
+
+    @staticmethod
+    def key(prompt_digest: str, model: str, reply: str) -> str:
+        return hashlib.sha1(json.dumps([prompt_digest, model, reply]).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        stage = self.entries.get(key)
+        self.hits += stage is not None
+        return stage
+
+    def put(self, key: str, stage: str):
+        self.entries[key] = stage
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+async def run_test_case(reply: str, expected_stage: str, semaphore: asyncio.Semaphore,
+                        cache: Optional[ResultCache] = None, cache_key: str = None) -> Dict[str, Any]:
+    got_stage = cache.get(cache_key) if cache else None
+    cached = got_stage is not None
+    start = time.perf_counter()
+    if not cached:
+        async with semaphore:
+            start = time.perf_counter()
+            got_stage = await classify_stage_llm_async(reply)
+        # 'unknown' is also what a failed LLM call falls back to, so it is asked again next run
+        if cache and got_stage != 'unknown':
+            cache.put(cache_key, got_stage)
     return {
         'reply': reply,
         'expected_stage': expected_stage,
         'got_stage': got_stage,
-        'ok': got_stage == expected_stage
+        'ok': got_stage == expected_stage,
+        'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+        'cached': cached,
     }
 
+async def run_test_cases(test_cases: List[Dict[str, Any]], concurrency: int, cache: Optional[ResultCache]) -> List[Dict[str, Any]]:
+    """Classify all cases, at most `concurrency` at a time; results keep the order of test_cases."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    prompt_digest = classifier_prompt_snapshot().digest
+    model = f"{llm_backend()}:{CLASSIFIER_MODEL}"
+    return await asyncio.gather(*(
+        run_test_case(case['reply'], case['expected_stage'], semaphore, cache, ResultCache.key(prompt_digest, model, case['reply']))
+        for case in test_cases
+    ))
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values)))]
+
 def suggest_prompt(prompt: str, failed: List[Dict[str, Any]]) -> str:
     from openai import OpenAI
     client = OpenAI()
@@ -63,20 +126,26 @@ def suggest_prompt(prompt: str, failed: List[Dict[str, Any]]) -> str:
     )
     return suggestion.choices[0].message.content.strip()
 
-def run_tests(verbose=True, extra_examples_path=None):
-    prompt = load_prompt()
+def run_tests(verbose=True, extra_examples_path=None, concurrency=None, use_cache=True):
     test_cases = load_test_cases(extra_examples_path)
-    results = []
-    for i, case in enumerate(test_cases):
-        reply = case['reply']
-        expected_stage = case['expected_stage']
-        result = run_test_case(reply, expected_stage)
+    cache = ResultCache(CACHE_PATH) if use_cache else None
+    concurrency = concurrency or llm_bulkhead.max_concurrent
+    start = time.perf_counter()
+    results = asyncio.run(run_test_cases(test_cases, concurrency, cache))
+    wall = time.perf_counter() - start
+    if cache:
+        cache.save()
+    for i, (case, result) in enumerate(zip(test_cases, results)):
         result['description'] = case.get('description', f"Case {i+1}")
-        results.append(result)
         if verbose:
-            print(f"[{i+1}] {result['description']}\n  Expected: {expected_stage}\n  Got:      {result['got_stage']}  {'✅' if result['ok'] else '❌'}\n  Reply:    {reply[:80]}{'...' if len(reply) > 80 else ''}\n")
+            reply = result['reply']
+            timing = 'cached' if result['cached'] else f"{result['latency_ms']:.0f} ms"
+            print(f"[{i+1}] {result['description']}\n  Expected: {result['expected_stage']}\n  Got:      {result['got_stage']}  {'✅' if result['ok'] else '❌'}  ({timing})\n  Reply:    {reply[:80]}{'...' if len(reply) > 80 else ''}\n")
     with open(RESULTS_PATH, 'w', encoding='utf-8') as f:
         json.dump(results, f, indent=2)
+    latencies = sorted(r['latency_ms'] for r in results if not r['cached'])
+    print(f"Classified {len(latencies)} cases ({len(results) - len(latencies)} from cache) in {wall:.1f} s, concurrency {concurrency}; "
+          f"latency p50 {percentile(latencies, 50):.0f} ms, p95 {percentile(latencies, 95):.0f} ms, max {latencies[-1] if latencies else 0:.0f} ms")
     failed = [r for r in results if not r['ok']]
     return results, failed
 
@@ -86,6 +155,8 @@ def main():
     parser.add_argument('--max-trials', type=int, default=10, help='Max auto-tune trials (default: 10)')
     parser.add_argument('--no-verbose', action='store_true', help='Suppress per-case output')
     parser.add_argument('--examples', type=str, default=None, help='Path to extra examples JSON file to augment test cases (e.g. tools/stage_classifier_examples.json)')
+    parser.add_argument('--concurrency', type=int, default=None, help=f'Cases classified at once (default: LLM_MAX_CONCURRENCY, {llm_bulkhead.max_concurrent})')
+    parser.add_argument('--no-cache', action='store_true', help=f'Classify every case again instead of reusing results from {os.path.basename(CACHE_PATH)}')
     args = parser.parse_args()
 
     trial = 1
@@ -93,7 +164,8 @@ def main():
     history = []
     while trial <= args.max_trials:
         print(f"\n=== Trial {trial} ===\n")
-        results, failed = run_tests(verbose=not args.no_verbose, extra_examples_path=args.examples)
+        results, failed = run_tests(verbose=not args.no_verbose, extra_examples_path=args.examples,
+                                    concurrency=args.concurrency, use_cache=not args.no_cache)
         n_failed = len(failed)
         n_total = len(results)
         print(f"\nSummary: {n_total-n_failed}/{n_total} passed, {n_failed} failed.")
@@ -117,6 +189,8 @@ def main():
             try:
                 improved_prompt = suggest_prompt(load_prompt(), failed)
                 save_prompt(improved_prompt)
+                # Publish the new prompt to the classifier; cases cached under the old one no longer match
+                stage_classifier.reload_prompt()
                 print(f"Prompt updated. Re-running tests...")
                 time.sleep(1)  # Small delay to avoid rate limits
             except Exception as e: